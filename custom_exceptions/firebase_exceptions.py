@@ -10,3 +10,10 @@ class FirebaseTokenNotFoundException(Exception):
     Exception raised when a user tries to login with an invalid firebase token.
     """
     message = 'Firebase token not found.'
+
+
+class FirebaseTokenInvalidException(Exception):
+    """
+    Exception raised when a firebase id-token can not be verified.
+    """
+    message = 'Firebase token invalid.'
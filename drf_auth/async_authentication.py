@@ -0,0 +1,92 @@
+import functools
+
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpResponse
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from drf_auth.authentication import ClaimsJWTAuthentication, is_claims_authentication
+from services.group_service import get_user_roles
+from services.token_service import ais_token_revoked, get_user_from_token
+from users.models import User
+
+
+async def aauthenticate(request) -> User or None:
+    """
+    Authenticate a request of an async view with the access token of the Authorization header.
+    Uses the same rules as ClaimsJWTAuthentication, the user is built from the token claims. Without
+    TOKEN_CLAIMS_AUTHENTICATION and for tokens issued before the claims were introduced, the user (and its roles) is
+    loaded from the database in a worker thread.
+    :param request: HttpRequest
+    :return: authenticated user or None if the request has no access token
+    :raises AuthenticationFailed: if the token is invalid or revoked
+    """
+    authentication = ClaimsJWTAuthentication()
+    header = authentication.get_header(request)
+    if header is None:
+        return None
+    raw_token = authentication.get_raw_token(header)
+    if raw_token is None:
+        return None
+
+    validated_token = authentication.get_validated_token(raw_token)
+    if is_claims_authentication(validated_token):
+        if await ais_token_revoked(validated_token):
+            raise InvalidToken('Token has been revoked.')
+        return get_user_from_token(validated_token)
+
+    @sync_to_async
+    def load_user():
+        user = authentication.get_user(validated_token)
+        get_user_roles(user)
+        return user
+
+    return await load_user()
+
+
+def render_json(data, status_code: int = status.HTTP_200_OK) -> HttpResponse:
+    """
+    Render data with the JSON renderer of the API, so the async views respond with the same bytes as the API views.
+    :param data: data to render
+    :param status_code: HTTP status of the response
+    :return: HttpResponse
+    """
+    renderer = JSONRenderer()
+    return HttpResponse(renderer.render(data), status=status_code, content_type=renderer.media_type)
+
+
+def async_api_view(authenticated: bool = True):
+    """
+    Decorator for async views which are served next to the API views.
+    Authenticates the request (request.user is set to the authenticated user) and answers API exceptions and
+    Http404 with the same JSON bodies as the API views.
+    :param authenticated: True to answer requests without a valid access token with 401
+    :return: decorator
+    """
+
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            try:
+                user = await aauthenticate(request)
+                if user is not None:
+                    request.user = user
+                elif authenticated:
+                    raise NotAuthenticated
+                return await view(request, *args, **kwargs)
+            except APIException as e:
+                response = render_json(e.detail if isinstance(e.detail, (list, dict)) else {'detail': e.detail},
+                                       e.status_code)
+                if e.status_code == status.HTTP_401_UNAUTHORIZED:
+                    response['WWW-Authenticate'] = 'Bearer realm="api"'
+                return response
+            except Http404:
+                return render_json({'detail': 'Not found.'}, status.HTTP_404_NOT_FOUND)
+
+        # authenticated by the access token like the API views, not by the session
+        wrapper.csrf_exempt = True
+        return wrapper
+
+    return decorator
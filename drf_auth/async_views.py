@@ -0,0 +1,60 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.views.decorators.http import require_POST
+from rest_framework import status
+from rest_framework.exceptions import ParseError
+
+from custom_exceptions.firebase_exceptions import FirebaseUserNotFoundException, FirebaseTokenNotFoundException
+from custom_exceptions.user_exceptions import EmailAlreadyExistsException
+from drf_auth.async_authentication import async_api_view, render_json
+from services import firebase_service, user_service
+from users.models import User
+from .serializers import UserLoginSerializer
+
+
+@require_POST
+@async_api_view(authenticated=False)
+async def login(request):
+    """
+    Async version of LoginView.
+    The firebase id-token is verified and the user is loaded without blocking the event loop, only the tokens
+    and the response (roles and groups of the user) are built in a worker thread.
+    :param request: Request with the firebaseIdToken as JSON or form data
+    :return: Response with the user and its tokens
+    """
+    try:
+        token = get_request_data(request).get('firebaseIdToken', None)
+        user_record = await firebase_service.aget_user_infos_with_id_token(token)
+        user = await user_service.aget_or_create_user(user_record)
+        return render_json(await sync_to_async(get_login_response_data)(user))
+    except FirebaseTokenNotFoundException:
+        return render_json({'error': 'Please supply a valid firebase id-token.'}, status.HTTP_400_BAD_REQUEST)
+    except FirebaseUserNotFoundException:
+        return render_json({'error': 'Firebase-User not found.'}, status.HTTP_400_BAD_REQUEST)
+    except EmailAlreadyExistsException:
+        return render_json({'error': 'Email already exists. UID does not match.'}, status.HTTP_400_BAD_REQUEST)
+
+
+def get_request_data(request) -> dict:
+    """
+    Parse the body of a request like the parsers of the API views (JSON or form data).
+    :param request: HttpRequest
+    :return: dict with the data of the body
+    :raises ParseError: if the JSON body is invalid
+    """
+    if request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError as e:
+            raise ParseError(f'JSON parse error - {e}')
+        return data if isinstance(data, dict) else {}
+    return request.POST
+
+
+def get_login_response_data(user: User) -> dict:
+    """
+    :param user: logged in user
+    :return: serialized login data of the user
+    """
+    return UserLoginSerializer(user_service.get_login_data(user)).data
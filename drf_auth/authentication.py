@@ -0,0 +1,35 @@
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.tokens import Token
+
+from services.token_service import EDUCATION_ORDINANCE_CLAIM, ROLES_CLAIM, get_user_from_token, is_token_revoked
+
+
+def is_claims_authentication(validated_token: Token) -> bool:
+    """
+    Check if the user of a token is built from its claims instead of being loaded from the database.
+    :param validated_token: validated token
+    :return: True if TOKEN_CLAIMS_AUTHENTICATION is on and the token contains the custom claims
+    """
+    return settings.TOKEN_CLAIMS_AUTHENTICATION and EDUCATION_ORDINANCE_CLAIM in validated_token \
+        and ROLES_CLAIM in validated_token
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT-Authentication which builds the user from the token claims instead of loading it from the database
+    (TOKEN_CLAIMS_AUTHENTICATION).
+    The active flag is not checked per request: deactivating a user or changing the roles or the education ordinance
+    revokes the issued access-tokens (see services.token_service.revoke_user_tokens), otherwise the claims stay valid
+    until the access-token expires.
+    Without TOKEN_CLAIMS_AUTHENTICATION and for tokens issued before the claims were introduced, the user is loaded
+    like by JWTAuthentication.
+    """
+
+    def get_user(self, validated_token):
+        if not is_claims_authentication(validated_token):
+            return super().get_user(validated_token)
+        if is_token_revoked(validated_token):
+            raise InvalidToken('Token has been revoked.')
+        return get_user_from_token(validated_token)
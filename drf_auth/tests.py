@@ -0,0 +1,163 @@
+import asyncio
+import datetime
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.tokens import AccessToken
+
+from drf_auth.authentication import ClaimsJWTAuthentication
+from services.firebase_key_service import MIN_FORCED_REFRESH_INTERVAL, PublicKeyCache
+from services.token_service import get_tokens_for_user
+from users.models import User
+
+
+def create_certificate() -> tuple:
+    """
+    :return: Tuple of a self-signed PEM certificate and its public key
+    """
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, 'securetoken.system.gserviceaccount.com')])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    certificate = x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(
+        private_key.public_key()).serial_number(x509.random_serial_number()).not_valid_before(now).not_valid_after(
+        now + datetime.timedelta(days=1)).sign(private_key, hashes.SHA256())
+    return certificate.public_bytes(serialization.Encoding.PEM).decode(), private_key.public_key()
+
+
+class KeyServerHandler(BaseHTTPRequestHandler):
+    """
+    Serves the certificates and the headers of the key server like the firebase key endpoint.
+    """
+
+    def do_GET(self):
+        self.server.request_count += 1
+        body = json.dumps(self.server.certificates).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=UTF-8')
+        self.send_header('Content-Length', str(len(body)))
+        for header, value in self.server.response_headers.items():
+            self.send_header(header, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class PublicKeyCacheTest(SimpleTestCase):
+    """
+    PublicKeyCache against a local key server, with a fake monotonic clock.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.first_certificate, cls.first_key = create_certificate()
+        cls.second_certificate, cls.second_key = create_certificate()
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), KeyServerHandler)
+        self.server.request_count = 0
+        self.server.certificates = {'first': self.first_certificate}
+        self.server.response_headers = {'Cache-Control': 'public, max-age=3600'}
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        self.now = 1000.0
+        clock = mock.patch('services.firebase_key_service.time.monotonic', side_effect=lambda: self.now)
+        clock.start()
+        self.addCleanup(clock.stop)
+
+        self.cache = PublicKeyCache(f'http://127.0.0.1:{self.server.server_port}/', default_ttl=60)
+
+    def assertKey(self, key, expected_key):
+        self.assertIsNotNone(key)
+        self.assertEqual(key.public_numbers(), expected_key.public_numbers())
+
+    def test_max_age_minus_age(self):
+        self.server.response_headers = {'Cache-Control': 'public, max-age=600', 'Age': '590'}
+        self.assertKey(self.cache.get_key('first'), self.first_key)
+        self.assertEqual(self.server.request_count, 1)
+
+        self.now += 9
+        self.assertKey(self.cache.get_key('first'), self.first_key)
+        self.assertEqual(self.server.request_count, 1)
+
+        self.now += 1
+        self.assertKey(self.cache.get_key('first'), self.first_key)
+        self.assertEqual(self.server.request_count, 2)
+
+    def test_rotation(self):
+        self.assertKey(self.cache.get_key('first'), self.first_key)
+        self.server.certificates = {'second': self.second_certificate}
+
+        # unknown key ids force a refresh at most every MIN_FORCED_REFRESH_INTERVAL seconds
+        self.now += MIN_FORCED_REFRESH_INTERVAL - 1
+        self.assertIsNone(self.cache.get_key('second'))
+        self.assertEqual(self.server.request_count, 1)
+
+        self.now += 1
+        self.assertKey(self.cache.get_key('second'), self.second_key)
+        self.assertEqual(self.server.request_count, 2)
+
+        # the rotated key is gone, without another request
+        self.now += 1
+        self.assertIsNone(self.cache.get_key('first'))
+        self.assertEqual(self.server.request_count, 2)
+
+    def test_async_rotation(self):
+        self.assertKey(asyncio.run(self.cache.aget_key('first')), self.first_key)
+        self.server.certificates = {'second': self.second_certificate}
+
+        self.now += MIN_FORCED_REFRESH_INTERVAL - 1
+        self.assertIsNone(asyncio.run(self.cache.aget_key('second')))
+        self.assertEqual(self.server.request_count, 1)
+
+        self.now += 1
+        self.assertKey(asyncio.run(self.cache.aget_key('second')), self.second_key)
+        self.assertEqual(self.server.request_count, 2)
+
+
+class ClaimsJWTAuthenticationTest(TestCase):
+    """
+    Revocation of the access-tokens with and without TOKEN_CLAIMS_AUTHENTICATION.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('trainee@example.com', firstname='Trainee', lastname='Example')
+        self.authentication = ClaimsJWTAuthentication()
+
+    def get_user(self, tokens: dict) -> User:
+        return self.authentication.get_user(AccessToken(tokens['access']))
+
+    @override_settings(TOKEN_CLAIMS_AUTHENTICATION=True)
+    def test_revoked_in_the_same_second(self):
+        tokens = get_tokens_for_user(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        with self.assertRaises(InvalidToken):
+            self.get_user(tokens)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = True
+            self.user.save()
+        self.assertEqual(self.get_user(get_tokens_for_user(self.user)).id, self.user.id)
+
+    @override_settings(TOKEN_CLAIMS_AUTHENTICATION=False)
+    def test_inactive_without_claims_authentication(self):
+        tokens = get_tokens_for_user(self.user)
+        User.objects.filter(id=self.user.id).update(is_active=False)
+        with self.assertRaises(AuthenticationFailed):
+            self.get_user(tokens)
@@ -2,11 +2,13 @@ from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rest_framework_simplejwt.exceptions import TokenError
 
 from custom_exceptions.firebase_exceptions import FirebaseUserNotFoundException, FirebaseTokenNotFoundException
 from custom_exceptions.user_exceptions import EmailAlreadyExistsException
 from services import firebase_service, user_service, token_service
-from .serializers import UserLoginSerializer
+from users.models import User
+from .serializers import TokenSerializer, UserLoginSerializer
 
 
 class LoginView(APIView):
@@ -21,15 +23,7 @@ class LoginView(APIView):
             token = request.data.get('firebaseIdToken', None)
             user_record = firebase_service.get_user_infos_with_id_token(token)
             user = user_service.get_or_create_user(user_record)
-            tokens = token_service.get_tokens_for_user(user)
-            data = {
-                'id': user.id,
-                'email': user.email,
-                'firstname': user.firstname,
-                'lastname': user.lastname,
-                'groups': user.get_groups().values(),
-                'tokens': tokens
-            }
+            data = user_service.get_login_data(user)
             return Response(self.serializer_class(data).data, status=status.HTTP_200_OK)
         except FirebaseTokenNotFoundException:
             return Response({'error': 'Please supply a valid firebase id-token.'}, status=status.HTTP_400_BAD_REQUEST)
@@ -41,6 +35,25 @@ class LoginView(APIView):
             print(e)
 
 
+class RefreshView(APIView):
+    """
+    API-View to rotate the jwt-tokens.
+    The new tokens contain the current roles and education ordinance of the user.
+    """
+
+    authentication_classes = []
+    serializer_class = TokenSerializer
+
+    def post(self, request):
+        try:
+            tokens = token_service.refresh_tokens(request.data.get('refresh', ''))
+            return Response(self.serializer_class(tokens).data, status=status.HTTP_200_OK)
+        except TokenError:
+            return Response({'error': 'Please supply a valid refresh-token.'}, status=status.HTTP_401_UNAUTHORIZED)
+        except User.DoesNotExist:
+            return Response({'error': 'User not found.'}, status=status.HTTP_401_UNAUTHORIZED)
+
+
 class LogoutView(APIView):
     """
     API-View to log user out.
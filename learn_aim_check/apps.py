@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class LearnAimCheckConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'learn_aim_check'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,125 @@
+from django.shortcuts import aget_object_or_404
+from django.views.decorators.http import require_GET
+from rest_framework import status
+
+from custom_exceptions.learn_check_exceptions import LearnAimNotInEducationOrdinance
+from drf_auth.async_authentication import async_api_view, render_json
+from learn_aim_check.models import ActionCompetence, LearnAim
+from learn_aim_check.serializers import DiagramSerializer
+from services.conditional_request_service import aget_checks_state, aget_curriculum_state, aget_todo_state, \
+    get_not_modified_response, get_validators, set_validators
+from services.curriculum_cache_service import aget_learn_check_data
+from services.group_service import is_user_coach
+from services.ordinance_index_service import ais_competence_in_ordinance
+from services.progress_service import aget_closed_count, get_action_competence_progress
+from services.response_cache_service import acache_response, aget_cached_response, aget_response_cache_key
+from services.sparse_fieldset_service import get_field_selection
+from users.models import User
+
+
+@require_GET
+@async_api_view()
+async def learn_check_tree(request):
+    """
+    Async version of LearnAimViewSet.list.
+    Get the learn check tree of the selected trainee (coaches select the trainee with the student-id param).
+    :param request: Request with the optional student-id param
+    :return: Response with all action competences, learn aims and checks
+    """
+    selected_trainee = request.user
+    if is_user_coach(request.user):
+        selected_trainee = await User.objects.filter(id=request.GET.get('student-id', None)).afirst()
+    if selected_trainee is None:
+        return render_json([])
+
+    cache_key = await aget_response_cache_key('learn-check', request, [selected_trainee.id])
+    cached_response = await aget_cached_response(request, cache_key)
+    if cached_response is not None:
+        return cached_response
+
+    selection = get_field_selection(request)
+    curriculum_state = await aget_curriculum_state(selected_trainee.education_ordinance_id)
+    validators = get_validators(selected_trainee.id, selected_trainee.education_ordinance_id, curriculum_state,
+                                await aget_checks_state(selected_trainee.id), await aget_todo_state(), selection)
+    not_modified = get_not_modified_response(request, validators)
+    if not_modified is not None:
+        return not_modified
+
+    data = await aget_learn_check_data(selected_trainee.education_ordinance_id, selected_trainee, selection,
+                                       curriculum_state)
+    return await acache_response(cache_key, set_validators(render_json(data), validators))
+
+
+@require_GET
+@async_api_view()
+async def learn_check_chart(request, pk):
+    """
+    Async version of LearnCheckChartAPIView.
+    Get the diagram of an action competence of the user's education ordinance.
+    :param request: Request with the data for the diagram (User)
+    :param pk: Primary key of the action competence
+    :raises LearnAimNotInEducationOrdinance: if the action competence is not part of the user's education ordinance
+    :return: Response for the chart
+    """
+    cache_key = await aget_response_cache_key('learn-check-chart', request, [request.user.id])
+    cached_response = await aget_cached_response(request, cache_key)
+    if cached_response is not None:
+        return cached_response
+
+    action_competence = await aget_object_or_404(ActionCompetence, id=pk)
+    if not await ais_competence_in_ordinance(request.user.education_ordinance_id, action_competence.id):
+        raise LearnAimNotInEducationOrdinance
+
+    selection = get_field_selection(request)
+    validators = get_validators(request.user.id, request.user.education_ordinance_id,
+                                await aget_curriculum_state(request.user.education_ordinance_id),
+                                await aget_checks_state(request.user.id), selection)
+    not_modified = get_not_modified_response(request, validators)
+    if not_modified is not None:
+        return not_modified
+
+    if selection.wants('total'):
+        action_competence.learn_aim_count = await LearnAim.objects.filter(action_competence=action_competence).acount()
+    if selection.wants('closed'):
+        action_competence.closed_count = await aget_closed_count(request.user, action_competence)
+    serializer = DiagramSerializer(action_competence, context={'request': request, 'field_selection': selection})
+    return await acache_response(cache_key, set_validators(render_json(serializer.data), validators))
+
+
+@require_GET
+@async_api_view()
+async def learn_check_chart_list(request):
+    """
+    Async version of LearnCheckChartListAPIView.
+    Get the diagrams for all action competences of the trainee's education ordinance.
+    - students get their own progress
+    - coaches get the progress of the trainee given with the student-id param
+    :param request: Request with the data for the diagrams (User)
+    :return: Response with the charts of all action competences
+    """
+    trainee = request.user
+    if is_user_coach(request.user):
+        student_id = request.GET.get('student-id', None)
+        if student_id is None or not student_id.isnumeric():
+            return render_json({'student-id': 'Please supply a student-id in params.'},
+                               status.HTTP_400_BAD_REQUEST)
+        trainee = await aget_object_or_404(User, pk=student_id)
+
+    cache_key = await aget_response_cache_key('learn-check-chart-list', request, [trainee.id])
+    cached_response = await aget_cached_response(request, cache_key)
+    if cached_response is not None:
+        return cached_response
+
+    selection = get_field_selection(request)
+    validators = get_validators(trainee.id, trainee.education_ordinance_id,
+                                await aget_curriculum_state(trainee.education_ordinance_id),
+                                await aget_checks_state(trainee.id), selection)
+    not_modified = get_not_modified_response(request, validators)
+    if not_modified is not None:
+        return not_modified
+
+    action_competences = [action_competence async for action_competence in
+                          get_action_competence_progress(trainee.education_ordinance_id, trainee, selection)]
+    serializer = DiagramSerializer(action_competences, many=True,
+                                   context={'request': request, 'field_selection': selection})
+    return await acache_response(cache_key, set_validators(render_json(serializer.data), validators))
@@ -0,0 +1,48 @@
+from django_filters import rest_framework as filters
+
+from learn_aim_check.models import CheckLearnAim, LearnAim
+from services.learn_aim_search_service import filter_learn_aims_by_tags, search_learn_aims
+from users.filters import NumberInFilter
+
+
+class CheckLearnAimFilter(filters.FilterSet):
+    """
+    Filters for learn checks.
+    i.e. ?trainee=12&stage=2&is_approved=false&updated_since=2024-05-01T00:00:00Z
+    """
+    trainee = filters.NumberFilter(field_name='assigned_trainee')
+    learn_aim = filters.NumberFilter(field_name='closed_learn_check')
+    semester = filters.NumberFilter(field_name='semester')
+    stage = filters.NumberFilter(field_name='close_stage')
+    is_approved = filters.BooleanFilter(field_name='is_approved')
+    updated_since = filters.IsoDateTimeFilter(field_name='updated_at', lookup_expr='gte')
+
+    class Meta:
+        model = CheckLearnAim
+        fields = ['trainee', 'learn_aim', 'semester', 'stage', 'is_approved', 'updated_since']
+
+
+class LearnAimSearchFilter(filters.FilterSet):
+    """
+    Filters for the learn aim search.
+    i.e. ?q=datenbank entwerfen&tags=2,5&taxonomy_level=3,4
+    """
+    q = filters.CharFilter(method='filter_text')
+    tags = NumberInFilter(method='filter_tags')
+    taxonomy_level = NumberInFilter(field_name='taxonomy_level')
+
+    class Meta:
+        model = LearnAim
+        fields = ['q', 'tags', 'taxonomy_level']
+
+    def filter_text(self, queryset, name, value):
+        """
+        :return: QuerySet of the learn aims matching the search text
+        """
+        return search_learn_aims(queryset, value)
+
+    def filter_tags(self, queryset, name, value):
+        """
+        :return: QuerySet of the learn aims with at least one of the tags
+        """
+        return filter_learn_aims_by_tags(queryset, value)
@@ -0,0 +1,200 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import QuerySet
+from rest_framework import serializers
+
+from learn_aim_check.models import LearnAim
+from learn_aim_check.serializers import CheckLearnAimSerializer, LearnAimSerializer, SimpleLearnAimSerializer
+from services.sparse_fieldset_service import ALL_FIELDS, FieldSelection
+
+# The lean serializers build the same dicts as CheckLearnAimSerializer, SimpleLearnAimSerializer, LearnAimSerializer
+# and UserSerializer from values() projections, without model instances and serializer fields. The columns and the
+# field order are read from the serializers, so the rendered responses stay byte-identical when a serializer changes.
+
+
+def get_columns(serializer: serializers.Serializer, relation: str = None) -> tuple:
+    """
+    Get the readable fields of a serializer with their path in a projection.
+    :param serializer: serializer instance
+    :param relation: name of the foreign key the serializer is nested under (None for the projected model itself)
+    :return: Tuple of (field name, path, DateTimeField or None) tuples in the field order of the serializer, the path
+             of nested serializers is None
+    """
+    columns = []
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if isinstance(field, serializers.BaseSerializer):
+            path = None
+        elif relation is not None:
+            path = f'{relation}_id' if field.source == 'id' else f'{relation}__{field.source}'
+        elif isinstance(field, serializers.RelatedField):
+            path = f'{field.source}_id'
+        else:
+            path = field.source
+        columns.append((name, path, field if isinstance(field, serializers.DateTimeField) else None))
+    return tuple(columns)
+
+
+def get_field_names(serializer: serializers.Serializer) -> tuple:
+    """
+    :param serializer: serializer instance
+    :return: Tuple of the names of the readable fields of the serializer in their order
+    """
+    return tuple(name for name, field in serializer.fields.items() if not field.write_only)
+
+
+# Columns of CheckLearnAimSerializer and of its approver (UserSerializer) in the check projection
+CHECK_COLUMNS = get_columns(CheckLearnAimSerializer())
+APPROVED_BY_COLUMNS = get_columns(CheckLearnAimSerializer().fields['approved_by'], relation='approved_by')
+
+# Paths of the check projection (see project_checks), the approver is only joined if needed
+_APPROVED_BY_ID = 'approved_by_id'
+_APPROVED_BY_EMAIL = 'approved_by__email'
+CHECK_PROJECTION = tuple(path for _, path, _ in CHECK_COLUMNS if path) + (_APPROVED_BY_ID,)
+APPROVED_BY_PROJECTION = tuple(path for _, path, _ in APPROVED_BY_COLUMNS if path not in CHECK_PROJECTION)
+
+# Field order of SimpleLearnAimSerializer and LearnAimSerializer
+SIMPLE_LEARN_AIM_FIELDS = get_field_names(SimpleLearnAimSerializer())
+LEARN_AIM_FIELDS = get_field_names(LearnAimSerializer())
+
+# Columns of the learn aim projection
+LEARN_AIM_PROJECTION = ('id', 'action_competence__identification', 'identification', 'description', 'taxonomy_level',
+                        'example_text')
+
+
+def use_lean_serializers(endpoint: str) -> bool:
+    """
+    Check if an endpoint serializes with the lean serializers (see LEAN_SERIALIZERS setting).
+    :param endpoint: name of the endpoint, i.e. learn-data
+    :return: True if the lean serializers are enabled for the endpoint
+    """
+    return endpoint in settings.LEAN_SERIALIZERS
+
+
+def project_checks(checks: QuerySet, approved_by: bool = True) -> QuerySet:
+    """
+    :param checks: QuerySet of CheckLearnAim objects
+    :param approved_by: False to skip the join of the approver (approved_by is serialized as None)
+    :return: QuerySet of dicts with everything serialize_check needs (one query, the approver is joined)
+    """
+    if approved_by:
+        return checks.values(*CHECK_PROJECTION, *APPROVED_BY_PROJECTION)
+    return checks.values(*CHECK_PROJECTION)
+
+
+def get_simple_learn_aims(learn_aim_ids, tags: bool = True, marked_as_todo: bool = True) -> dict:
+    """
+    Get the learn aims in the shape of SimpleLearnAimSerializer with three queries (learn aims, tags and to-dos).
+    :param learn_aim_ids: ids of the learn aims
+    :param tags: False to skip the query of the tags (serialized as empty lists)
+    :param marked_as_todo: False to skip the query of the to-dos (serialized as empty lists)
+    :return: dict with the serialized learn aims by id
+    """
+    learn_aim_ids = list(learn_aim_ids)
+    tags_of_learn_aims = defaultdict(list)
+    if tags:
+        for learn_aim_id, tag_id, tag_name in LearnAim.tags.through.objects.filter(
+                learnaim_id__in=learn_aim_ids).values_list('learnaim_id', 'tag_id', 'tag__tag_name'):
+            tags_of_learn_aims[learn_aim_id].append({'id': tag_id, 'tag_name': tag_name})
+    todo_user_ids = defaultdict(list)
+    if marked_as_todo:
+        for learn_aim_id, user_id in LearnAim.marked_as_todo.through.objects.filter(
+                learnaim_id__in=learn_aim_ids).values_list('learnaim_id', 'user_id'):
+            todo_user_ids[learn_aim_id].append(user_id)
+
+    learn_aims = {}
+    for learn_aim_id, competence_identification, identification, description, taxonomy_level, example_text \
+            in LearnAim.objects.filter(id__in=learn_aim_ids).values_list(*LEARN_AIM_PROJECTION):
+        values = {
+            'id': learn_aim_id,
+            'tags': tags_of_learn_aims[learn_aim_id],
+            'name': f'{competence_identification}.{identification}: {description}',
+            'description': description,
+            'taxonomy_level': taxonomy_level,
+            'example_text': example_text,
+            'marked_as_todo': todo_user_ids[learn_aim_id],
+        }
+        learn_aims[learn_aim_id] = {field: values[field] for field in SIMPLE_LEARN_AIM_FIELDS}
+    return learn_aims
+
+
+def serialize_check(row: dict, learn_aim: dict) -> dict:
+    """
+    Serialize a check like CheckLearnAimSerializer.
+    :param row: row of the check projection (see project_checks)
+    :param learn_aim: serialized learn aim of the check (see get_simple_learn_aims), None if not loaded
+    :return: serialized check
+    """
+    check = {}
+    for field, path, datetime_field in CHECK_COLUMNS:
+        if field == 'approved_by':
+            check[field] = None if row[_APPROVED_BY_ID] is None or _APPROVED_BY_EMAIL not in row else _build(
+                row, APPROVED_BY_COLUMNS)
+        elif field == 'learn_aim':
+            check[field] = learn_aim
+        else:
+            check[field] = _format(row[path], datetime_field)
+    return check
+
+
+def serialize_checks(rows, selection: FieldSelection = ALL_FIELDS) -> list:
+    """
+    Serialize checks like CheckLearnAimSerializer(many=True), the learn aims are loaded with three queries.
+    :param rows: rows of the check projection (see project_checks)
+    :param selection: selected fields, the learn aims, tags and to-dos are only loaded if they are selected
+    :return: List of serialized checks
+    """
+    rows = list(rows)
+    learn_aims = {}
+    if selection.wants('learn_aim'):
+        learn_aims = get_simple_learn_aims({row['closed_learn_check_id'] for row in rows},
+                                           tags=selection.wants('learn_aim.tags'),
+                                           marked_as_todo=selection.wants('learn_aim.marked_as_todo'))
+    return selection.prune([serialize_check(row, learn_aims.get(row['closed_learn_check_id'])) for row in rows])
+
+
+def serialize_checked_learn_aims(checks, selection: FieldSelection, request) -> list:
+    """
+    Serialize the checks of the checked-learn-aims endpoints with the lean serializers or CheckLearnAimSerializer.
+    :param checks: rows of the check projection if the lean serializers are enabled, else CheckLearnAim objects
+    :param selection: selected fields of the request
+    :param request: Request of the user
+    :return: List of serialized checks
+    """
+    if use_lean_serializers('checked-learn-aims'):
+        return serialize_checks(checks, selection)
+    return selection.prune(CheckLearnAimSerializer(checks, many=True, context={'request': request}).data)
+
+
+def serialize_learn_aim(learn_aim: dict, checked: list, marked_as_todo: bool) -> dict:
+    """
+    Serialize a learn aim like LearnAimSerializer.
+    :param learn_aim: learn aim in the shape of SimpleLearnAimSerializer (see get_simple_learn_aims)
+    :param checked: serialized checks of the learn aim
+    :param marked_as_todo: to-do state of the learn aim
+    :return: serialized learn aim
+    """
+    values = {**learn_aim, 'checked': checked, 'marked_as_todo': marked_as_todo}
+    return {field: values[field] for field in LEARN_AIM_FIELDS}
+
+
+def _build(row: dict, columns: tuple) -> dict:
+    """
+    :param row: row of a projection
+    :param columns: (field name, path, DateTimeField or None) tuples of a serializer (see get_columns)
+    :return: dict with the fields of the serializer
+    """
+    return {field: _format(row[path], datetime_field) for field, path, datetime_field in columns}
+
+
+def _format(value, datetime_field: serializers.DateTimeField or None):
+    """
+    :param value: value of the projection
+    :param datetime_field: DateTimeField of the serializer, None for the other fields
+    :return: value as rendered by the serializer field
+    """
+    if value is None or datetime_field is None:
+        return value
+    return datetime_field.to_representation(value)
@@ -0,0 +1,110 @@
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+from django.core.management.base import BaseCommand
+
+from learn_aim_check.management.commands.benchmark_endpoints import get_endpoints
+from services.token_service import get_tokens_for_user
+
+# Endpoints of benchmark_endpoints with a native async version below /api/v1/async/
+ASYNC_ENDPOINTS = [
+    'learn-check tree (trainee)',
+    'learn-check tree (coach)',
+    'chart list',
+    'chart list (coach)',
+    'chart',
+    'trainee learn-data',
+]
+
+
+class Command(BaseCommand):
+    """
+    Class for management-command "benchmark_async_load".
+    """
+    help = ('Compare the sync API views served by a WSGI server with their native async versions served by an ASGI '
+            'server under concurrent load. Both servers have to run against the same database, i.e. '
+            '"gunicorn tie_athena.wsgi" and "uvicorn tie_athena.asgi:application".')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--wsgi-url', default='http://127.0.0.1:8000',
+                            help='Base URL of the WSGI server (default: http://127.0.0.1:8000)')
+        parser.add_argument('--asgi-url', default='http://127.0.0.1:8001',
+                            help='Base URL of the ASGI server (default: http://127.0.0.1:8001)')
+        parser.add_argument('--concurrency', type=int, default=20, help='Concurrent requests (default: 20)')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per endpoint and server (default: 200)')
+        parser.add_argument('--output', help='Path of a JSON report')
+
+    def handle(self, *args, **options):
+        """
+        Handle command.
+        """
+        endpoints = [endpoint for endpoint in get_endpoints() if endpoint['name'] in ASYNC_ENDPOINTS]
+        tokens = {endpoint['user'].id: get_tokens_for_user(endpoint['user'])['access'] for endpoint in endpoints}
+
+        results = {}
+        print(f'{"endpoint":<32}{"server":<7}{"req/s":>9}{"p50":>10}{"p95":>10}{"p99":>10}{"errors":>8}')
+        for endpoint in endpoints:
+            headers = {'Authorization': f'Bearer {tokens[endpoint["user"].id]}'}
+            targets = {
+                'wsgi': options['wsgi_url'] + endpoint['url'],
+                'asgi': options['asgi_url'] + endpoint['url'].replace('/api/v1/', '/api/v1/async/', 1),
+            }
+            results[endpoint['name']] = {}
+            for server, url in targets.items():
+                result = asyncio.run(run_load(url, headers, options['requests'], options['concurrency']))
+                results[endpoint['name']][server] = result
+                print(f'{endpoint["name"]:<32}{server:<7}{result["throughput"]:>9.1f}{result["p50_ms"]:>10.2f}'
+                      f'{result["p95_ms"]:>10.2f}{result["p99_ms"]:>10.2f}{result["errors"]:>8}')
+
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                json.dump({'concurrency': options['concurrency'], 'requests': options['requests'],
+                           'endpoints': results}, file, indent=2)
+            print(f'Report written to {options["output"]}.')
+
+
+async def run_load(url: str, headers: dict, request_count: int, concurrency: int) -> dict:
+    """
+    Send GET requests to an URL with the given concurrency and measure the throughput and the latencies.
+    :param url: URL to request
+    :param headers: headers of every request
+    :param request_count: total amount of requests
+    :param concurrency: amount of requests in flight at the same time
+    :return: dict with the throughput (requests per second), latency percentiles (ms) and the amount of errors
+    """
+    durations = []
+    errors = 0
+    remaining = iter(range(request_count))
+
+    async def worker(client: httpx.AsyncClient):
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            try:
+                response = await client.get(url, headers=headers)
+                if response.status_code != 200:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            durations.append((time.perf_counter() - start) * 1000)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        duration = time.perf_counter() - start
+
+    percentiles = statistics.quantiles(durations, n=100, method='inclusive') if len(durations) > 1 else durations * 99
+    return {
+        'url': url,
+        'throughput': round(len(durations) / duration, 2),
+        'errors': errors,
+        'mean_ms': round(statistics.fmean(durations), 3),
+        'p50_ms': round(percentiles[49], 3),
+        'p95_ms': round(percentiles[94], 3),
+        'p99_ms': round(percentiles[98], 3),
+        'max_ms': round(max(durations), 3),
+    }
@@ -0,0 +1,119 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count, Max
+
+from learn_aim_check.models import CheckLearnAim
+from users.models import User
+
+
+class Command(BaseCommand):
+    """
+    Class for management-command "benchmark_check_indexes".
+    """
+    help = ('Show the query plans and timings of the hot CheckLearnAim queries with and without the composite, '
+            'partial and unique indexes. The indexes are dropped inside a transaction which is rolled back.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=50, help='Executions per query (default: 50)')
+        parser.add_argument('--no-explain', action='store_true', help='Only show the timings')
+
+    def handle(self, *args, **options):
+        """
+        Handle command.
+        """
+        # the trainee with the most learn checks and one of its learn aims with the most stages
+        trainee_id = CheckLearnAim.objects.values('assigned_trainee_id').annotate(
+            check_count=Count('id')).order_by('-check_count').values_list('assigned_trainee_id', flat=True).first()
+        if trainee_id is None:
+            raise CommandError('No learn checks found. Seed the database first (i.e. with generate_dataset).')
+        learn_aim_id = CheckLearnAim.objects.filter(assigned_trainee_id=trainee_id).values(
+            'closed_learn_check_id').annotate(check_count=Count('id')).order_by('-check_count').values_list(
+            'closed_learn_check_id', flat=True).first()
+
+        trainee = User.objects.get(pk=trainee_id)
+        queries = get_queries(trainee, learn_aim_id)
+        print(f'{CheckLearnAim.objects.count()} learn checks, sample trainee {trainee.id}, '
+              f'learn aim {learn_aim_id}, {options["repeat"]} executions per query\n')
+
+        with_indexes = run_queries(queries, options['repeat'], not options['no_explain'], 'with indexes')
+        # SQLite can only alter tables in a transaction with disabled foreign key checks (no-op on other databases)
+        connection.disable_constraint_checking()
+        try:
+            with transaction.atomic():
+                drop_indexes()
+                without_indexes = run_queries(queries, options['repeat'], not options['no_explain'],
+                                              'without indexes')
+                transaction.set_rollback(True)
+        finally:
+            connection.enable_constraint_checking()
+
+        print(f'{"query":<28}{"without (ms)":>14}{"with (ms)":>12}{"speedup":>10}')
+        for name in queries:
+            before, after = without_indexes[name], with_indexes[name]
+            print(f'{name:<28}{before:>14.3f}{after:>12.3f}{before / after if after else 0:>9.1f}x')
+
+
+def get_queries(trainee: User, learn_aim_id: int) -> dict:
+    """
+    Get the hot CheckLearnAim queries of the API.
+    :param trainee: trainee to run the queries for
+    :param learn_aim_id: learn aim to run the queries for
+    :return: dict with the name and the (unevaluated) queryset of every query
+    """
+    checks = CheckLearnAim.objects.filter(assigned_trainee=trainee)
+    return {
+        'validator': checks.filter(closed_learn_check_id=learn_aim_id),
+        'approved stage': checks.filter(closed_learn_check_id=learn_aim_id, is_approved=True).values(
+            'closed_learn_check_id').annotate(stage=Max('close_stage')),
+        'trainee tree checks': checks.order_by('close_stage'),
+        'pending of trainee': checks.filter(is_approved=False).order_by('closed_learn_check_id', 'close_stage'),
+        'pending of coach': CheckLearnAim.objects.filter(
+            assigned_trainee__assigned_trainer_id=trainee.assigned_trainer_id, is_approved=False),
+        'trainee checks page': checks.order_by('-created_at', '-id')[:50],
+    }
+
+
+def run_queries(queries: dict, repeat: int, explain: bool, label: str) -> dict:
+    """
+    Run every query repeatedly and print its query plan.
+    :param queries: dict with the name and the queryset of every query
+    :param repeat: executions per query
+    :param explain: True to print the query plans
+    :param label: label of the run
+    :return: dict with the name and the median duration (ms) of every query
+    """
+    timings = {}
+    for name, queryset in queries.items():
+        if explain:
+            print(f'--- {name} ({label})')
+            print(queryset.explain() + '\n')
+        list(queryset.all())  # warm up
+        durations = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            list(queryset.all())
+            durations.append((time.perf_counter() - start) * 1000)
+        timings[name] = statistics.median(durations)
+    return timings
+
+
+def drop_indexes() -> None:
+    """
+    Drop the indexes and constraints defined on the CheckLearnAim model (only the plain foreign key indexes remain).
+    Has to be called in a transaction which is rolled back.
+    :return: None
+    """
+    indexes, constraints = CheckLearnAim._meta.indexes, CheckLearnAim._meta.constraints
+    # SQLite drops a constraint by rebuilding the table from the model, so the model must not know them meanwhile
+    CheckLearnAim._meta.indexes, CheckLearnAim._meta.constraints = [], []
+    try:
+        with connection.schema_editor(atomic=False) as schema_editor:
+            for index in indexes:
+                schema_editor.remove_index(CheckLearnAim, index)
+            for constraint in constraints:
+                schema_editor.remove_constraint(CheckLearnAim, constraint)
+    finally:
+        CheckLearnAim._meta.indexes, CheckLearnAim._meta.constraints = indexes, constraints
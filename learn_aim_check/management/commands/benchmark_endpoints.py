@@ -0,0 +1,279 @@
+import datetime
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count, QuerySet
+from django.test.utils import setup_test_environment
+from django.urls import URLPattern, URLResolver, get_resolver, resolve
+from rest_framework.test import APIClient
+
+from learn_aim_check.models import CheckLearnAim, LearnAim
+from services.group_service import get_group_name_coach, get_group_name_student
+from services.token_service import get_tokens_for_user
+from users.models import User
+
+# URL names which are not benchmarked (login and logout depend on firebase)
+EXCLUDED_URL_NAMES = frozenset({'login', 'logout', 'async_login', 'api-root'})
+
+
+class QueryCounter:
+    """
+    Database execute wrapper which counts the executed SQL queries.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    """
+    Class for management-command "benchmark_endpoints".
+    """
+    help = ('Call every API endpoint through the test client and write the latency percentiles and SQL query counts '
+            'to a JSON report. Requests which modify data are rolled back, so the database is left unchanged.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=30, help='Measured requests per endpoint (default: 30)')
+        parser.add_argument('--warmup', type=int, default=3, help='Unmeasured requests per endpoint (default: 3)')
+        parser.add_argument('--output', default='benchmark-report.json',
+                            help='Path of the JSON report (default: benchmark-report.json)')
+        parser.add_argument('--compare', help='Path of a previous JSON report to compare the results with')
+        parser.add_argument('--endpoint', action='append', dest='endpoints',
+                            help='Only benchmark the endpoint with this name (can be repeated)')
+
+    def handle(self, *args, **options):
+        """
+        Handle command.
+        """
+        setup_test_environment()
+        endpoints = get_endpoints()
+        uncovered = get_uncovered_url_names(endpoints)
+        if uncovered:
+            print(f'Not benchmarked: {", ".join(uncovered)}\n')
+        if options['endpoints']:
+            endpoints = [endpoint for endpoint in endpoints if endpoint['name'] in options['endpoints']]
+
+        results = {}
+        for endpoint in endpoints:
+            result = benchmark_endpoint(endpoint, options['iterations'], options['warmup'])
+            results[endpoint['name']] = result
+            print(f'{endpoint["name"]:<32}{result["status"]:>5}{result["p50_ms"]:>10.2f}{result["p95_ms"]:>10.2f}'
+                  f'{result["p99_ms"]:>10.2f}{result["queries"]:>6} queries')
+
+        report = {
+            'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'database': connection.vendor,
+            'iterations': options['iterations'],
+            'dataset': {
+                'users': User.objects.count(),
+                'learn_aims': LearnAim.objects.count(),
+                'learn_checks': CheckLearnAim.objects.count(),
+            },
+            'endpoints': results,
+        }
+        with open(options['output'], 'w') as file:
+            json.dump(report, file, indent=2)
+        print(f'Report written to {options["output"]}.')
+
+        if options['compare']:
+            compare_reports(options['compare'], report)
+
+
+def get_endpoints() -> list:
+    """
+    Get all endpoints of tie_athena/urls.py with the user and the data to call them with.
+    The trainee with the most learn checks (who still has unchecked learn aims) and its trainer are used.
+    Login and logout are not benchmarked, they depend on firebase.
+    :return: List of dicts with name, method, url, user and data of every endpoint
+    """
+    trainee_ids = list(CheckLearnAim.objects.filter(assigned_trainee__groups__name=get_group_name_student()).values(
+        'assigned_trainee_id').annotate(check_count=Count('id')).order_by('-check_count').values_list(
+        'assigned_trainee_id', flat=True))
+    if not trainee_ids:
+        raise CommandError('No trainee with learn checks found. Seed the database first (i.e. with generate_dataset).')
+    trainee = next((trainee for trainee in (User.objects.get(pk=trainee_id) for trainee_id in trainee_ids)
+                    if get_unchecked_learn_aims(trainee).exists()), None) or User.objects.get(pk=trainee_ids[0])
+    coach = trainee.assigned_trainer or User.objects.filter(groups__name=get_group_name_coach()).first()
+    if coach is None:
+        raise CommandError('No coach found. Seed the database first (i.e. with generate_dataset).')
+
+    checks = CheckLearnAim.objects.filter(assigned_trainee=trainee).order_by('id')
+    check = checks.first()
+    pending_check = checks.filter(is_approved=False).first() or check
+    unchecked_learn_aims = list(get_unchecked_learn_aims(trainee)[:10])
+    new_learn_aim = unchecked_learn_aims[0] if unchecked_learn_aims else check.closed_learn_check
+    learn_aim = LearnAim.objects.filter(
+        action_competence__education_ordinance=trainee.education_ordinance_id).order_by('id').first()
+    action_competence_id = learn_aim.action_competence_id
+    refresh_token = get_tokens_for_user(trainee)['refresh']
+    search_text = learn_aim.description.split()[0]
+
+    new_check = {'closed_learn_check_id': new_learn_aim.id, 'comment': 'Benchmark', 'semester': 8, 'close_stage': 1}
+    return [
+        {'name': 'learn-check tree (trainee)', 'method': 'get', 'url': '/api/v1/learn-check', 'user': trainee},
+        {'name': 'learn-check tree (coach)', 'method': 'get', 'url': f'/api/v1/learn-check?student-id={trainee.id}',
+         'user': coach},
+        {'name': 'learn-check create', 'method': 'post', 'url': '/api/v1/learn-check', 'user': trainee,
+         'data': new_check},
+        {'name': 'learn-check bulk create', 'method': 'post', 'url': '/api/v1/learn-check/bulk', 'user': trainee,
+         'data': [dict(new_check, closed_learn_check_id=aim.id) for aim in unchecked_learn_aims]},
+        {'name': 'learn-check update', 'method': 'patch', 'url': f'/api/v1/learn-check/{pending_check.id}',
+         'user': trainee, 'data': {'closed_learn_check_id': pending_check.closed_learn_check_id,
+                                   'comment': 'Benchmark', 'semester': pending_check.semester,
+                                   'close_stage': pending_check.close_stage}},
+        {'name': 'learn-check delete', 'method': 'delete', 'url': f'/api/v1/learn-check/{pending_check.id}',
+         'user': trainee},
+        {'name': 'chart list', 'method': 'get', 'url': '/api/v1/learn-check/chart/', 'user': trainee},
+        {'name': 'chart list (coach)', 'method': 'get', 'url': f'/api/v1/learn-check/chart/?student-id={trainee.id}',
+         'user': coach},
+        {'name': 'chart', 'method': 'get', 'url': f'/api/v1/learn-check/chart/{action_competence_id}/',
+         'user': trainee},
+        {'name': 'toggle todo', 'method': 'patch', 'url': f'/api/v1/learn-aim/{learn_aim.id}/toggle-todo/',
+         'user': trainee},
+        {'name': 'todos', 'method': 'get', 'url': '/api/v1/learn-aim/todos/', 'user': trainee},
+        {'name': 'todos bulk', 'method': 'patch', 'url': '/api/v1/learn-aim/todos/', 'user': trainee,
+         'data': {'learn_aims': [aim.id for aim in unchecked_learn_aims] or [learn_aim.id], 'marked_as_todo': True}},
+        {'name': 'learn-aim search', 'method': 'get', 'url': f'/api/v1/learn-aim/search/?q={search_text}',
+         'user': trainee},
+        {'name': 'checked-learn-aims list', 'method': 'get', 'url': '/api/v1/checked-learn-aims', 'user': trainee},
+        {'name': 'checked-learn-aims page', 'method': 'get', 'url': '/api/v1/checked-learn-aims?page_size=50',
+         'user': coach},
+        {'name': 'checked-learn-aims detail', 'method': 'get', 'url': f'/api/v1/checked-learn-aims/{check.id}',
+         'user': trainee},
+        {'name': 'checked-learn-aims pending', 'method': 'get', 'url': '/api/v1/checked-learn-aims/pending',
+         'user': coach},
+        {'name': 'checked-learn-aims approve', 'method': 'patch',
+         'url': f'/api/v1/checked-learn-aims/{pending_check.id}/approve', 'user': coach},
+        {'name': 'checked-learn-aims decline', 'method': 'delete',
+         'url': f'/api/v1/checked-learn-aims/{pending_check.id}/decline', 'user': coach},
+        {'name': 'checked-learn-aims bulk approve', 'method': 'patch',
+         'url': '/api/v1/checked-learn-aims/bulk-approve', 'user': coach, 'data': {'trainee': trainee.id}},
+        {'name': 'checked-learn-aims bulk decline', 'method': 'delete',
+         'url': '/api/v1/checked-learn-aims/bulk-decline', 'user': coach, 'data': {'trainee': trainee.id}},
+        {'name': 'checked-learn-aims of trainee', 'method': 'get',
+         'url': f'/api/v1/checked-learn-aims/trainee/{trainee.id}/', 'user': coach},
+        {'name': 'check-user-group', 'method': 'get', 'url': f'/api/v1/users/check-user-group?groupName={get_group_name_student()}',
+         'user': trainee},
+        {'name': 'trainees', 'method': 'get', 'url': '/api/v1/users/trainees/', 'user': coach},
+        {'name': 'trainees export', 'method': 'get', 'url': '/api/v1/users/trainees/export/', 'user': coach},
+        {'name': 'trainees export (csv)', 'method': 'get', 'url': '/api/v1/users/trainees/export/?export-format=csv',
+         'user': coach},
+        {'name': 'trainees dashboard', 'method': 'get', 'url': '/api/v1/users/trainees/dashboard/', 'user': coach},
+        {'name': 'trainee detail', 'method': 'get', 'url': f'/api/v1/users/trainee/{trainee.id}/', 'user': coach},
+        {'name': 'trainee learn-data', 'method': 'get', 'url': f'/api/v1/users/trainee/learn-data/{trainee.id}/',
+         'user': coach},
+        {'name': 'auth refresh', 'method': 'post', 'url': '/api/v1/auth/refresh', 'user': None,
+         'data': {'refresh': refresh_token}},
+        {'name': 'async learn-check tree', 'method': 'get', 'url': '/api/v1/async/learn-check', 'user': trainee},
+        {'name': 'async chart list', 'method': 'get', 'url': '/api/v1/async/learn-check/chart/', 'user': trainee},
+        {'name': 'async chart', 'method': 'get', 'url': f'/api/v1/async/learn-check/chart/{action_competence_id}/',
+         'user': trainee},
+        {'name': 'async trainee learn-data', 'method': 'get',
+         'url': f'/api/v1/async/users/trainee/learn-data/{trainee.id}/', 'user': coach},
+    ]
+
+
+def get_uncovered_url_names(endpoints: list) -> list:
+    """
+    Get the URL names of tie_athena/urls.py (without the admin) which none of the benchmarked endpoints resolves to.
+    :param endpoints: benchmarked endpoints (see get_endpoints)
+    :return: sorted List of the URL names which are not benchmarked
+    """
+    covered = {resolve(endpoint['url'].split('?')[0]).url_name for endpoint in endpoints}
+    return sorted(get_url_names(get_resolver().url_patterns) - covered - EXCLUDED_URL_NAMES)
+
+
+def get_url_names(patterns: list) -> set:
+    """
+    :param patterns: URL patterns of a URLconf
+    :return: Set of the names of the patterns and of the patterns of included URLconfs (except namespaced ones)
+    """
+    names = set()
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            if pattern.namespace is None:
+                names |= get_url_names(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            names.add(pattern.name)
+    return names
+
+
+def get_unchecked_learn_aims(trainee: User) -> QuerySet:
+    """
+    Get the learn aims of the trainee's education ordinance the trainee has not checked yet.
+    :param trainee: trainee to get the learn aims for
+    :return: QuerySet of learn aims ordered by id
+    """
+    return LearnAim.objects.filter(action_competence__education_ordinance=trainee.education_ordinance_id).exclude(
+        checklearnaim__assigned_trainee=trainee).order_by('id')
+
+
+def benchmark_endpoint(endpoint: dict, iterations: int, warmup: int) -> dict:
+    """
+    Call an endpoint repeatedly and measure its latency and SQL query count.
+    The requests are authenticated with a real access token, so the authentication is measured as well.
+    Every request which is not a GET is rolled back.
+    :param endpoint: dict with name, method, url, user and data of the endpoint
+    :param iterations: amount of measured requests
+    :param warmup: amount of unmeasured requests before the measurement
+    :return: dict with the status, latency percentiles (ms) and query count of the endpoint
+    """
+    client = APIClient()
+    if endpoint['user'] is not None:
+        client.credentials(HTTP_AUTHORIZATION='Bearer ' + get_tokens_for_user(endpoint['user'])['access'])
+
+    durations = []
+    for i in range(warmup + iterations):
+        query_counter = QueryCounter()
+        with transaction.atomic():
+            with connection.execute_wrapper(query_counter):
+                start = time.perf_counter()
+                response = getattr(client, endpoint['method'])(endpoint['url'], data=endpoint.get('data'),
+                                                                format='json')
+                if response.streaming:
+                    b''.join(response.streaming_content)
+                duration = (time.perf_counter() - start) * 1000
+            transaction.set_rollback(endpoint['method'] != 'get')
+        if i >= warmup:
+            durations.append(duration)
+
+    percentiles = statistics.quantiles(durations, n=100, method='inclusive') if len(durations) > 1 else durations * 99
+    return {
+        'method': endpoint['method'].upper(),
+        'url': endpoint['url'],
+        'status': response.status_code,
+        'queries': query_counter.count,
+        'mean_ms': round(statistics.fmean(durations), 3),
+        'p50_ms': round(percentiles[49], 3),
+        'p95_ms': round(percentiles[94], 3),
+        'p99_ms': round(percentiles[98], 3),
+        'max_ms': round(max(durations), 3),
+    }
+
+
+def compare_reports(path: str, report: dict) -> None:
+    """
+    Print the change of the p50 latency and the query count of every endpoint compared to a previous report.
+    :param path: path of the previous JSON report
+    :param report: current report
+    :return: None
+    """
+    with open(path) as file:
+        previous = json.load(file)['endpoints']
+
+    print(f'\nCompared to {path}:')
+    print(f'{"endpoint":<32}{"p50 before":>12}{"p50 now":>10}{"change":>9}{"queries":>12}')
+    for name, result in report['endpoints'].items():
+        if name not in previous:
+            continue
+        before = previous[name]
+        change = (result['p50_ms'] - before['p50_ms']) / before['p50_ms'] * 100 if before['p50_ms'] else 0
+        print(f'{name:<32}{before["p50_ms"]:>12.2f}{result["p50_ms"]:>10.2f}{change:>+8.1f}%'
+              f'{before["queries"]:>6} -> {result["queries"]}')
@@ -0,0 +1,75 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from rest_framework.renderers import JSONRenderer
+
+from learn_aim_check.lean_serializers import get_simple_learn_aims, project_checks, serialize_check, serialize_checks
+from learn_aim_check.models import CheckLearnAim
+from learn_aim_check.serializers import CheckLearnAimSerializer
+from services.learn_check_tree_service import with_check_relations
+
+
+class Command(BaseCommand):
+    """
+    Class for management-command "benchmark_serializers".
+    """
+    help = ('Compare the lean serializers with CheckLearnAimSerializer on the checks of the trainee with the most '
+            'learn checks: loading and serializing, and serializing only. The rendered JSON of both is compared.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20, help='Measured runs per variant (default: 20)')
+
+    def handle(self, *args, **options):
+        """
+        Handle command.
+        """
+        trainee = CheckLearnAim.objects.values('assigned_trainee_id').annotate(
+            check_count=Count('id')).order_by('-check_count').first()
+        if trainee is None:
+            raise CommandError('No learn checks found, run generate_dataset first.')
+        checks = CheckLearnAim.objects.filter(assigned_trainee_id=trainee['assigned_trainee_id']).order_by('id')
+
+        def load_drf():
+            return list(with_check_relations(checks))
+
+        def load_lean():
+            return list(project_checks(checks))
+
+        def serialize_drf(instances):
+            return CheckLearnAimSerializer(instances, many=True).data
+
+        drf = JSONRenderer().render(serialize_drf(load_drf()))
+        lean = JSONRenderer().render(serialize_checks(load_lean()))
+        if drf != lean:
+            raise CommandError('The lean serializers render a different JSON than CheckLearnAimSerializer.')
+        print(f'{trainee["check_count"]} checks, {len(lean)} bytes, identical JSON\n')
+
+        instances, rows = load_drf(), load_lean()
+        learn_aims = get_simple_learn_aims({row['closed_learn_check_id'] for row in rows})
+        variants = {
+            'drf load + serialize': lambda: serialize_drf(load_drf()),
+            'lean load + serialize': lambda: serialize_checks(load_lean()),
+            'drf serialize only': lambda: serialize_drf(instances),
+            'lean serialize only': lambda: [serialize_check(row, learn_aims[row['closed_learn_check_id']])
+                                            for row in rows],
+        }
+        for name, variant in variants.items():
+            timings = measure(variant, options['iterations'])
+            print(f'{name:<24}{statistics.median(timings):>10.2f} ms (median){min(timings):>10.2f} ms (min)')
+
+
+def measure(function, iterations: int) -> list:
+    """
+    :param function: function to measure
+    :param iterations: amount of measured runs (after one warm-up run)
+    :return: List of durations in milliseconds
+    """
+    function()
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
@@ -0,0 +1,207 @@
+import datetime
+import random
+
+from django.contrib.auth.models import Group
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from learn_aim_check.models import ActionCompetence, CheckLearnAim, LearnAim, Tag
+from services.curriculum_cache_service import bump_curriculum_version
+from services.group_service import clear_group_cache, get_group_name_coach, get_group_name_student
+from services.progress_service import rebuild_trainee_progress
+from users.models import EducationOrdinance, User
+
+# Approximate length of a semester, used to spread the creation dates of the learn checks
+SEMESTER_LENGTH = datetime.timedelta(days=182)
+
+
+class Command(BaseCommand):
+    """
+    Class for management-command "generate_dataset".
+    """
+    help = ('Generate a synthetic dataset (education ordinances, action competences, learn aims, tags, trainers, '
+            'trainees, learn checks and to-dos) with bulk inserts. Meant for benchmarks, not for production.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prefix', default='bench', help='Prefix of all generated names (default: bench)')
+        parser.add_argument('--ordinances', type=int, default=2, help='Education ordinances (default: 2)')
+        parser.add_argument('--competences', type=int, default=8,
+                            help='Action competences per education ordinance (default: 8)')
+        parser.add_argument('--learn-aims', type=int, default=10,
+                            help='Learn aims per action competence (default: 10)')
+        parser.add_argument('--tags', type=int, default=30, help='Tags (default: 30)')
+        parser.add_argument('--trainers', type=int, default=20, help='Trainers (default: 20)')
+        parser.add_argument('--trainees', type=int, default=500, help='Trainees (default: 500)')
+        parser.add_argument('--todo-ratio', type=float, default=0.05,
+                            help='Share of the learn aims a trainee marks as to-do (default: 0.05)')
+        parser.add_argument('--seed', type=int, default=42, help='Seed of the random generator (default: 42)')
+
+    def handle(self, *args, **options):
+        """
+        Handle command.
+        """
+        prefix = options['prefix']
+        if EducationOrdinance.objects.filter(title__startswith=f'{prefix}-').exists():
+            raise CommandError(f'A dataset with the prefix "{prefix}" already exists. Use another --prefix.')
+
+        random.seed(options['seed'])
+        with transaction.atomic():
+            print('Creating curriculum.')
+            ordinances, learn_aims_by_ordinance = create_curriculum(
+                prefix, options['ordinances'], options['competences'], options['learn_aims'], options['tags'])
+
+            print('Creating trainers and trainees.')
+            trainees = create_users(prefix, ordinances, options['trainers'], options['trainees'])
+
+            print('Creating learn checks and to-dos.')
+            check_count = create_learn_checks(trainees, learn_aims_by_ordinance)
+            todo_count = create_todos(trainees, learn_aims_by_ordinance, options['todo_ratio'])
+
+            print('Building trainee progress.')
+            rebuild_trainee_progress([trainee.id for trainee in trainees])
+
+        # bulk inserts do not send the signals which invalidate the caches
+        bump_curriculum_version()
+        clear_group_cache()
+        print(f'Dataset "{prefix}" generated successfully: {len(ordinances)} education ordinances, '
+              f'{sum(len(learn_aims) for learn_aims in learn_aims_by_ordinance.values())} learn aims, '
+              f'{len(trainees)} trainees, {check_count} learn checks, {todo_count} to-dos.')
+
+
+def create_curriculum(prefix: str, ordinance_count: int, competence_count: int, learn_aim_count: int,
+                      tag_count: int) -> tuple:
+    """
+    Create the education ordinances with their action competences, learn aims and tags.
+    :param prefix: prefix of all generated names
+    :param ordinance_count: amount of education ordinances
+    :param competence_count: amount of action competences per education ordinance
+    :param learn_aim_count: amount of learn aims per action competence
+    :param tag_count: amount of tags
+    :return: tuple of the education ordinances and a dict with the learn aims by education ordinance id
+    """
+    ordinances = EducationOrdinance.objects.bulk_create([
+        EducationOrdinance(title=f'{prefix}-ordinance-{i}') for i in range(ordinance_count)
+    ])
+    tags = Tag.objects.bulk_create([Tag(tag_name=f'{prefix}-tag-{i}') for i in range(tag_count)])
+
+    competences = ActionCompetence.objects.bulk_create([
+        ActionCompetence(identification=f'{chr(65 + c % 26)}{c // 26 + 1}', title=f'{prefix} competence {o}.{c}',
+                         description=f'Description of the action competence {o}.{c}.')
+        for o in range(ordinance_count)
+        for c in range(competence_count)
+    ])
+    ActionCompetence.education_ordinance.through.objects.bulk_create([
+        ActionCompetence.education_ordinance.through(actioncompetence_id=competence.id,
+                                                     educationordinance_id=ordinances[i // competence_count].id)
+        for i, competence in enumerate(competences)
+    ])
+
+    learn_aims = LearnAim.objects.bulk_create([
+        LearnAim(action_competence=competence, identification=str(a + 1),
+                 description=f'Description of the learn aim {competence.identification}.{a + 1}.',
+                 taxonomy_level=random.randint(1, 6), example_text='Example')
+        for competence in competences
+        for a in range(learn_aim_count)
+    ], batch_size=1000)
+    if tags:
+        LearnAim.tags.through.objects.bulk_create([
+            LearnAim.tags.through(learnaim_id=learn_aim.id, tag_id=tag.id)
+            for learn_aim in learn_aims
+            for tag in random.sample(tags, min(len(tags), random.randint(1, 3)))
+        ], batch_size=1000)
+
+    learn_aims_per_ordinance = competence_count * learn_aim_count
+    learn_aims_by_ordinance = {
+        ordinance.id: learn_aims[i * learn_aims_per_ordinance:(i + 1) * learn_aims_per_ordinance]
+        for i, ordinance in enumerate(ordinances)
+    }
+    return ordinances, learn_aims_by_ordinance
+
+
+def create_users(prefix: str, ordinances: list, trainer_count: int, trainee_count: int) -> list:
+    """
+    Create the trainers (coaches) and the trainees (students), every trainee is assigned to a trainer.
+    :param prefix: prefix of all generated names
+    :param ordinances: education ordinances to spread the trainees over
+    :param trainer_count: amount of trainers
+    :param trainee_count: amount of trainees
+    :return: List of the created trainees
+    """
+    coach_group, _ = Group.objects.get_or_create(name=get_group_name_coach())
+    student_group, _ = Group.objects.get_or_create(name=get_group_name_student())
+
+    trainers = User.objects.bulk_create([
+        User(email=f'{prefix}-trainer-{i}@example.com', firstname='Trainer', lastname=str(i),
+             firebase_uid=f'{prefix}-trainer-{i}', is_staff=True)
+        for i in range(trainer_count)
+    ])
+    trainees = User.objects.bulk_create([
+        User(email=f'{prefix}-trainee-{i}@example.com', firstname='Trainee', lastname=str(i),
+             firebase_uid=f'{prefix}-trainee-{i}', education_ordinance=random.choice(ordinances),
+             assigned_trainer=trainers[i % len(trainers)] if trainers else None)
+        for i in range(trainee_count)
+    ], batch_size=1000)
+
+    User.groups.through.objects.bulk_create([
+        User.groups.through(user_id=user.id, group_id=group.id)
+        for users, group in ((trainers, coach_group), (trainees, student_group))
+        for user in users
+    ], batch_size=1000)
+    return trainees
+
+
+def create_learn_checks(trainees: list, learn_aims_by_ordinance: dict) -> int:
+    """
+    Create the learn checks of the trainees.
+    Every trainee is in a random semester and has checked a share of the learn aims that grows with the semester.
+    The checks follow the rules of the validator: stages start at 1, lower stages are approved and the semester
+    never decreases with the stage.
+    :param trainees: trainees to create the learn checks for
+    :param learn_aims_by_ordinance: dict with the learn aims by education ordinance id
+    :return: amount of created learn checks
+    """
+    checks = []
+    for trainee in trainees:
+        current_semester = random.randint(1, 8)
+        learn_aims = learn_aims_by_ordinance[trainee.education_ordinance_id]
+        for learn_aim in random.sample(learn_aims, int(len(learn_aims) * current_semester / 8)):
+            semester = random.randint(1, current_semester)
+            for stage in range(1, random.randint(1, 3) + 1):
+                checks.append(CheckLearnAim(
+                    assigned_trainee=trainee, closed_learn_check=learn_aim, comment=f'Stage {stage} reached.',
+                    semester=semester, close_stage=stage, approved_by=None, is_approved=False))
+                semester = random.randint(semester, current_semester)
+            # all stages but the highest are approved, the highest one mostly too
+            for check in checks[-stage:-1]:
+                check.is_approved, check.approved_by_id = True, trainee.assigned_trainer_id
+            if random.random() < 0.7:
+                checks[-1].is_approved, checks[-1].approved_by_id = True, trainee.assigned_trainer_id
+
+    CheckLearnAim.objects.bulk_create(checks, batch_size=1000)
+
+    # spread the creation dates over the semesters (created_at is set to now on insert)
+    now = timezone.now()
+    for semester in range(1, 9):
+        CheckLearnAim.objects.filter(assigned_trainee__in=trainees, semester=semester).update(
+            created_at=now - (8 - semester) * SEMESTER_LENGTH)
+    return len(checks)
+
+
+def create_todos(trainees: list, learn_aims_by_ordinance: dict, todo_ratio: float) -> int:
+    """
+    Mark a random share of the learn aims of every trainee as to-do.
+    :param trainees: trainees to create the to-dos for
+    :param learn_aims_by_ordinance: dict with the learn aims by education ordinance id
+    :param todo_ratio: share of the learn aims to mark as to-do
+    :return: amount of created to-dos
+    """
+    todo_through = LearnAim.marked_as_todo.through
+    todos = [
+        todo_through(learnaim_id=learn_aim.id, user_id=trainee.id)
+        for trainee in trainees
+        for learn_aim in random.sample(learn_aims_by_ordinance[trainee.education_ordinance_id],
+                                       int(len(learn_aims_by_ordinance[trainee.education_ordinance_id]) * todo_ratio))
+    ]
+    todo_through.objects.bulk_create(todos, batch_size=1000)
+    return len(todos)
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from services.progress_service import rebuild_trainee_progress
+from services.response_cache_service import invalidate_all_responses, invalidate_user_responses
+
+
+class Command(BaseCommand):
+    """
+    Class for management-command "rebuild_trainee_progress".
+    """
+    help = 'Rebuild the trainee progress projection from the learn checks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--trainee', type=int, action='append', dest='trainee_ids',
+                            help='Only rebuild the progress of the trainee with this id (can be repeated)')
+
+    def handle(self, *args, **options):
+        """
+        Handle command.
+        """
+        with transaction.atomic():
+            rebuild_trainee_progress(options['trainee_ids'])
+            if options['trainee_ids'] is None:
+                invalidate_all_responses()
+            else:
+                invalidate_user_responses(options['trainee_ids'])
+        print('Trainee progress rebuilt successfully.')
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from services.response_cache_service import get_response_cache_stats, is_response_cache_enabled, \
+    reset_response_cache_stats
+
+
+class Command(BaseCommand):
+    """
+    Class for management-command "response_cache_stats".
+    """
+    help = 'Print the hits and misses of the response cache by endpoint.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Reset the counters after printing them')
+
+    def handle(self, *args, **options):
+        """
+        Handle command.
+        """
+        if not is_response_cache_enabled():
+            print('The response cache is disabled (RESPONSE_CACHE_TIMEOUT=0).')
+
+        print(f'{"endpoint":<28}{"hits":>10}{"misses":>10}{"hit rate":>10}')
+        for endpoint, stats in get_response_cache_stats().items():
+            requests = stats['hits'] + stats['misses']
+            hit_rate = f'{stats["hits"] / requests:.1%}' if requests else '-'
+            print(f'{endpoint:<28}{stats["hits"]:>10}{stats["misses"]:>10}{hit_rate:>10}')
+
+        if options['reset']:
+            reset_response_cache_stats()
+            print('Counters reset.')
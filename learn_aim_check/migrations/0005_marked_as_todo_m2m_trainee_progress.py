@@ -0,0 +1,85 @@
+# Generated by Django 5.0 on 2026-10-18 14:59
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def build_trainee_progress(apps, schema_editor):
+    CheckLearnAim = apps.get_model('learn_aim_check', 'CheckLearnAim')
+    TraineeProgress = apps.get_model('learn_aim_check', 'TraineeProgress')
+    TraineeCompetenceProgress = apps.get_model('learn_aim_check', 'TraineeCompetenceProgress')
+
+    TraineeProgress.objects.bulk_create([
+        TraineeProgress(trainee_id=row['assigned_trainee_id'], learn_aim_id=row['closed_learn_check_id'],
+                        highest_stage=row['highest_stage'], approved_stage=row['approved_stage'],
+                        pending_count=row['pending_count'])
+        for row in CheckLearnAim.objects.values('assigned_trainee_id', 'closed_learn_check_id').annotate(
+            highest_stage=Max('close_stage'),
+            approved_stage=Coalesce(Max('close_stage', filter=Q(is_approved=True)), Value(0)),
+            pending_count=Count('id', filter=Q(is_approved=False)),
+        ).order_by()
+    ], batch_size=1000)
+    TraineeCompetenceProgress.objects.bulk_create([
+        TraineeCompetenceProgress(trainee_id=row['trainee_id'],
+                                  action_competence_id=row['learn_aim__action_competence_id'],
+                                  closed_count=row['closed_count'], pending_count=row['pending_count'])
+        for row in TraineeProgress.objects.values('trainee_id', 'learn_aim__action_competence_id').annotate(
+            closed_count=Count('id', filter=Q(approved_stage__gte=3)),
+            pending_count=Sum('pending_count'),
+        ).order_by()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learn_aim_check', '0004_remove_checklearnaim_marked_as_todo_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='learnaim',
+            name='marked_as_todo',
+        ),
+        migrations.CreateModel(
+            name='TraineeCompetenceProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('closed_count', models.IntegerField(default=0)),
+                ('pending_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('action_competence', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='learn_aim_check.actioncompetence')),
+                ('trainee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='competence_progress', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TraineeProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('highest_stage', models.IntegerField(default=0)),
+                ('approved_stage', models.IntegerField(default=0)),
+                ('pending_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('learn_aim', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='learn_aim_check.learnaim')),
+                ('trainee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='learn_aim_progress', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='learnaim',
+            name='marked_as_todo',
+            field=models.ManyToManyField(blank=True, related_name='marked_as_todo', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='traineecompetenceprogress',
+            constraint=models.UniqueConstraint(fields=('trainee', 'action_competence'), name='unique_trainee_competence_progress'),
+        ),
+        migrations.AddConstraint(
+            model_name='traineeprogress',
+            constraint=models.UniqueConstraint(fields=('trainee', 'learn_aim'), name='unique_trainee_progress'),
+        ),
+        migrations.RunPython(build_trainee_progress, migrations.RunPython.noop),
+    ]
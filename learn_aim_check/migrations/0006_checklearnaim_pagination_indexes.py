@@ -0,0 +1,23 @@
+# Generated by Django 5.0 on 2026-10-18 15:03
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learn_aim_check', '0005_marked_as_todo_m2m_trainee_progress'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='checklearnaim',
+            index=models.Index(fields=['-created_at', '-id'], name='check_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='checklearnaim',
+            index=models.Index(fields=['assigned_trainee', '-created_at', '-id'], name='check_trainee_created_idx'),
+        ),
+    ]
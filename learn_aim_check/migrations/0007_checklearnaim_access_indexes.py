@@ -0,0 +1,76 @@
+# Generated by Django 5.0 on 2026-10-18 15:05
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def remove_duplicate_checks(apps, schema_editor):
+    """
+    Keep one check per (trainee, learn aim, stage) before the unique constraint is added.
+    Approved checks are kept over pending ones, otherwise the oldest check is kept.
+    """
+    CheckLearnAim = apps.get_model('learn_aim_check', 'CheckLearnAim')
+    TraineeProgress = apps.get_model('learn_aim_check', 'TraineeProgress')
+    TraineeCompetenceProgress = apps.get_model('learn_aim_check', 'TraineeCompetenceProgress')
+
+    duplicates = CheckLearnAim.objects.values('assigned_trainee_id', 'closed_learn_check_id', 'close_stage').annotate(
+        check_count=Count('id')).filter(check_count__gt=1).order_by()
+    affected_trainee_ids = set()
+    for duplicate in duplicates:
+        check_ids = list(CheckLearnAim.objects.filter(
+            assigned_trainee_id=duplicate['assigned_trainee_id'],
+            closed_learn_check_id=duplicate['closed_learn_check_id'],
+            close_stage=duplicate['close_stage'],
+        ).order_by('-is_approved', 'id').values_list('id', flat=True))
+        CheckLearnAim.objects.filter(id__in=check_ids[1:]).delete()
+        affected_trainee_ids.add(duplicate['assigned_trainee_id'])
+
+    if not affected_trainee_ids:
+        return
+
+    # rebuild the progress projection of the affected trainees
+    TraineeProgress.objects.filter(trainee_id__in=affected_trainee_ids).delete()
+    TraineeProgress.objects.bulk_create([
+        TraineeProgress(trainee_id=row['assigned_trainee_id'], learn_aim_id=row['closed_learn_check_id'],
+                        highest_stage=row['highest_stage'], approved_stage=row['approved_stage'],
+                        pending_count=row['pending_count'])
+        for row in CheckLearnAim.objects.filter(assigned_trainee_id__in=affected_trainee_ids).values(
+            'assigned_trainee_id', 'closed_learn_check_id').annotate(
+            highest_stage=Max('close_stage'),
+            approved_stage=Coalesce(Max('close_stage', filter=Q(is_approved=True)), Value(0)),
+            pending_count=Count('id', filter=Q(is_approved=False)),
+        ).order_by()
+    ], batch_size=1000)
+    TraineeCompetenceProgress.objects.filter(trainee_id__in=affected_trainee_ids).delete()
+    TraineeCompetenceProgress.objects.bulk_create([
+        TraineeCompetenceProgress(trainee_id=row['trainee_id'],
+                                  action_competence_id=row['learn_aim__action_competence_id'],
+                                  closed_count=row['closed_count'], pending_count=row['pending_count'])
+        for row in TraineeProgress.objects.filter(trainee_id__in=affected_trainee_ids).values(
+            'trainee_id', 'learn_aim__action_competence_id').annotate(
+            closed_count=Count('id', filter=Q(approved_stage__gte=3)),
+            pending_count=Sum('pending_count'),
+        ).order_by()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learn_aim_check', '0006_checklearnaim_pagination_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='checklearnaim',
+            index=models.Index(condition=models.Q(('is_approved', False)), fields=['assigned_trainee', 'closed_learn_check', 'close_stage'], name='check_pending_idx'),
+        ),
+        migrations.RunPython(remove_duplicate_checks, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='checklearnaim',
+            constraint=models.UniqueConstraint(fields=('assigned_trainee', 'closed_learn_check', 'close_stage'), name='unique_trainee_learn_aim_stage'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0 on 2026-10-18 15:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learn_aim_check', '0007_checklearnaim_access_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='checklearnaim',
+            index=models.Index(condition=models.Q(('is_approved', False)), fields=['created_at', 'id'], name='check_pending_created_idx'),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.0 on 2026-10-18 18:40
+
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models.functions import Upper
+
+# Text search configuration and fields of the full-text index (see services/learn_aim_search_service.py)
+SEARCH_CONFIG = 'german'
+SEARCH_VECTOR_FIELDS = ('description', 'example_text')
+
+
+def get_search_indexes(apps) -> list:
+    """
+    GIN indexes of the learn aim search: the full-text index of the learn aims and trigram indexes on the upper
+    case text of all searched fields (icontains filters are UPPER(...) LIKE UPPER(...) on Postgres).
+    """
+    LearnAim = apps.get_model('learn_aim_check', 'LearnAim')
+    ActionCompetence = apps.get_model('learn_aim_check', 'ActionCompetence')
+    Tag = apps.get_model('learn_aim_check', 'Tag')
+    return [
+        (LearnAim, GinIndex(SearchVector(*SEARCH_VECTOR_FIELDS, config=SEARCH_CONFIG),
+                            name='learn_aim_search_vector_idx')),
+        (LearnAim, GinIndex(OpClass(Upper('description'), name='gin_trgm_ops'), name='learn_aim_description_trgm_idx')),
+        (LearnAim, GinIndex(OpClass(Upper('example_text'), name='gin_trgm_ops'), name='learn_aim_example_trgm_idx')),
+        (ActionCompetence, GinIndex(OpClass(Upper('title'), name='gin_trgm_ops'), name='competence_title_trgm_idx')),
+        (Tag, GinIndex(OpClass(Upper('tag_name'), name='gin_trgm_ops'), name='tag_name_trgm_idx')),
+    ]
+
+
+def add_search_indexes(apps, schema_editor):
+    """
+    Add the trigram extension and the search indexes on Postgres. Other databases (i.e. SQLite for local testing)
+    search without indexes.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for model, index in get_search_indexes(apps):
+        schema_editor.add_index(model, index)
+
+
+def remove_search_indexes(apps, schema_editor):
+    """
+    Remove the search indexes on Postgres (the trigram extension is kept, other objects may use it).
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for model, index in get_search_indexes(apps):
+        schema_editor.remove_index(model, index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learn_aim_check', '0008_checklearnaim_pending_queue_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_search_indexes, remove_search_indexes),
+    ]
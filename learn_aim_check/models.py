@@ -83,6 +83,24 @@ class CheckLearnAim(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # cursor pagination of all checks and of the checks of one trainee (newest first)
+            models.Index(fields=['-created_at', '-id'], name='check_created_idx'),
+            models.Index(fields=['assigned_trainee', '-created_at', '-id'], name='check_trainee_created_idx'),
+            # checks waiting for the approval of a coach
+            models.Index(fields=['assigned_trainee', 'closed_learn_check', 'close_stage'],
+                         condition=models.Q(is_approved=False), name='check_pending_idx'),
+            # approval queue of the coaches (oldest first)
+            models.Index(fields=['created_at', 'id'], condition=models.Q(is_approved=False),
+                         name='check_pending_created_idx'),
+        ]
+        constraints = [
+            # a trainee checks every stage of a learn aim once, also serves the (trainee, learn aim) lookups
+            models.UniqueConstraint(fields=['assigned_trainee', 'closed_learn_check', 'close_stage'],
+                                    name='unique_trainee_learn_aim_stage'),
+        ]
+
     def __str__(self) -> str:
         """
         Returns the identification of the learn aim.
@@ -90,3 +108,55 @@ class CheckLearnAim(models.Model):
         :return: i.e. A1.1 - Create a database (string)
         """
         return self.assigned_trainee.email + " - " + self.closed_learn_check.action_competence.identification + "." + self.closed_learn_check.identification + ": " + self.closed_learn_check.description
+
+
+class TraineeProgress(models.Model):
+    """
+    Represents the progress of a trainee on a learn aim.
+    Projection of the CheckLearnAim rows, maintained by the progress service.
+    """
+    trainee = models.ForeignKey(User, on_delete=models.CASCADE, related_name='learn_aim_progress')
+    learn_aim = models.ForeignKey(LearnAim, on_delete=models.CASCADE)
+    highest_stage = models.IntegerField(default=0)
+    approved_stage = models.IntegerField(default=0)
+    pending_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['trainee', 'learn_aim'], name='unique_trainee_progress'),
+        ]
+
+    def __str__(self) -> str:
+        """
+        Returns the trainee and the approved stage of the learn aim.
+        :param self: TraineeProgress object
+        :return: i.e. 12 - 7: 2 (string)
+        """
+        return str(self.trainee_id) + " - " + str(self.learn_aim_id) + ": " + str(self.approved_stage)
+
+
+class TraineeCompetenceProgress(models.Model):
+    """
+    Represents the progress of a trainee on an action competence.
+    Projection of the TraineeProgress rows, maintained by the progress service.
+    """
+    trainee = models.ForeignKey(User, on_delete=models.CASCADE, related_name='competence_progress')
+    action_competence = models.ForeignKey(ActionCompetence, on_delete=models.CASCADE)
+    closed_count = models.IntegerField(default=0)
+    pending_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['trainee', 'action_competence'],
+                                    name='unique_trainee_competence_progress'),
+        ]
+
+    def __str__(self) -> str:
+        """
+        Returns the trainee and the amount of closed learn aims of the action competence.
+        :param self: TraineeCompetenceProgress object
+        :return: i.e. 12 - 3: 5 (string)
+        """
+        return str(self.trainee_id) + " - " + str(self.action_competence_id) + ": " + str(self.closed_count)
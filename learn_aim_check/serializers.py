@@ -2,6 +2,9 @@ from rest_framework import serializers
 
 from learn_aim_check.models import ActionCompetence, CheckLearnAim, LearnAim, Tag
 from services.group_service import is_user_coach
+from services.profiling_service import ProfiledSerializerMixin
+from services.progress_service import get_closed_count
+from services.sparse_fieldset_service import SparseFieldsetSerializerMixin
 from users.models import User
 from users.serializers import UserSerializer
 
@@ -17,7 +20,7 @@ class TagSerializer(serializers.ModelSerializer):
         exclude = ['created_at', 'updated_at']
 
 
-class LearnAimSerializer(serializers.ModelSerializer):
+class LearnAimSerializer(ProfiledSerializerMixin, serializers.ModelSerializer):
     """
     Serializes the LearnAim model.
 
@@ -47,6 +50,9 @@ class LearnAimSerializer(serializers.ModelSerializer):
         :param instance: LearnAim object from the database
         :return: List of all completed learn aims for the current learn aim
         """
+        if hasattr(instance, 'trainee_checks'):
+            return CheckLearnAimSerializer(instance.trainee_checks, many=True, context=self.context).data
+
         assigned_trainee = self.context['request'].user
         if is_user_coach(self.context['request'].user) and 'student_id' in self.context and User.objects.filter(
                 id=self.context['student_id']).exists():
@@ -64,6 +70,8 @@ class LearnAimSerializer(serializers.ModelSerializer):
         :param instance: LearnAim object from the database.
         :return: True if the learn aim is marked as to-do, otherwise False.
         """
+        if hasattr(instance, 'is_marked_as_todo'):
+            return instance.is_marked_as_todo
         if 'student_id' in self.context:
             return instance.marked_as_todo.filter(id=self.context['student_id']).exists()
         return instance.marked_as_todo.filter(id=self.context['request'].user.id).exists()
@@ -86,7 +94,27 @@ class SimpleLearnAimSerializer(serializers.ModelSerializer):
         exclude = ['created_at', 'updated_at', 'identification', 'action_competence']
 
 
-class CheckLearnAimSerializer(serializers.ModelSerializer):
+class LearnAimSearchSerializer(serializers.ModelSerializer):
+    """
+    Serializes a learn aim of the search results.
+
+    Returns fields such as name, description, taxonomy_level, tags and the action competence.
+
+    :param tags: Tags associated with the learn aim.
+    :param name: Read-only field for the name of the learn aim.
+    :param action_competence_title: Read-only field for the title of the action competence.
+    """
+    tags = TagSerializer(many=True)
+    name = serializers.CharField(source='__str__', read_only=True)
+    action_competence_title = serializers.CharField(source='action_competence.title', read_only=True)
+
+    class Meta:
+        model = LearnAim
+        fields = ['id', 'name', 'description', 'taxonomy_level', 'example_text', 'tags', 'action_competence',
+                  'action_competence_title']
+
+
+class CheckLearnAimSerializer(ProfiledSerializerMixin, serializers.ModelSerializer):
     """
     Serializes the CheckLearnAim model.
 
@@ -118,7 +146,83 @@ class CheckLearnAimSerializer(serializers.ModelSerializer):
         }
 
 
-class ActionCompetenceSerializer(serializers.ModelSerializer):
+class PendingCheckLearnAimSerializer(ProfiledSerializerMixin, serializers.ModelSerializer):
+    """
+    Serializes a learn aim check of the approval queue.
+    Only uses the trainee and the learn aim with its action competence, so a page is loaded with a single query.
+
+    :param assigned_trainee: Trainee who checked the learn aim.
+    :param learn_aim_id: Primary key of the checked learn aim.
+    :param learn_aim: Name of the checked learn aim.
+    :param action_competence_id: Primary key of the action competence of the learn aim.
+    """
+    assigned_trainee = UserSerializer(read_only=True)
+    learn_aim_id = serializers.IntegerField(source='closed_learn_check_id', read_only=True)
+    learn_aim = serializers.CharField(source='closed_learn_check.__str__', read_only=True)
+    action_competence_id = serializers.IntegerField(source='closed_learn_check.action_competence_id',
+                                                    read_only=True)
+
+    class Meta:
+        model = CheckLearnAim
+        fields = ['id', 'assigned_trainee', 'learn_aim_id', 'learn_aim', 'action_competence_id', 'comment',
+                  'semester', 'close_stage', 'created_at']
+
+
+class BulkCheckLearnAimSerializer(serializers.Serializer):
+    """
+    Validates the fields of a single learn check of a bulk request.
+    The learn aim is only validated as an id, its existence is checked against the education ordinance.
+
+    :param closed_learn_check_id: Primary key of the closed learn aim.
+    :param comment: Comment about the learn aim check.
+    :param semester: Semester in which the learn aim was checked.
+    :param close_stage: Stage at which the learn aim was closed.
+    """
+    closed_learn_check_id = serializers.IntegerField(required=True)
+    comment = serializers.CharField(max_length=254, required=True)
+    semester = serializers.IntegerField(min_value=1, max_value=8, required=True)
+    close_stage = serializers.IntegerField(min_value=1, max_value=3, required=True)
+
+
+class BulkCheckSelectionSerializer(serializers.Serializer):
+    """
+    Validates the selection of learn checks for bulk approve and decline.
+    At least one of the fields is required, all given fields have to match.
+
+    :param ids: Primary keys of the learn checks.
+    :param trainee: Primary key of the trainee.
+    :param action_competence: Primary key of the action competence of the learn aims.
+    :param stage: Close stage of the learn checks.
+    """
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, max_length=1000)
+    trainee = serializers.IntegerField(required=False)
+    action_competence = serializers.IntegerField(required=False)
+    stage = serializers.IntegerField(min_value=1, max_value=3, required=False)
+
+    def validate(self, attrs):
+        """
+        Ensure that at least one filter is given.
+
+        :param attrs: The validated fields.
+        :return: The validated fields.
+        """
+        if not attrs:
+            raise serializers.ValidationError('Please supply ids, trainee, action_competence or stage.')
+        return attrs
+
+
+class BulkTodoSerializer(serializers.Serializer):
+    """
+    Validates a bulk change of to-dos.
+
+    :param learn_aims: Primary keys of the learn aims.
+    :param marked_as_todo: True to mark the learn aims as to-do, False to unmark them.
+    """
+    learn_aims = serializers.ListField(child=serializers.IntegerField(), min_length=1, max_length=1000)
+    marked_as_todo = serializers.BooleanField(required=True)
+
+
+class ActionCompetenceSerializer(ProfiledSerializerMixin, serializers.ModelSerializer):
     """
     Serializes the ActionCompetence model. Returns all fields such as identification, title, education_ordinance,
     description, associated_modules_vocational_school, associated_modules_overboard_course, created_at, updated_at
@@ -137,14 +241,17 @@ class ActionCompetenceSerializer(serializers.ModelSerializer):
         :param instance: ActionCompetence object from the database
         :return: List of all learn aims for the current action competence
         """
-        learn_aims = LearnAim.objects.filter(action_competence=instance).order_by('identification')
+        if hasattr(instance, 'prefetched_learn_aims'):
+            learn_aims = instance.prefetched_learn_aims
+        else:
+            learn_aims = LearnAim.objects.filter(action_competence=instance).order_by('identification')
         return LearnAimSerializer(learn_aims, many=True, context=self.context).data
 
 
-class DiagramSerializer(serializers.Serializer):
+class DiagramSerializer(ProfiledSerializerMixin, SparseFieldsetSerializerMixin, serializers.Serializer):
     """
     Serializer for the chart.
-    Returns all fields such as id, name, closed, total
+    Returns all fields such as id, name, closed, total (or the ones selected with the field_selection in the context)
     """
     id = serializers.IntegerField(source='pk')
     name = serializers.CharField(source='__str__')
@@ -161,6 +268,8 @@ class DiagramSerializer(serializers.Serializer):
         :param instance: ActionCompetence object from the database
         :return: Total amount of learn aims for the current action competence
         """
+        if hasattr(instance, 'learn_aim_count'):
+            return instance.learn_aim_count
         return LearnAim.objects.filter(action_competence=instance).count()
 
     def get_closed(self, instance) -> int:
@@ -169,12 +278,12 @@ class DiagramSerializer(serializers.Serializer):
         :param instance: ActionCompetence object from the database
         :return: Total amount of approved learn aims for the current action competence
         """
-        return CheckLearnAim.objects.filter(closed_learn_check__action_competence=instance,
-                                            assigned_trainee=self.context['request'].user, close_stage=3,
-                                            is_approved=True).count()
+        if hasattr(instance, 'closed_count'):
+            return instance.closed_count
+        return get_closed_count(self.context['request'].user, instance)
 
 
-class ToggleTodoSerializer(serializers.ModelSerializer):
+class ToggleTodoSerializer(ProfiledSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for toggling the marked_as_todo field of a LearnAim instance.
 
@@ -201,7 +310,7 @@ class ToggleTodoSerializer(serializers.ModelSerializer):
         return instance
 
 
-class UserLearnDataSerializer(serializers.ModelSerializer):
+class UserLearnDataSerializer(ProfiledSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for the User model, including related learn aims and tags.
 
@@ -222,7 +331,10 @@ class UserLearnDataSerializer(serializers.ModelSerializer):
         :param obj: The User instance for which to retrieve learn aims.
         :return: A list of serialized learn aims.
         """
-        learn_aims = LearnAim.objects.filter(
-            checklearnaim__assigned_trainee=obj
-        ).distinct()
+        if hasattr(obj, 'checked_learn_aims'):
+            learn_aims = obj.checked_learn_aims
+        else:
+            learn_aims = LearnAim.objects.filter(
+                checklearnaim__assigned_trainee=obj
+            ).distinct()
         return LearnAimSerializer(learn_aims, many=True, context={'request': self.context['request']}).data
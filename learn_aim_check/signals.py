@@ -0,0 +1,54 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from learn_aim_check.models import ActionCompetence, CheckLearnAim, LearnAim, Tag
+from services.curriculum_cache_service import bump_curriculum_version
+from services.response_cache_service import invalidate_todo_responses, invalidate_user_responses
+
+
+@receiver([post_save, post_delete], sender=ActionCompetence)
+@receiver([post_save, post_delete], sender=LearnAim)
+@receiver([post_save, post_delete], sender=Tag)
+def curriculum_changed(sender, **kwargs):
+    """
+    Invalidate the cached curricula when an action competence, learn aim or tag is saved or deleted.
+    """
+    bump_curriculum_version()
+
+
+@receiver(m2m_changed, sender=ActionCompetence.education_ordinance.through)
+@receiver(m2m_changed, sender=LearnAim.tags.through)
+def curriculum_relation_changed(sender, action, **kwargs):
+    """
+    Invalidate the cached curricula when the education ordinances of an action competence or the tags of a
+    learn aim are changed.
+    """
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_curriculum_version()
+
+
+@receiver([post_save, post_delete], sender=CheckLearnAim)
+def learn_check_changed(sender, instance, **kwargs):
+    """
+    Invalidate the cached responses of the trainee when a learn check is saved or deleted.
+    """
+    invalidate_user_responses([instance.assigned_trainee_id])
+
+
+@receiver(m2m_changed, sender=LearnAim.marked_as_todo.through)
+def todo_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Invalidate the cached responses affected by added or removed to-dos (the to-dos are cleared before they are
+    removed, so their users and learn aims are read on pre_clear).
+    """
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    todos = LearnAim.marked_as_todo.through.objects
+    if reverse:
+        learn_aim_ids = pk_set if pk_set is not None else todos.filter(user_id=instance.pk).values_list(
+            'learnaim_id', flat=True)
+        invalidate_todo_responses([instance.pk], learn_aim_ids)
+    else:
+        user_ids = pk_set if pk_set is not None else todos.filter(learnaim_id=instance.pk).values_list(
+            'user_id', flat=True)
+        invalidate_todo_responses(user_ids, [instance.pk])
@@ -0,0 +1,56 @@
+from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+
+from learn_aim_check.lean_serializers import get_simple_learn_aims, project_checks, serialize_checks, \
+    serialize_learn_aim
+from learn_aim_check.models import ActionCompetence, CheckLearnAim, LearnAim, Tag
+from learn_aim_check.serializers import CheckLearnAimSerializer, LearnAimSerializer
+from services.learn_check_tree_service import with_check_relations
+from users.models import EducationOrdinance, User
+
+
+class LeanSerializerTest(TestCase):
+    """
+    The lean serializers have to render the same JSON as the DRF serializers.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        education_ordinance = EducationOrdinance.objects.create(title='BiVo 21')
+        action_competence = ActionCompetence.objects.create(identification='A1', title='Database',
+                                                            description='Create a database')
+        action_competence.education_ordinance.add(education_ordinance)
+        cls.coach = User.objects.create_user('coach@example.com', firstname='Coach', lastname='Example')
+        cls.trainee = User.objects.create_user('trainee@example.com', firstname='Trainee', lastname='Example',
+                                               assigned_trainer=cls.coach, education_ordinance=education_ordinance)
+        learn_aims = [
+            LearnAim.objects.create(action_competence=action_competence, identification=str(number),
+                                    description=f'Learn aim {number}', taxonomy_level=number, example_text='Example')
+            for number in (1, 2)
+        ]
+        learn_aims[0].tags.add(Tag.objects.create(tag_name='SQL'), Tag.objects.create(tag_name='Python'))
+        learn_aims[0].marked_as_todo.add(cls.trainee)
+        CheckLearnAim.objects.create(assigned_trainee=cls.trainee, closed_learn_check=learn_aims[0], comment='Done',
+                                     semester=1, close_stage=1, is_approved=True, approved_by=cls.coach)
+        CheckLearnAim.objects.create(assigned_trainee=cls.trainee, closed_learn_check=learn_aims[0], comment='Done',
+                                     semester=2, close_stage=2)
+        CheckLearnAim.objects.create(assigned_trainee=cls.trainee, closed_learn_check=learn_aims[1], comment='Done',
+                                     semester=2, close_stage=1)
+
+    def test_checks(self):
+        checks = CheckLearnAim.objects.filter(assigned_trainee=self.trainee).order_by('id')
+        drf = CheckLearnAimSerializer(with_check_relations(checks), many=True).data
+        self.assertEqual(JSONRenderer().render(serialize_checks(project_checks(checks))), JSONRenderer().render(drf))
+
+    def test_learn_aims(self):
+        checks = CheckLearnAim.objects.filter(assigned_trainee=self.trainee).order_by('id')
+        learn_aims = LearnAim.objects.order_by('id')
+        simple_learn_aims = get_simple_learn_aims(learn_aims.values_list('id', flat=True))
+        for learn_aim in learn_aims:
+            learn_aim.trainee_checks = with_check_relations(checks.filter(closed_learn_check=learn_aim))
+            learn_aim.is_marked_as_todo = learn_aim.marked_as_todo.filter(id=self.trainee.id).exists()
+            drf = LearnAimSerializer(learn_aim).data
+            lean = serialize_learn_aim(simple_learn_aims[learn_aim.id],
+                                       serialize_checks(project_checks(learn_aim.trainee_checks)),
+                                       learn_aim.is_marked_as_todo)
+            self.assertEqual(JSONRenderer().render(lean), JSONRenderer().render(drf))
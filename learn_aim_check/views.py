@@ -1,18 +1,36 @@
-from django.db.models import Max
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
+from rest_framework.generics import ListAPIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from custom_exceptions.learn_check_exceptions import LearnAimNotInEducationOrdinance, LearnCheckAlreadyApproved, \
     LearnCheckNotYourOwn
+from learn_aim_check.filters import CheckLearnAimFilter, LearnAimSearchFilter
+from learn_aim_check.lean_serializers import project_checks, serialize_checked_learn_aims, use_lean_serializers
 from learn_aim_check.models import ActionCompetence, CheckLearnAim, LearnAim
-from learn_aim_check.serializers import ActionCompetenceSerializer, CheckLearnAimSerializer, DiagramSerializer, \
-    LearnAimSerializer
+from learn_aim_check.serializers import ActionCompetenceSerializer, BulkCheckSelectionSerializer, \
+    BulkTodoSerializer, CheckLearnAimSerializer, DiagramSerializer, LearnAimSearchSerializer, LearnAimSerializer, \
+    PendingCheckLearnAimSerializer
+from services.bulk_learn_check_service import MAX_BULK_SIZE, approve_learn_checks, create_learn_checks, \
+    decline_learn_checks, get_pending_checks_of_trainees, validate_learn_checks
+from services.conditional_request_service import get_checks_state, get_curriculum_state, \
+    get_not_modified_response, get_todo_state, get_validators, set_validators
+from services.curriculum_cache_service import get_learn_check_data
 from services.group_service import is_user_coach
-from services.learn_check_validator import learn_check_validator
+from services.learn_aim_search_service import get_searchable_learn_aims
+from services.learn_check_tree_service import get_learn_check_tree, with_check_relations
+from services.progress_service import get_action_competence_progress, get_approved_stage, \
+    update_trainee_progress
+from services.response_cache_service import cache_response, get_cached_response, get_response_cache_key
+from services.sparse_fieldset_service import get_field_selection
+from services.learn_check_validator import learn_check_validator, save_learn_check
+from services.ordinance_index_service import is_competence_in_ordinance
+from services.todo_service import COMPLETED_STAGE, get_todo_learn_aim_ids, is_marked_as_todo, set_todos
+from tie_athena.pagination import CreatedAtCursorPagination, QueueCursorPagination
 from users.models import User
 from users.permissions import IsStudent, IsCoach
 
@@ -43,6 +61,18 @@ class LearnAimViewSet(viewsets.ModelViewSet):
         context['student_id'] = self.request.query_params.get('student-id', None)
         return context
 
+    def get_selected_trainee(self) -> User or None:
+        """
+        Get the trainee whose learn check tree is requested.
+        - coaches select the trainee with the student-id param
+        - students always get their own tree
+        :param self: View object
+        :return: selected trainee or None if a coach did not select an existing trainee
+        """
+        if is_user_coach(self.request.user):
+            return User.objects.filter(id=self.request.query_params.get('student-id', None)).first()
+        return self.request.user
+
     def get_queryset(self) -> CheckLearnAim or ActionCompetence:
         """
         Get all learn aims.
@@ -53,23 +83,45 @@ class LearnAimViewSet(viewsets.ModelViewSet):
         """
         return_value = None
         if self.request.method == 'GET':
-            selected_student_id = self.request.query_params.get('student-id', None)
-            print(selected_student_id)
-            if is_user_coach(self.request.user):
-                # and selected_student_id.isnumeric():
-                selected_student = User.objects.filter(id=selected_student_id).first()
-                print(selected_student)
-                if selected_student:
-                    return_value = ActionCompetence.objects.filter(
-                        education_ordinance=selected_student.education_ordinance).order_by('identification')
-                    print(return_value)
-            else:
-                return_value = ActionCompetence.objects.filter(
-                    education_ordinance=self.request.user.education_ordinance).order_by('identification')
+            selected_trainee = self.get_selected_trainee()
+            if selected_trainee:
+                return_value = get_learn_check_tree(selected_trainee.education_ordinance_id, selected_trainee)
         else:
             return_value = CheckLearnAim.objects.filter(assigned_trainee=self.request.user)
         return return_value
 
+    def list(self, request, *args, **kwargs) -> Response:
+        """
+        Get the learn check tree of the selected trainee.
+        The static curriculum is taken from the curriculum cache, only the checks and to-dos of the trainee are
+        loaded from the database. Answers 304 Not Modified if the client has the current version, the rendered
+        response is kept in the response cache.
+        :param self: View object
+        :param request: Request with the optional student-id and sparse fieldset (fields, include) params
+        :return: Response with all action competences, learn aims and checks
+        """
+        selected_trainee = self.get_selected_trainee()
+        if selected_trainee is None:
+            return Response([], status=status.HTTP_200_OK)
+
+        cache_key = get_response_cache_key('learn-check', request, [selected_trainee.id])
+        cached_response = get_cached_response(request, cache_key)
+        if cached_response is not None:
+            return cached_response
+
+        selection = get_field_selection(request)
+        curriculum_state = get_curriculum_state(selected_trainee.education_ordinance_id)
+        validators = get_validators(selected_trainee.id, selected_trainee.education_ordinance_id, curriculum_state,
+                                    get_checks_state(selected_trainee.id), get_todo_state(), selection)
+        not_modified = get_not_modified_response(request, validators)
+        if not_modified is not None:
+            return not_modified
+
+        # the skeleton is checked against the curriculum state of the ETag
+        response = Response(get_learn_check_data(selected_trainee.education_ordinance_id, selected_trainee,
+                                                 selection, curriculum_state), status=status.HTTP_200_OK)
+        return cache_response(cache_key, set_validators(response, validators))
+
     def create(self, request, *args, **kwargs) -> Response:
         """
         Create a new learning check.
@@ -84,13 +136,36 @@ class LearnAimViewSet(viewsets.ModelViewSet):
         serializer = CheckLearnAimSerializer(data=request.data, context={'request': request})
         serializer.is_valid(raise_exception=True)
 
+        learn_check_validator(request.user, serializer)
         learn_aim = serializer.validated_data['closed_learn_check']
-        if request.user.education_ordinance not in learn_aim.action_competence.education_ordinance.all():
-            raise LearnAimNotInEducationOrdinance
 
-        learn_check_validator(request.user, serializer)
+        with transaction.atomic():
+            save_learn_check(serializer, assigned_trainee=request.user)
+            update_trainee_progress(request.user.id, [learn_aim.id])
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-        serializer.save(assigned_trainee=request.user)
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def create_bulk(self, request) -> Response:
+        """
+        Create many learning checks at once.
+        - all checks are validated like single checks, against one snapshot of the existing checks
+        - either all checks are created or none
+        :param self: View object with the data for the new learn checks
+        :param request: Request with a list of new learn checks
+        :return: Response with the new learn checks or the errors per invalid learn check
+        """
+        if not isinstance(request.data, list) or len(request.data) > MAX_BULK_SIZE:
+            return Response({'error': f'Please supply a list of at most {MAX_BULK_SIZE} learn checks.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        checks, errors = validate_learn_checks(request.user, request.data)
+        if errors:
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        created_checks = create_learn_checks(request.user, checks)
+        created_checks = with_check_relations(
+            CheckLearnAim.objects.filter(id__in=[check.id for check in created_checks])).order_by('id')
+        serializer = CheckLearnAimSerializer(created_checks, many=True, context={'request': request})
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     def update(self, request, *args, **kwargs) -> Response:
@@ -114,7 +189,11 @@ class LearnAimViewSet(viewsets.ModelViewSet):
         serializer = CheckLearnAimSerializer(learn_aim_check, data=request.data)
         if serializer.is_valid():
             learn_check_validator(request.user, serializer, is_create=False)
-            serializer.save()
+            previous_learn_aim_id = learn_aim_check.closed_learn_check_id
+            with transaction.atomic():
+                save_learn_check(serializer)
+                update_trainee_progress(request.user.id,
+                                        [previous_learn_aim_id, learn_aim_check.closed_learn_check_id])
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -135,7 +214,9 @@ class LearnAimViewSet(viewsets.ModelViewSet):
             raise LearnCheckAlreadyApproved
         if learn_aim_check.assigned_trainee != request.user:
             raise LearnCheckNotYourOwn
-        learn_aim_check.delete()
+        with transaction.atomic():
+            learn_aim_check.delete()
+            update_trainee_progress(request.user.id, [learn_aim_check.closed_learn_check_id])
         return Response({"Success": "Learn check successfully deleted"}, status=status.HTTP_204_NO_CONTENT)
 
 
@@ -155,12 +236,69 @@ class LearnCheckChartAPIView(APIView):
         :raises LearnAimNotInEducationOrdinance: if the learn aim is not part of the user's education ordinance
         :return: Response for the chart
         """
+        cache_key = get_response_cache_key('learn-check-chart', request, [request.user.id])
+        cached_response = get_cached_response(request, cache_key)
+        if cached_response is not None:
+            return cached_response
+
         action_competence = get_object_or_404(ActionCompetence, id=pk)
-        if request.user.education_ordinance not in action_competence.education_ordinance.all():
+        if not is_competence_in_ordinance(request.user.education_ordinance_id, action_competence.id):
             raise LearnAimNotInEducationOrdinance
 
-        serializer = DiagramSerializer(action_competence, context={'request': request})
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        selection = get_field_selection(request)
+        validators = get_validators(request.user.id, request.user.education_ordinance_id,
+                                    get_curriculum_state(request.user.education_ordinance_id),
+                                    get_checks_state(request.user.id), selection)
+        not_modified = get_not_modified_response(request, validators)
+        if not_modified is not None:
+            return not_modified
+
+        serializer = DiagramSerializer(action_competence, context={'request': request, 'field_selection': selection})
+        return cache_response(cache_key, set_validators(Response(serializer.data, status=status.HTTP_200_OK),
+                                                        validators))
+
+
+class LearnCheckChartListAPIView(APIView):
+    """
+    View for the diagrams of all action competences of the education ordinance.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request) -> Response:
+        """
+        Get the diagrams for all action competences of the trainee's education ordinance.
+        - students get their own progress
+        - coaches get the progress of the trainee given with the student-id param
+        :param self: View object with the data for the diagrams
+        :param request: Request with the data for the diagrams (User)
+        :return: Response with the charts of all action competences
+        """
+        trainee = request.user
+        if is_user_coach(request.user):
+            student_id = request.query_params.get('student-id', None)
+            if student_id is None or not student_id.isnumeric():
+                return Response({'student-id': 'Please supply a student-id in params.'},
+                                status=status.HTTP_400_BAD_REQUEST)
+            trainee = get_object_or_404(User, pk=student_id)
+
+        cache_key = get_response_cache_key('learn-check-chart-list', request, [trainee.id])
+        cached_response = get_cached_response(request, cache_key)
+        if cached_response is not None:
+            return cached_response
+
+        selection = get_field_selection(request)
+        validators = get_validators(trainee.id, trainee.education_ordinance_id,
+                                    get_curriculum_state(trainee.education_ordinance_id), get_checks_state(trainee.id),
+                                    selection)
+        not_modified = get_not_modified_response(request, validators)
+        if not_modified is not None:
+            return not_modified
+
+        action_competences = get_action_competence_progress(trainee.education_ordinance_id, trainee, selection)
+        serializer = DiagramSerializer(action_competences, many=True,
+                                       context={'request': request, 'field_selection': selection})
+        return cache_response(cache_key, set_validators(Response(serializer.data, status=status.HTTP_200_OK),
+                                                        validators))
 
 
 class ToggleTodoAPIView(APIView):
@@ -183,24 +321,76 @@ class ToggleTodoAPIView(APIView):
         :raises: HTTP 403 if the learn aim is fully completed and cannot be modified.
         """
         learn_aim = get_object_or_404(LearnAim, pk=pk)
-        current_stage = CheckLearnAim.objects.filter(
-            assigned_trainee=request.user,
-            closed_learn_check=learn_aim,
-            is_approved=True
-        ).aggregate(Max('close_stage'))['close_stage__max'] or 0
+        current_stage = get_approved_stage(request.user, learn_aim)
+        marked_as_todo = is_marked_as_todo(request.user, learn_aim.id)
 
-        if current_stage >= 3:
-            learn_aim.marked_as_todo.remove(request.user)
+        if current_stage >= COMPLETED_STAGE:
+            if marked_as_todo:
+                learn_aim.marked_as_todo.remove(request.user)
             return Response({"error": "This learn aim is fully completed and cannot be modified."},
                             status=status.HTTP_403_FORBIDDEN)
 
-        if request.user in learn_aim.marked_as_todo.all():
+        if marked_as_todo:
             learn_aim.marked_as_todo.remove(request.user)
         else:
             learn_aim.marked_as_todo.add(request.user)
+        learn_aim.is_marked_as_todo = not marked_as_todo
+        learn_aim.trainee_checks = with_check_relations(CheckLearnAim.objects.filter(
+            closed_learn_check=learn_aim, assigned_trainee=request.user)).order_by('close_stage')
         return Response(LearnAimSerializer(learn_aim, context={'request': request}).data, status=status.HTTP_200_OK)
 
 
+class BulkTodoAPIView(APIView):
+    """
+    API view to list, mark and unmark the to-dos of a trainee at once.
+    """
+    permission_classes = [IsAuthenticated, IsStudent]
+
+    def get(self, request):
+        """
+        List the to-dos of the trainee.
+
+        :param request: The HTTP request object.
+        :returns: A response object containing the ids of the learn aims marked as to-do.
+        """
+        return Response({'marked_as_todo': get_todo_learn_aim_ids(request.user)}, status=status.HTTP_200_OK)
+
+    def patch(self, request):
+        """
+        Mark or unmark many learn aims as to-do.
+
+        Completed learn aims (approved up to the last stage) are not marked, they are unmarked instead and
+        returned as completed.
+
+        :param request: The HTTP request object with the learn aim ids and the new marked_as_todo state.
+        :returns: A response object containing the ids of all to-dos and of the completed learn aims.
+        :raises LearnAimNotInEducationOrdinance: If a learn aim is not part of the trainee's education ordinance.
+        """
+        serializer = BulkTodoSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        todo_ids, completed_ids = set_todos(request.user, serializer.validated_data['learn_aims'],
+                                            serializer.validated_data['marked_as_todo'])
+        return Response({'marked_as_todo': todo_ids, 'completed': completed_ids}, status=status.HTTP_200_OK)
+
+
+class LearnAimSearchAPIView(ListAPIView):
+    """
+    API view to search the learn aims of the user's education ordinance.
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = LearnAimSearchSerializer
+    filterset_class = LearnAimSearchFilter
+
+    def get_queryset(self):
+        """
+        Get the learn aims of the user's education ordinance, the filters (?q=, ?tags= and ?taxonomy_level=) narrow
+        them down.
+
+        :returns: QuerySet of the learn aims with their action competence and tags.
+        """
+        return get_searchable_learn_aims(self.request.user.education_ordinance_id)
+
+
 class CheckLearnAimViewSet(viewsets.ModelViewSet):
     """
     A viewset for viewing and editing CheckLearnAim instances.
@@ -210,20 +400,121 @@ class CheckLearnAimViewSet(viewsets.ModelViewSet):
     serializer_class = CheckLearnAimSerializer
     queryset = CheckLearnAim.objects.all()
     permission_classes = [IsAuthenticated]
+    filterset_class = CheckLearnAimFilter
+    pagination_class = CreatedAtCursorPagination
+
+    def get_queryset(self):
+        """
+        Get the learn aim checks visible to the user with their relations.
+        Only paginated lists are ordered (newest first, by the cursor pagination), complete lists keep the
+        database order.
+
+        :returns: A queryset of learn aim checks.
+        """
+        return with_check_relations(self.get_visible_checks())
+
+    def get_visible_checks(self):
+        """
+        Get the learn aim checks visible to the user.
+        Coaches see the learn aim checks of all trainees, trainees only see their own.
+
+        :returns: A queryset of learn aim checks.
+        """
+        checks = CheckLearnAim.objects.all()
+        if not is_user_coach(self.request.user):
+            checks = checks.filter(assigned_trainee=self.request.user)
+        return checks
+
+    def list(self, request, *args, **kwargs) -> Response:
+        """
+        List the learn aim checks visible to the user (paginated and filtered on request).
+        Answers 304 Not Modified if the client has the current version.
+
+        :param request: Request with the optional pagination, filter and sparse fieldset (fields, include) params
+        :returns: Response with the learn aim checks
+        """
+        selection = get_field_selection(request)
+        validators = get_validators(request.user.id, get_curriculum_state(),
+                                    get_checks_state(None if is_user_coach(request.user) else request.user.id),
+                                    get_todo_state(), selection)
+        not_modified = get_not_modified_response(request, validators)
+        if not_modified is not None:
+            return not_modified
+
+        if use_lean_serializers('checked-learn-aims'):
+            checks = project_checks(self.filter_queryset(self.get_visible_checks()),
+                                    approved_by=selection.wants('approved_by'))
+        else:
+            checks = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(checks)
+        if page is not None:
+            data = serialize_checked_learn_aims(page, selection, request)
+            return set_validators(self.get_paginated_response(data), validators)
+        return set_validators(Response(serialize_checked_learn_aims(checks, selection, request)), validators)
 
     def get_permissions(self):
         """
         Instantiates and returns the list of permissions that this view requires.
-        Approve and decline actions are restricted to coaches.
+        Approve, decline and the approval queue are restricted to coaches.
 
         :returns: A list of permission classes.
         """
-        if self.action in ['approve_check', 'decline_check']:
+        if self.action in ['approve_check', 'decline_check', 'approve_checks', 'decline_checks', 'pending_checks']:
             self.permission_classes = [IsAuthenticated, IsCoach]
         else:
             self.permission_classes = [IsAuthenticated]
         return super().get_permissions()
 
+    @transaction.atomic
+    def perform_create(self, serializer):
+        """
+        Save a new learn aim check and update the progress of the trainee.
+
+        :param serializer: The validated serializer of the new learn aim check.
+        """
+        learn_aim_check = save_learn_check(serializer)
+        update_trainee_progress(learn_aim_check.assigned_trainee_id, [learn_aim_check.closed_learn_check_id])
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        """
+        Save an updated learn aim check and update the progress of the trainee.
+
+        :param serializer: The validated serializer of the updated learn aim check.
+        """
+        previous_learn_aim_id = serializer.instance.closed_learn_check_id
+        learn_aim_check = save_learn_check(serializer)
+        update_trainee_progress(learn_aim_check.assigned_trainee_id,
+                                [previous_learn_aim_id, learn_aim_check.closed_learn_check_id])
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        """
+        Delete a learn aim check and update the progress of the trainee.
+
+        :param instance: The learn aim check to delete.
+        """
+        instance.delete()
+        update_trainee_progress(instance.assigned_trainee_id, [instance.closed_learn_check_id])
+
+    @action(detail=False, methods=['get'], url_path='pending', pagination_class=QueueCursorPagination,
+            serializer_class=PendingCheckLearnAimSerializer)
+    def pending_checks(self, request):
+        """
+        Custom action to list the approval queue of the coach.
+
+        Lists the not yet approved learn aim checks of the coach's trainees, oldest first. The list is always
+        paginated by cursor (keyset) and can be narrowed with the filters of the list.
+
+        :param request: The HTTP request object with the optional cursor, page_size and filter params.
+        :returns: A paginated response with the pending learn aim checks.
+        """
+        checks = self.filter_queryset(get_pending_checks_of_trainees(request.user).select_related(
+            'assigned_trainee', 'closed_learn_check__action_competence'))
+        page = self.paginate_queryset(checks)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
     @action(detail=True, methods=['patch'], url_path='approve')
     def approve_check(self, request, pk=None):
         """
@@ -242,7 +533,10 @@ class CheckLearnAimViewSet(viewsets.ModelViewSet):
             return Response({'detail': 'Learn check is already approved.'}, status=status.HTTP_400_BAD_REQUEST)
 
         learn_aim_check.is_approved = True
-        learn_aim_check.save()
+        learn_aim_check.approved_by = request.user
+        with transaction.atomic():
+            learn_aim_check.save(update_fields=['is_approved', 'approved_by', 'updated_at'])
+            update_trainee_progress(learn_aim_check.assigned_trainee_id, [learn_aim_check.closed_learn_check_id])
         serializer = self.get_serializer(learn_aim_check)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -262,9 +556,46 @@ class CheckLearnAimViewSet(viewsets.ModelViewSet):
         learn_aim_check = get_object_or_404(CheckLearnAim, pk=pk)
         if learn_aim_check.is_approved:
             return Response({'detail': 'Approved learn checks cannot be deleted.'}, status=status.HTTP_400_BAD_REQUEST)
-        learn_aim_check.delete()
+        with transaction.atomic():
+            learn_aim_check.delete()
+            update_trainee_progress(learn_aim_check.assigned_trainee_id, [learn_aim_check.closed_learn_check_id])
         return Response({'detail': 'Learn check deleted successfully.'}, status=status.HTTP_204_NO_CONTENT)
 
+    @action(detail=False, methods=['patch'], url_path='bulk-approve')
+    def approve_checks(self, request):
+        """
+        Custom action to approve many learn aim checks at once.
+
+        Approves all not yet approved learn aim checks of the coach's trainees matching the given
+        ids, trainee, action competence and stage with a single update.
+
+        :param request: The HTTP request object with the selection of the learn aim checks.
+        :returns: A response object containing the amount and the ids of the approved learn aim checks.
+        :raises HTTP 400: If no selection is given.
+        """
+        selection = BulkCheckSelectionSerializer(data=request.data)
+        selection.is_valid(raise_exception=True)
+        approved_ids = approve_learn_checks(
+            request.user, get_pending_checks_of_trainees(request.user, **selection.validated_data))
+        return Response({'approved': len(approved_ids), 'ids': approved_ids}, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['delete'], url_path='bulk-decline')
+    def decline_checks(self, request):
+        """
+        Custom action to decline (delete) many learn aim checks at once.
+
+        Deletes all not yet approved learn aim checks of the coach's trainees matching the given
+        ids, trainee, action competence and stage with a single delete.
+
+        :param request: The HTTP request object with the selection of the learn aim checks.
+        :returns: A response object containing the amount and the ids of the declined learn aim checks.
+        :raises HTTP 400: If no selection is given.
+        """
+        selection = BulkCheckSelectionSerializer(data=request.data)
+        selection.is_valid(raise_exception=True)
+        declined_ids = decline_learn_checks(get_pending_checks_of_trainees(request.user, **selection.validated_data))
+        return Response({'declined': len(declined_ids), 'ids': declined_ids}, status=status.HTTP_200_OK)
+
 
 class CheckedLearnAimsForTraineeView(APIView):
     """
@@ -279,10 +610,31 @@ class CheckedLearnAimsForTraineeView(APIView):
 
         :param request: The HTTP request object.
         :param trainee_id: The ID of the trainee whose checked learning aims are being retrieved.
-        :returns: A response object containing serialized checked learning aims.
+        :returns: A response object containing serialized checked learning aims (paginated on request, sparse
+                  fieldset with the fields and include params).
         :raises: HTTP 404 if the user is not found.
         """
         user = get_object_or_404(User, pk=trainee_id)
-        checked_learn_aims = CheckLearnAim.objects.filter(assigned_trainee=user)
-        serializer = CheckLearnAimSerializer(checked_learn_aims, many=True, context={'request': request})
-        return Response(serializer.data)
+        selection = get_field_selection(request)
+        validators = get_validators(user.id, get_curriculum_state(), get_checks_state(user.id), get_todo_state(),
+                                    selection)
+        not_modified = get_not_modified_response(request, validators)
+        if not_modified is not None:
+            return not_modified
+
+        checked_learn_aims = CheckLearnAimFilter(
+            request.query_params, queryset=CheckLearnAim.objects.filter(assigned_trainee=user), request=request).qs
+
+        if use_lean_serializers('checked-learn-aims'):
+            checked_learn_aims = project_checks(checked_learn_aims, approved_by=selection.wants('approved_by'))
+        else:
+            checked_learn_aims = with_check_relations(checked_learn_aims)
+
+        paginator = CreatedAtCursorPagination()
+        page = paginator.paginate_queryset(checked_learn_aims, request, view=self)
+        if page is not None:
+            data = serialize_checked_learn_aims(page, selection, request)
+            return set_validators(paginator.get_paginated_response(data), validators)
+        data = serialize_checked_learn_aims(checked_learn_aims, selection, request)
+        return set_validators(Response(data), validators)
+
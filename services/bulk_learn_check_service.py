@@ -0,0 +1,163 @@
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+from rest_framework.exceptions import APIException
+
+from custom_exceptions.learn_check_exceptions import LearnAimAlreadyChecked, LearnAimNotInEducationOrdinance
+from learn_aim_check.models import CheckLearnAim
+from learn_aim_check.serializers import BulkCheckLearnAimSerializer
+from services.learn_check_validator import validate_against_previous_checks
+from services.ordinance_index_service import get_learn_aim_ids_in_ordinance
+from services.progress_service import update_trainee_progress
+from services.response_cache_service import invalidate_user_responses
+from users.models import User
+
+# Maximum amount of learn checks in one bulk request
+MAX_BULK_SIZE = 500
+
+
+def validate_learn_checks(user: User, items: list) -> tuple:
+    """
+    Validate many new learn checks of a trainee at once.
+    All items are validated against one snapshot of the trainee's existing checks and the learn aims of the
+    trainee's education ordinance. Valid items are added to the snapshot, so later items are validated against
+    earlier items of the same request.
+    :param user: trainee the learn checks are created for
+    :param items: List of the learn check data
+    :return: Tuple of the unsaved CheckLearnAim objects and a list of errors (index, code, detail) per invalid item
+    """
+    serializers = [BulkCheckLearnAimSerializer(data=item) for item in items]
+    learn_aim_ids = get_learn_aim_ids_in_ordinance(user.education_ordinance_id, {
+        serializer.validated_data['closed_learn_check_id'] for serializer in serializers if serializer.is_valid()})
+    previous_checks = defaultdict(list)
+    for check in CheckLearnAim.objects.filter(assigned_trainee=user).only(
+            'id', 'closed_learn_check_id', 'close_stage', 'semester', 'is_approved'):
+        previous_checks[check.closed_learn_check_id].append(check)
+
+    checks = []
+    errors = []
+    for index, serializer in enumerate(serializers):
+        if not serializer.is_valid():
+            errors.append({'index': index, 'code': 'invalid', 'detail': serializer.errors})
+            continue
+
+        data = serializer.validated_data
+        try:
+            if data['closed_learn_check_id'] not in learn_aim_ids:
+                raise LearnAimNotInEducationOrdinance
+            validate_against_previous_checks(previous_checks[data['closed_learn_check_id']], data['close_stage'],
+                                             data['semester'])
+        except APIException as e:
+            errors.append({'index': index, 'code': e.get_codes(), 'detail': e.detail})
+            continue
+
+        check = CheckLearnAim(assigned_trainee=user, **data)
+        previous_checks[check.closed_learn_check_id].append(check)
+        checks.append(check)
+    return checks, errors
+
+
+def create_learn_checks(user: User, checks: list) -> list:
+    """
+    Insert validated learn checks of a trainee in a single transaction and update the trainee's progress.
+    :param user: trainee the learn checks are created for
+    :param checks: List of unsaved CheckLearnAim objects (see validate_learn_checks)
+    :return: List of the created CheckLearnAim objects
+    :raises LearnAimAlreadyChecked: if a stage was checked by a concurrent request in the meantime
+    """
+    try:
+        with transaction.atomic():
+            created_checks = CheckLearnAim.objects.bulk_create(checks)
+            update_trainee_progress(user.id, {check.closed_learn_check_id for check in checks})
+            # bulk_create sends no post_save signals
+            invalidate_user_responses([user.id])
+    except IntegrityError as e:
+        # a concurrent request checked one of the stages after the validation
+        raise LearnAimAlreadyChecked from e
+    return created_checks
+
+
+def get_pending_checks_of_trainees(coach: User, ids: list = None, trainee: int = None, action_competence: int = None,
+                                   stage: int = None) -> QuerySet:
+    """
+    Get the not yet approved learn checks of the coach's assigned trainees matching the given filters.
+    :param coach: coach the trainees are assigned to
+    :param ids: ids of the learn checks
+    :param trainee: id of the trainee
+    :param action_competence: id of the action competence of the learn aims
+    :param stage: close stage of the learn checks
+    :return: QuerySet of the matching learn checks
+    """
+    checks = CheckLearnAim.objects.filter(assigned_trainee__assigned_trainer=coach, is_approved=False)
+    if ids is not None:
+        checks = checks.filter(id__in=ids)
+    if trainee is not None:
+        checks = checks.filter(assigned_trainee_id=trainee)
+    if action_competence is not None:
+        checks = checks.filter(closed_learn_check__action_competence_id=action_competence)
+    if stage is not None:
+        checks = checks.filter(close_stage=stage)
+    return checks
+
+
+def approve_learn_checks(coach: User, checks: QuerySet) -> list:
+    """
+    Approve the given learn checks with a single UPDATE and update the progress of the affected trainees.
+    Only learn checks which are not yet approved are changed.
+    :param coach: coach who approves the learn checks
+    :param checks: QuerySet of the learn checks to approve
+    :return: List of the ids of the approved learn checks
+    """
+    with transaction.atomic():
+        affected = _lock_pending_checks(checks)
+        CheckLearnAim.objects.filter(id__in=list(affected), is_approved=False).update(
+            is_approved=True, approved_by=coach, updated_at=timezone.now())
+        _update_progress_of_affected(affected)
+    return sorted(affected)
+
+
+def decline_learn_checks(checks: QuerySet) -> list:
+    """
+    Decline (delete) the given learn checks and update the progress of the affected trainees.
+    Only learn checks which are not yet approved are deleted. Django collects the rows and sends post_delete per
+    learn check, which invalidates the cached responses of its trainee.
+    :param checks: QuerySet of the learn checks to decline
+    :return: List of the ids of the declined learn checks
+    """
+    with transaction.atomic():
+        affected = _lock_pending_checks(checks)
+        CheckLearnAim.objects.filter(id__in=list(affected), is_approved=False).delete()
+        _update_progress_of_affected(affected, invalidate=False)
+    return sorted(affected)
+
+
+def _lock_pending_checks(checks: QuerySet) -> dict:
+    """
+    Lock the not yet approved learn checks of the given QuerySet until the end of the transaction.
+    :param checks: QuerySet of learn checks
+    :return: dict with the learn check id as key and (trainee id, learn aim id) as value
+    """
+    return {
+        check_id: (trainee_id, learn_aim_id)
+        for check_id, trainee_id, learn_aim_id in checks.filter(is_approved=False).select_for_update(of=('self',))
+        .values_list('id', 'assigned_trainee_id', 'closed_learn_check_id')
+    }
+
+
+def _update_progress_of_affected(affected: dict, invalidate: bool = True) -> None:
+    """
+    Update the progress and invalidate the cached responses of all trainees affected by a bulk change.
+    :param affected: dict with the learn check id as key and (trainee id, learn aim id) as value
+    :param invalidate: False if the change already sent signals which invalidate the cached responses (a bulk
+                       UPDATE sends no post_save signals)
+    :return: None
+    """
+    learn_aim_ids_by_trainee = defaultdict(set)
+    for trainee_id, learn_aim_id in affected.values():
+        learn_aim_ids_by_trainee[trainee_id].add(learn_aim_id)
+    for trainee_id, learn_aim_ids in learn_aim_ids_by_trainee.items():
+        update_trainee_progress(trainee_id, learn_aim_ids)
+    if invalidate:
+        invalidate_user_responses(learn_aim_ids_by_trainee)
@@ -0,0 +1,161 @@
+import hashlib
+from typing import NamedTuple
+
+from django.db.models import Count, Max, QuerySet
+from django.utils.cache import get_conditional_response, patch_vary_headers, quote_etag
+from rest_framework.response import Response
+
+from learn_aim_check.models import ActionCompetence, CheckLearnAim, LearnAim
+
+
+# Aggregates of the curriculum state, see get_curriculum_state
+CURRICULUM_STATE = {
+    'action_competence_count': Count('id', distinct=True),
+    'action_competence_updated_at': Max('updated_at'),
+    'learn_aim_count': Count('learnaim', distinct=True),
+    'learn_aim_updated_at': Max('learnaim__updated_at'),
+    'tag_link_count': Count('learnaim__tags'),
+    'tag_updated_at': Max('learnaim__tags__updated_at'),
+}
+
+
+class Validators(NamedTuple):
+    """
+    Validators of a response for conditional GET requests.
+    There is no Last-Modified timestamp: deleted rows and changed to-dos don't advance any updated_at, only the
+    counts in the ETag detect them.
+    """
+    etag: str
+
+
+def get_curriculum_state(education_ordinance_id: int = None) -> tuple:
+    """
+    Get the state of the curriculum (action competences, learn aims and their tags) with a single query.
+    Changes of rows are detected by max(updated_at), added and removed rows and tag links by the counts.
+    :param education_ordinance_id: id of the education ordinance, None for the curriculum of all education ordinances
+    :return: tuple of counts and timestamps
+    """
+    return tuple(_get_curriculum_queryset(education_ordinance_id).aggregate(**CURRICULUM_STATE).values())
+
+
+async def aget_curriculum_state(education_ordinance_id: int = None) -> tuple:
+    """
+    Async version of get_curriculum_state.
+    :param education_ordinance_id: id of the education ordinance, None for the curriculum of all education ordinances
+    :return: tuple of counts and timestamps
+    """
+    return tuple((await _get_curriculum_queryset(education_ordinance_id).aaggregate(**CURRICULUM_STATE)).values())
+
+
+def get_checks_state(trainee_id: int = None) -> tuple:
+    """
+    Get the state of the learn checks of a trainee.
+    :param trainee_id: id of the trainee, None for the learn checks of all trainees
+    :return: tuple of the count and the timestamp of the last change
+    """
+    return _get_state(_get_checks_queryset(trainee_id), 'updated_at')
+
+
+async def aget_checks_state(trainee_id: int = None) -> tuple:
+    """
+    Async version of get_checks_state.
+    :param trainee_id: id of the trainee, None for the learn checks of all trainees
+    :return: tuple of the count and the timestamp of the last change
+    """
+    return await _aget_state(_get_checks_queryset(trainee_id), 'updated_at')
+
+
+def get_todo_state() -> tuple:
+    """
+    Get the state of the to-dos of all users.
+    The through table has no timestamps, so added rows are detected by max(id) and removed rows by the count.
+    :return: tuple of the count and the highest id
+    """
+    return _get_state(LearnAim.marked_as_todo.through.objects.all(), 'id')
+
+
+async def aget_todo_state() -> tuple:
+    """
+    Async version of get_todo_state.
+    :return: tuple of the count and the highest id
+    """
+    return await _aget_state(LearnAim.marked_as_todo.through.objects.all(), 'id')
+
+
+def get_validators(*states) -> Validators:
+    """
+    Build the ETag of a response from the states of its data.
+    :param states: states of the data the response is built from (see get_*_state), including i.e. the trainee id
+    :return: Validators
+    """
+    return Validators(quote_etag(hashlib.md5(repr(states).encode(), usedforsecurity=False).hexdigest()))
+
+
+def get_not_modified_response(request, validators: Validators):
+    """
+    Get the 304 Not Modified response if the client already has the current version of the response.
+    :param request: Request with the If-None-Match header
+    :param validators: Validators of the current version
+    :return: HttpResponseNotModified or None if the response has to be built
+    """
+    response = get_conditional_response(request, etag=validators.etag)
+    if response is not None:
+        return set_validators(response, validators)
+    return None
+
+
+def set_validators(response: Response, validators: Validators) -> Response:
+    """
+    Add the ETag header to a response.
+    :param response: Response to add the header to
+    :param validators: Validators of the response
+    :return: the response
+    """
+    response['ETag'] = validators.etag
+    # the responses depend on the authenticated user
+    response['Cache-Control'] = 'private, no-cache'
+    patch_vary_headers(response, ['Authorization'])
+    return response
+
+
+def _get_curriculum_queryset(education_ordinance_id: int or None) -> QuerySet:
+    """
+    :param education_ordinance_id: id of the education ordinance, None for all education ordinances
+    :return: QuerySet of the action competences of the education ordinance
+    """
+    action_competences = ActionCompetence.objects.all()
+    if education_ordinance_id is not None:
+        action_competences = action_competences.filter(education_ordinance=education_ordinance_id)
+    return action_competences
+
+
+def _get_checks_queryset(trainee_id: int or None) -> QuerySet:
+    """
+    :param trainee_id: id of the trainee, None for all trainees
+    :return: QuerySet of the learn checks of the trainee
+    """
+    checks = CheckLearnAim.objects.all()
+    if trainee_id is not None:
+        checks = checks.filter(assigned_trainee_id=trainee_id)
+    return checks
+
+
+def _get_state(queryset: QuerySet, field: str) -> tuple:
+    """
+    :param queryset: QuerySet to get the state of
+    :param field: field whose maximum changes with every change of the rows
+    :return: tuple of the count and the maximum of the field
+    """
+    state = queryset.aggregate(count=Count('id'), latest=Max(field))
+    return state['count'], state['latest']
+
+
+async def _aget_state(queryset: QuerySet, field: str) -> tuple:
+    """
+    Async version of _get_state.
+    :param queryset: QuerySet to get the state of
+    :param field: field whose maximum changes with every change of the rows
+    :return: tuple of the count and the maximum of the field
+    """
+    state = await queryset.aaggregate(count=Count('id'), latest=Max(field))
+    return state['count'], state['latest']
@@ -0,0 +1,281 @@
+import time
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import QuerySet
+from rest_framework import serializers
+
+from learn_aim_check.lean_serializers import project_checks, serialize_check, use_lean_serializers
+from learn_aim_check.models import CheckLearnAim, LearnAim
+from learn_aim_check.serializers import ActionCompetenceSerializer, CheckLearnAimSerializer, \
+    SimpleLearnAimSerializer
+from services.conditional_request_service import aget_curriculum_state, get_curriculum_state
+from services.learn_check_tree_service import get_learn_check_tree
+from services.sparse_fieldset_service import ALL_FIELDS, FieldSelection
+from users.models import User
+
+# Cache-Key of the curriculum version stamp
+CURRICULUM_VERSION_KEY = 'curriculum-version'
+
+# Serialized curriculum skeletons by education ordinance id
+_skeletons = {}
+
+# Paths of the per-trainee data in the learn check tree (see FieldSelection)
+CHECKED_PATH = 'learn_aim.checked'
+MARKED_AS_TODO_PATH = 'learn_aim.marked_as_todo'
+CHECKED_MARKED_AS_TODO_PATH = 'learn_aim.checked.learn_aim.marked_as_todo'
+
+
+class CurriculumSkeleton:
+    """
+    Serialized static curriculum of an education ordinance.
+    Holds the action competences with their learn aims and tags, but no per-trainee state.
+    The skeleton belongs to the curriculum state (see get_curriculum_state) read from the database before it was
+    built, so every process detects a changed curriculum without a shared cache.
+    """
+
+    def __init__(self, state: tuple, data: list):
+        self.state = state
+        self.data = data
+        self.expires_at = time.monotonic() + settings.CURRICULUM_CACHE_TIMEOUT
+        self.learn_aims_by_id = {
+            learn_aim['id']: learn_aim
+            for action_competence in data
+            for learn_aim in action_competence['learn_aim']
+        }
+
+    def is_valid(self, state: tuple) -> bool:
+        """
+        Check if the skeleton belongs to the given curriculum state and is not expired.
+        :param state: current curriculum state of the education ordinance
+        :return: True if the skeleton can be used.
+        """
+        return self.state == state and time.monotonic() < self.expires_at
+
+
+class CachedCheckLearnAimSerializer(CheckLearnAimSerializer):
+    """
+    CheckLearnAimSerializer which takes the serialized learn aim from the context instead of the database.
+    """
+    learn_aim = serializers.SerializerMethodField()
+
+    def get_learn_aim(self, instance):
+        """
+        :param instance: CheckLearnAim object from the database
+        :return: Serialized learn aim of the check
+        """
+        return self.context['learn_aims'][instance.closed_learn_check_id]
+
+
+def get_curriculum_version() -> int:
+    """
+    Get the current curriculum version stamp.
+    The stamp is kept in the default cache. A missing stamp is initialized with the current time, so it never
+    falls back to a version an older skeleton was built with.
+    :return: curriculum version
+    """
+    version = cache.get(CURRICULUM_VERSION_KEY)
+    if version is None:
+        cache.add(CURRICULUM_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(CURRICULUM_VERSION_KEY)
+    return version
+
+
+def bump_curriculum_version() -> None:
+    """
+    Invalidate all data cached for a curriculum version by bumping the curriculum version stamp, once the
+    transaction is committed (a request between the bump and the commit would cache the old curriculum).
+    :return: None
+    """
+    transaction.on_commit(_bump_curriculum_version)
+
+
+def get_curriculum_skeleton(education_ordinance_id: int, state: tuple = None) -> CurriculumSkeleton:
+    """
+    Get the serialized static curriculum of an education ordinance.
+    The skeleton is built once per curriculum state and process and kept for CURRICULUM_CACHE_TIMEOUT seconds at most.
+    :param education_ordinance_id: id of the education ordinance
+    :param state: curriculum state of the education ordinance (see get_curriculum_state), read if not given
+    :return: CurriculumSkeleton
+    """
+    if state is None:
+        state = get_curriculum_state(education_ordinance_id)
+    skeleton = _skeletons.get(education_ordinance_id)
+    if skeleton is None or not skeleton.is_valid(state):
+        action_competences = list(get_learn_check_tree(education_ordinance_id))
+        for action_competence in action_competences:
+            for learn_aim in action_competence.prefetched_learn_aims:
+                learn_aim.trainee_checks = []
+                learn_aim.is_marked_as_todo = False
+        skeleton = CurriculumSkeleton(state, ActionCompetenceSerializer(action_competences, many=True).data)
+        _skeletons[education_ordinance_id] = skeleton
+    return skeleton
+
+
+async def aget_curriculum_skeleton(education_ordinance_id: int, state: tuple = None) -> CurriculumSkeleton:
+    """
+    Async version of get_curriculum_skeleton.
+    Only the curriculum state is read with the async ORM, a stale skeleton is rebuilt in a worker thread.
+    :param education_ordinance_id: id of the education ordinance
+    :param state: curriculum state of the education ordinance (see aget_curriculum_state), read if not given
+    :return: CurriculumSkeleton
+    """
+    if state is None:
+        state = await aget_curriculum_state(education_ordinance_id)
+    skeleton = _skeletons.get(education_ordinance_id)
+    if skeleton is None or not skeleton.is_valid(state):
+        skeleton = await sync_to_async(get_curriculum_skeleton)(education_ordinance_id, state)
+    return skeleton
+
+
+def get_learn_check_data(education_ordinance_id: int, trainee: User, selection: FieldSelection = ALL_FIELDS,
+                         curriculum_state: tuple = None) -> list:
+    """
+    Get the serialized learn check tree of an education ordinance for the given trainee.
+    The checks and to-dos of the trainee are merged onto the cached curriculum skeleton, they are only loaded if
+    they are part of the selected fields.
+    :param education_ordinance_id: id of the education ordinance
+    :param trainee: trainee to merge the checks and to-dos for
+    :param selection: selected fields of the tree
+    :param curriculum_state: curriculum state the validators of the response were built from, so the tree is never
+                             older than its ETag (read if not given)
+    :return: List of serialized action competences
+    """
+    skeleton = get_curriculum_skeleton(education_ordinance_id, curriculum_state)
+    checks_by_learn_aim, todo_learn_aim_ids, todo_rows = {}, set(), []
+    if selection.wants(CHECKED_PATH):
+        checks_by_learn_aim = _group_checks(skeleton, _get_checks_of_trainee(trainee, selection))
+    if selection.wants(MARKED_AS_TODO_PATH):
+        todo_learn_aim_ids = set(_get_todo_learn_aim_ids(trainee))
+    if checks_by_learn_aim and selection.wants(CHECKED_MARKED_AS_TODO_PATH):
+        todo_rows = list(_get_todo_users_of_learn_aims(checks_by_learn_aim))
+    return selection.prune(merge_learn_check_data(skeleton, checks_by_learn_aim, todo_learn_aim_ids, todo_rows))
+
+
+async def aget_learn_check_data(education_ordinance_id: int, trainee: User, selection: FieldSelection = ALL_FIELDS,
+                                curriculum_state: tuple = None) -> list:
+    """
+    Async version of get_learn_check_data, the checks and to-dos are loaded with the async ORM.
+    :param education_ordinance_id: id of the education ordinance
+    :param trainee: trainee to merge the checks and to-dos for
+    :param selection: selected fields of the tree
+    :param curriculum_state: curriculum state the validators of the response were built from (read if not given)
+    :return: List of serialized action competences
+    """
+    skeleton = await aget_curriculum_skeleton(education_ordinance_id, curriculum_state)
+    checks_by_learn_aim, todo_learn_aim_ids, todo_rows = {}, set(), []
+    if selection.wants(CHECKED_PATH):
+        checks_by_learn_aim = _group_checks(
+            skeleton, [check async for check in _get_checks_of_trainee(trainee, selection)])
+    if selection.wants(MARKED_AS_TODO_PATH):
+        todo_learn_aim_ids = {learn_aim_id async for learn_aim_id in _get_todo_learn_aim_ids(trainee)}
+    if checks_by_learn_aim and selection.wants(CHECKED_MARKED_AS_TODO_PATH):
+        todo_rows = [row async for row in _get_todo_users_of_learn_aims(checks_by_learn_aim)]
+    return selection.prune(merge_learn_check_data(skeleton, checks_by_learn_aim, todo_learn_aim_ids, todo_rows))
+
+
+def merge_learn_check_data(skeleton: CurriculumSkeleton, checks_by_learn_aim: dict, todo_learn_aim_ids: set,
+                           todo_rows: list) -> list:
+    """
+    Merge the checks and to-dos of a trainee onto a curriculum skeleton, without any database access.
+    :param skeleton: CurriculumSkeleton of the trainee's education ordinance
+    :param checks_by_learn_aim: dict with the checks (rows of the check projection if the lean serializers are
+                                enabled for learn-check) of the trainee by learn aim id, ordered by close_stage
+    :param todo_learn_aim_ids: ids of the learn aims the trainee marked as to-do
+    :param todo_rows: tuples of learn aim id and user id of all to-dos of the checked learn aims
+    :return: List of serialized action competences
+    """
+    learn_aims_by_id = skeleton.learn_aims_by_id
+
+    # The nested learn aim of a check lists every user who marked the learn aim as to-do
+    todo_user_ids = defaultdict(list)
+    for learn_aim_id, user_id in todo_rows:
+        todo_user_ids[learn_aim_id].append(user_id)
+    simple_fields = SimpleLearnAimSerializer().fields
+    simple_learn_aims = {
+        learn_aim_id: {
+            field: todo_user_ids[learn_aim_id] if field == 'marked_as_todo' else learn_aims_by_id[learn_aim_id][field]
+            for field in simple_fields
+        }
+        for learn_aim_id in checks_by_learn_aim
+    }
+
+    if use_lean_serializers('learn-check'):
+        checked = {
+            learn_aim_id: [serialize_check(row, simple_learn_aims[learn_aim_id]) for row in rows]
+            for learn_aim_id, rows in checks_by_learn_aim.items()
+        }
+    else:
+        checked = {
+            learn_aim_id: CachedCheckLearnAimSerializer(checks, many=True,
+                                                        context={'learn_aims': simple_learn_aims}).data
+            for learn_aim_id, checks in checks_by_learn_aim.items()
+        }
+
+    return [
+        dict(action_competence, learn_aim=[
+            dict(learn_aim, checked=checked.get(learn_aim['id'], []),
+                 marked_as_todo=learn_aim['id'] in todo_learn_aim_ids)
+            for learn_aim in action_competence['learn_aim']
+        ])
+        for action_competence in skeleton.data
+    ]
+
+
+def _get_checks_of_trainee(trainee: User, selection: FieldSelection) -> QuerySet:
+    """
+    :param trainee: trainee to get the checks for
+    :param selection: selected fields of the tree
+    :return: QuerySet of the checks of the trainee with their approver, ordered by close_stage (rows of the check
+             projection if the lean serializers are enabled for learn-check, joined with the approver only if
+             it is selected)
+    """
+    checks = CheckLearnAim.objects.filter(assigned_trainee=trainee).order_by('close_stage')
+    if use_lean_serializers('learn-check'):
+        return project_checks(checks, approved_by=selection.wants(f'{CHECKED_PATH}.approved_by'))
+    return checks.select_related('approved_by')
+
+
+def _group_checks(skeleton: CurriculumSkeleton, checks) -> dict:
+    """
+    :param skeleton: CurriculumSkeleton of the trainee's education ordinance
+    :param checks: checks of the trainee (CheckLearnAim objects or rows of the check projection)
+    :return: dict with the checks of the learn aims of the skeleton by learn aim id
+    """
+    checks_by_learn_aim = defaultdict(list)
+    for check in checks:
+        learn_aim_id = check['closed_learn_check_id'] if isinstance(check, dict) else check.closed_learn_check_id
+        if learn_aim_id in skeleton.learn_aims_by_id:
+            checks_by_learn_aim[learn_aim_id].append(check)
+    return checks_by_learn_aim
+
+
+def _bump_curriculum_version() -> None:
+    """
+    Bump the curriculum version stamp, a missing stamp is initialized with the current time.
+    :return: None
+    """
+    try:
+        cache.incr(CURRICULUM_VERSION_KEY)
+    except ValueError:
+        cache.add(CURRICULUM_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def _get_todo_learn_aim_ids(trainee: User) -> QuerySet:
+    """
+    :param trainee: trainee to get the to-dos for
+    :return: QuerySet of the ids of the learn aims the trainee marked as to-do
+    """
+    return LearnAim.marked_as_todo.through.objects.filter(user_id=trainee.pk).values_list('learnaim_id', flat=True)
+
+
+def _get_todo_users_of_learn_aims(learn_aim_ids) -> QuerySet:
+    """
+    :param learn_aim_ids: ids of the learn aims
+    :return: QuerySet of tuples of learn aim id and user id of all to-dos of the learn aims
+    """
+    return LearnAim.marked_as_todo.through.objects.filter(learnaim_id__in=list(learn_aim_ids)).values_list(
+        'learnaim_id', 'user_id')
@@ -0,0 +1,59 @@
+from collections import defaultdict
+
+from django.db.models import Count, Max, Q
+
+from learn_aim_check.models import ActionCompetence, CheckLearnAim
+from services.group_service import get_group_name_student
+from users.models import User
+
+
+def get_coach_dashboard(coach: User) -> list:
+    """
+    Get the progress of all trainees assigned to a coach.
+    Computed with three grouped queries (trainees, checks per trainee and action competence, learn aims per action
+    competence), so the cost depends on the amount of trainees and action competences, not on the amount of learn
+    aims or checks per trainee.
+    :param coach: coach to get the trainees for
+    :return: List of dicts with the trainee, its last activity, its pending checks and its progress per action
+             competence (closed = learn aims with an approved stage 3, checked = learn aims with any check)
+    """
+    trainees = list(User.objects.filter(
+        assigned_trainer=coach, groups__name=get_group_name_student()
+    ).annotate(
+        last_activity=Max('checklearnaim__updated_at'),
+        pending_count=Count('checklearnaim', filter=Q(checklearnaim__is_approved=False)),
+    ).values('id', 'email', 'firstname', 'lastname', 'education_ordinance_id', 'last_activity',
+             'pending_count').order_by('id'))
+
+    progress = {
+        (row['assigned_trainee_id'], row['closed_learn_check__action_competence_id']): row
+        for row in CheckLearnAim.objects.filter(assigned_trainee_id__in=[trainee['id'] for trainee in trainees]).values(
+            'assigned_trainee_id', 'closed_learn_check__action_competence_id'
+        ).annotate(
+            closed=Count('closed_learn_check', distinct=True, filter=Q(is_approved=True, close_stage__gte=3)),
+            checked=Count('closed_learn_check', distinct=True),
+            pending=Count('id', filter=Q(is_approved=False)),
+        ).order_by()
+    }
+
+    competences_by_ordinance = defaultdict(list)
+    for competence in ActionCompetence.objects.filter(
+            education_ordinance__in={trainee['education_ordinance_id'] for trainee in trainees}
+    ).values('id', 'identification', 'title', 'education_ordinance').annotate(
+        total=Count('learnaim', distinct=True)
+    ).order_by('identification'):
+        competences_by_ordinance[competence['education_ordinance']].append(competence)
+
+    return [
+        dict(trainee, competences=[
+            {
+                'id': competence['id'],
+                'name': f'{competence["identification"]} - {competence["title"]}',
+                'total': competence['total'],
+                **{key: progress.get((trainee['id'], competence['id']), {}).get(key, 0)
+                   for key in ('closed', 'checked', 'pending')},
+            }
+            for competence in competences_by_ordinance[trainee['education_ordinance_id']]
+        ])
+        for trainee in trainees
+    ]
@@ -0,0 +1,96 @@
+import csv
+import datetime
+import json
+
+from django.db.models import QuerySet
+
+from learn_aim_check.models import CheckLearnAim
+
+# Columns of the export with the field path they are read from
+EXPORT_COLUMNS = {
+    'trainee_id': 'assigned_trainee_id',
+    'trainee_email': 'assigned_trainee__email',
+    'trainee_firstname': 'assigned_trainee__firstname',
+    'trainee_lastname': 'assigned_trainee__lastname',
+    'education_ordinance': 'assigned_trainee__education_ordinance__title',
+    'action_competence': 'closed_learn_check__action_competence__identification',
+    'learn_aim_id': 'closed_learn_check_id',
+    'learn_aim': 'closed_learn_check__identification',
+    'learn_aim_description': 'closed_learn_check__description',
+    'semester': 'semester',
+    'close_stage': 'close_stage',
+    'is_approved': 'is_approved',
+    'approved_by': 'approved_by__email',
+    'comment': 'comment',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+}
+
+# Rows fetched per round trip from the server-side cursor
+EXPORT_CHUNK_SIZE = 2000
+
+
+class Echo:
+    """
+    File-like object which returns the written value instead of buffering it (for csv.writer).
+    """
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def get_export_rows(trainees: QuerySet):
+    """
+    Iterate over the learn checks of the given trainees as rows of the EXPORT_COLUMNS.
+    The checks are read with a server-side cursor in chunks of EXPORT_CHUNK_SIZE rows, without model instances,
+    so the memory stays constant for any number of trainees and checks.
+    :param trainees: QuerySet of the trainees to export (used as subquery)
+    :return: generator of lists, ordered by trainee, learn aim and close stage
+    """
+    checks = CheckLearnAim.objects.filter(assigned_trainee__in=trainees.values('id')).order_by(
+        'assigned_trainee_id', 'closed_learn_check_id', 'close_stage')
+    columns = list(EXPORT_COLUMNS)
+    action_competence_index, learn_aim_index = columns.index('action_competence'), columns.index('learn_aim')
+    for row in checks.values_list(*EXPORT_COLUMNS.values()).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        row = [value.isoformat() if isinstance(value, datetime.datetime) else value for value in row]
+        # learn aims are identified with their action competence, i.e. A1.1
+        row[learn_aim_index] = f'{row[action_competence_index]}.{row[learn_aim_index]}'
+        yield row
+
+
+def stream_ndjson(rows):
+    """
+    :param rows: rows of the export
+    :return: generator of JSON lines, one object per row
+    """
+    for row in rows:
+        yield json.dumps(dict(zip(EXPORT_COLUMNS, row)), ensure_ascii=False) + '\n'
+
+
+def stream_csv(rows):
+    """
+    :param rows: rows of the export
+    :return: generator of CSV lines, starting with the header
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+# Export formats with their writer and content type
+EXPORT_FORMATS = {
+    'ndjson': (stream_ndjson, 'application/x-ndjson'),
+    'csv': (stream_csv, 'text/csv'),
+}
+
+
+def stream_export(trainees: QuerySet, export_format: str):
+    """
+    Stream the learning record of the given trainees.
+    :param trainees: QuerySet of the trainees to export
+    :param export_format: key of EXPORT_FORMATS
+    :return: generator of text chunks
+    """
+    stream, _ = EXPORT_FORMATS[export_format]
+    return stream(get_export_rows(trainees))
@@ -0,0 +1,211 @@
+import asyncio
+import re
+import threading
+import time
+
+import httpx
+import jwt
+import requests
+from cryptography.x509 import load_pem_x509_certificate
+from django.conf import settings
+
+from custom_exceptions.firebase_exceptions import FirebaseTokenInvalidException
+from services.profiling_service import measure_external
+
+# Issuer prefix of firebase id-tokens
+ID_TOKEN_ISSUER_PREFIX = 'https://securetoken.google.com/'
+
+# Seconds to wait for the key server
+KEY_REQUEST_TIMEOUT = 5
+
+# Minimum seconds between two forced key refreshes (caused by unknown key ids)
+MIN_FORCED_REFRESH_INTERVAL = 30
+
+
+class PublicKeyCache:
+    """
+    Cache for the public keys the firebase id-tokens are signed with.
+    The keys are fetched from the key server and kept as long as its Cache-Control header allows.
+    """
+
+    def __init__(self, url: str, default_ttl: int):
+        self.url = url
+        self.default_ttl = default_ttl
+        self._keys = {}
+        self._expires_at = 0.0
+        self._refreshed_at = 0.0
+        self._lock = threading.Lock()
+        self._async_lock = None
+
+    def get_key(self, key_id: str):
+        """
+        Get the public key with the given key id.
+        Unknown key ids trigger a refresh (keys are rotated regularly), but at most every
+        MIN_FORCED_REFRESH_INTERVAL seconds.
+        :param key_id: kid of the token header
+        :return: public key or None if the key is unknown
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._needs_refresh(key_id, now):
+                self._refresh(now)
+            return self._keys.get(key_id)
+
+    async def aget_key(self, key_id: str):
+        """
+        Async version of get_key, the keys are fetched without blocking the event loop.
+        :param key_id: kid of the token header
+        :return: public key or None if the key is unknown
+        """
+        if not self._needs_refresh(key_id, time.monotonic()):
+            return self._keys.get(key_id)
+
+        if self._async_lock is None:
+            self._async_lock = asyncio.Lock()
+        async with self._async_lock:
+            now = time.monotonic()
+            if self._needs_refresh(key_id, now):
+                with measure_external('firebase'):
+                    async with httpx.AsyncClient(timeout=KEY_REQUEST_TIMEOUT) as client:
+                        response = await client.get(self.url)
+                response.raise_for_status()
+                with self._lock:
+                    self._store(response.json(), response.headers, now)
+            return self._keys.get(key_id)
+
+    def _needs_refresh(self, key_id: str, now: float) -> bool:
+        """
+        :param key_id: kid of the token header
+        :param now: current monotonic time
+        :return: True if the keys are expired or the key id is unknown (and no refresh was forced recently)
+        """
+        return now >= self._expires_at or (
+                key_id not in self._keys and now - self._refreshed_at >= MIN_FORCED_REFRESH_INTERVAL)
+
+    def _refresh(self, now: float) -> None:
+        """
+        Fetch the public keys from the key server.
+        :param now: current monotonic time
+        :return: None
+        """
+        with measure_external('firebase'):
+            response = requests.get(self.url, timeout=KEY_REQUEST_TIMEOUT)
+        response.raise_for_status()
+        self._store(response.json(), response.headers, now)
+
+    def _store(self, certificates: dict, headers, now: float) -> None:
+        """
+        Store the public keys of a response of the key server.
+        :param certificates: dict with the key ids and the PEM certificates
+        :param headers: response headers
+        :param now: current monotonic time
+        :return: None
+        """
+        self._keys = {
+            key_id: load_pem_x509_certificate(certificate.encode()).public_key()
+            for key_id, certificate in certificates.items()
+        }
+        self._refreshed_at = now
+        self._expires_at = now + get_max_age(headers, self.default_ttl)
+
+
+def get_max_age(headers, default_ttl: int) -> int:
+    """
+    Get the seconds a response may be cached from its Cache-Control and Age headers.
+    :param headers: response headers
+    :param default_ttl: seconds to use if the response has no max-age
+    :return: seconds the response may be cached
+    """
+    cache_control = headers.get('Cache-Control', '')
+    if 'no-cache' in cache_control or 'no-store' in cache_control:
+        return 0
+    max_age = re.search(r'max-age=(\d+)', cache_control)
+    if not max_age:
+        return default_ttl
+    age = headers.get('Age', '0')
+    return max(int(max_age.group(1)) - (int(age) if age.isdigit() else 0), 0)
+
+
+_public_key_cache = None
+
+
+def get_public_key_cache() -> PublicKeyCache:
+    """
+    Get the process-wide public key cache.
+    :return: PublicKeyCache for FIREBASE_PUBLIC_KEYS_URL
+    """
+    global _public_key_cache
+    if _public_key_cache is None:
+        _public_key_cache = PublicKeyCache(settings.FIREBASE_PUBLIC_KEYS_URL, settings.FIREBASE_PUBLIC_KEYS_DEFAULT_TTL)
+    return _public_key_cache
+
+
+def verify_id_token(id_token: str) -> dict:
+    """
+    Verify a firebase id-token locally and return its claims.
+    The signature is checked against the cached public keys, the time based claims tolerate
+    FIREBASE_CLOCK_SKEW_SECONDS of clock skew between firebase and this server.
+    :param id_token: firebase id-token
+    :return: dict with the verified claims
+    :raises FirebaseTokenInvalidException: if the token can not be verified
+    """
+    try:
+        public_key = get_public_key_cache().get_key(_get_key_id(id_token))
+    except (jwt.PyJWTError, requests.RequestException, ValueError) as e:
+        raise FirebaseTokenInvalidException from e
+    return _decode(id_token, public_key)
+
+
+async def averify_id_token(id_token: str) -> dict:
+    """
+    Async version of verify_id_token, the public keys are fetched without blocking the event loop.
+    :param id_token: firebase id-token
+    :return: dict with the verified claims
+    :raises FirebaseTokenInvalidException: if the token can not be verified
+    """
+    try:
+        public_key = await get_public_key_cache().aget_key(_get_key_id(id_token))
+    except (jwt.PyJWTError, httpx.HTTPError, ValueError) as e:
+        raise FirebaseTokenInvalidException from e
+    return _decode(id_token, public_key)
+
+
+def _get_key_id(id_token: str) -> str:
+    """
+    :param id_token: firebase id-token
+    :return: kid of the token header
+    :raises FirebaseTokenInvalidException: if the token is not signed with RS256 or has no kid
+    """
+    header = jwt.get_unverified_header(id_token)
+    if header.get('alg') != 'RS256' or 'kid' not in header:
+        raise FirebaseTokenInvalidException
+    return header['kid']
+
+
+def _decode(id_token: str, public_key) -> dict:
+    """
+    Check the signature and the claims of a firebase id-token.
+    :param id_token: firebase id-token
+    :param public_key: public key of the kid of the token, None if the kid is unknown
+    :return: dict with the verified claims
+    :raises FirebaseTokenInvalidException: if the token can not be verified
+    """
+    if public_key is None:
+        raise FirebaseTokenInvalidException
+    project_id = settings.FIREBASE_PROJECT_ID
+    try:
+        claims = jwt.decode(
+            id_token,
+            public_key,
+            algorithms=['RS256'],
+            audience=project_id,
+            issuer=ID_TOKEN_ISSUER_PREFIX + project_id,
+            leeway=settings.FIREBASE_CLOCK_SKEW_SECONDS,
+            options={'require': ['exp', 'iat', 'aud', 'iss', 'sub']},
+        )
+    except (jwt.PyJWTError, ValueError) as e:
+        raise FirebaseTokenInvalidException from e
+
+    if not claims['sub'] or claims.get('auth_time', 0) > time.time() + settings.FIREBASE_CLOCK_SKEW_SECONDS:
+        raise FirebaseTokenInvalidException
+    return claims
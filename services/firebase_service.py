@@ -1,10 +1,14 @@
 import os
-from time import sleep
+from typing import NamedTuple
 
 import firebase_admin
+from asgiref.sync import sync_to_async
 from firebase_admin import auth, credentials
 
-from custom_exceptions.firebase_exceptions import FirebaseUserNotFoundException, FirebaseTokenNotFoundException
+from custom_exceptions.firebase_exceptions import FirebaseTokenInvalidException, FirebaseUserNotFoundException, \
+    FirebaseTokenNotFoundException
+from services import firebase_key_service
+from services.profiling_service import measure_external
 from users.models import User
 
 firebase_admin.initialize_app(credentials.Certificate({
@@ -21,18 +25,68 @@ firebase_admin.initialize_app(credentials.Certificate({
 }))
 
 
-def get_user_infos_with_id_token(id_token: str) -> auth.UserRecord:
+class FirebaseUserRecord(NamedTuple):
+    """
+    User infos taken from the claims of a verified firebase id-token.
+    Provides the same attributes as auth.UserRecord for user_service.get_or_create_user.
+    """
+    uid: str
+    email: str
+    display_name: str or None
+
+
+def get_user_infos_with_id_token(id_token: str) -> FirebaseUserRecord or auth.UserRecord:
     """
     Get user infos from firebase with given id-token.
+    The token is verified locally. The user infos are taken from the token claims, only if the token
+    has no email claim the user-record is loaded from firebase.
     :param id_token: firebase id-token
-    :return: user-record from firebase
+    :return: user-record built from the token claims or loaded from firebase
     """
     if not id_token:
         raise FirebaseTokenNotFoundException
     try:
-        sleep(1)
-        decoded_user = auth.verify_id_token(id_token)
-        return auth.get_user(decoded_user['user_id'])
+        claims = firebase_key_service.verify_id_token(id_token)
+    except FirebaseTokenInvalidException as e:
+        print(e.__cause__ or e.message)
+        raise FirebaseUserNotFoundException
+
+    if claims.get('email'):
+        return FirebaseUserRecord(uid=claims['sub'], email=claims['email'], display_name=claims.get('name'))
+    return get_user_record(claims['sub'])
+
+
+async def aget_user_infos_with_id_token(id_token: str) -> FirebaseUserRecord or auth.UserRecord:
+    """
+    Async version of get_user_infos_with_id_token.
+    The public keys are fetched without blocking the event loop, the rare user-record lookup (firebase-admin
+    has no async client) runs in a worker thread.
+    :param id_token: firebase id-token
+    :return: user-record built from the token claims or loaded from firebase
+    """
+    if not id_token:
+        raise FirebaseTokenNotFoundException
+    try:
+        claims = await firebase_key_service.averify_id_token(id_token)
+    except FirebaseTokenInvalidException as e:
+        print(e.__cause__ or e.message)
+        raise FirebaseUserNotFoundException
+
+    if claims.get('email'):
+        return FirebaseUserRecord(uid=claims['sub'], email=claims['email'], display_name=claims.get('name'))
+    return await sync_to_async(get_user_record)(claims['sub'])
+
+
+def get_user_record(uid: str) -> auth.UserRecord:
+    """
+    Load a user-record from firebase.
+    :param uid: firebase uid of the user
+    :return: user-record
+    :exception FirebaseUserNotFoundException: if the user can not be loaded
+    """
+    try:
+        with measure_external('firebase'):
+            return auth.get_user(uid)
     except (auth.UserNotFoundError, ValueError, Exception) as e:
         print(e)
         raise FirebaseUserNotFoundException
@@ -45,7 +99,8 @@ def revoke_refresh_token(user: User) -> bool:
     :return: bool
     """
     try:
-        auth.revoke_refresh_tokens(user.uid)
+        with measure_external('firebase'):
+            auth.revoke_refresh_tokens(user.uid)
         return True
     except Exception as e:
         print(e)
@@ -8,6 +8,62 @@ GROUP_NAMES = {
     'STUDENT': 'STUDENT',
 }
 
+# Process-wide cache of all group names by their id (groups are only changed by admins)
+_group_names_by_id = None
+
+
+def get_group_names_by_id(reload: bool = False) -> dict:
+    """
+    Get the names of all groups by their id.
+    The groups are loaded once per process and cached until a group is saved or deleted.
+    :param reload: True to reload the groups from the database
+    :return: dict with group-id as key and group-name as value.
+    """
+    global _group_names_by_id
+    if _group_names_by_id is None or reload:
+        _group_names_by_id = dict(Group.objects.values_list('id', 'name'))
+    return _group_names_by_id
+
+
+def clear_group_cache() -> None:
+    """
+    Clear the process-wide group cache.
+    :return: None
+    """
+    global _group_names_by_id
+    _group_names_by_id = None
+
+
+def get_user_roles(user: User) -> frozenset:
+    """
+    Get the names of all groups of the given user.
+    The role set is memoized on the user object. As every request loads its own user object, all permissions,
+    views and serializers of a request share the memo and the roles are queried at most once per request.
+    :param user: user to get the roles for
+    :return: frozenset of group names.
+    """
+    roles = getattr(user, '_role_names', None)
+    if roles is None:
+        if user.pk is None:
+            roles = frozenset()
+        else:
+            group_ids = list(User.groups.through.objects.filter(user_id=user.pk).values_list('group_id', flat=True))
+            group_names = get_group_names_by_id()
+            if not all(group_id in group_names for group_id in group_ids):
+                group_names = get_group_names_by_id(reload=True)
+            roles = frozenset(group_names[group_id] for group_id in group_ids if group_id in group_names)
+        user._role_names = roles
+    return roles
+
+
+def clear_user_roles(user: User) -> None:
+    """
+    Clear the memoized role set of the given user.
+    :param user: user to clear the roles for
+    :return: None
+    """
+    user.__dict__.pop('_role_names', None)
+
 
 def is_user_group_member(user: User, group: Group) -> bool:
     """
@@ -16,7 +72,7 @@ def is_user_group_member(user: User, group: Group) -> bool:
     :param group: group to check
     :return: True if user is a member of the given group.
     """
-    return user.groups.filter(name=group.name).exists()
+    return group.name in get_user_roles(user)
 
 
 def is_user_coach(user: User) -> bool:
@@ -25,7 +81,7 @@ def is_user_coach(user: User) -> bool:
     :param user: user to check
     :return: True if user is a coach.
     """
-    return is_user_group_member(user, Group.objects.get(name=GROUP_NAMES['COACH']))
+    return GROUP_NAMES['COACH'] in get_user_roles(user)
 
 
 def is_user_student(user: User) -> bool:
@@ -34,7 +90,7 @@ def is_user_student(user: User) -> bool:
     :param user: user to check
     :return: True if user is student.
     """
-    return is_user_group_member(user, Group.objects.get(name=GROUP_NAMES['STUDENT']))
+    return GROUP_NAMES['STUDENT'] in get_user_roles(user)
 
 
 def get_group_name_coach():
@@ -0,0 +1,75 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connections
+from django.db.models import F, Q, QuerySet
+
+from learn_aim_check.models import ActionCompetence, LearnAim, Tag
+
+# Text search configuration of the full-text index (has to match migration 0009_learn_aim_search_indexes)
+SEARCH_CONFIG = 'german'
+
+# Fields of the learn aims in the full-text index (has to match migration 0009_learn_aim_search_indexes)
+SEARCH_VECTOR_FIELDS = ('description', 'example_text')
+
+# Order of the search results (after the rank on Postgres)
+SEARCH_ORDERING = ('action_competence__identification', 'identification', 'id')
+
+
+def get_searchable_learn_aims(education_ordinance_id: int) -> QuerySet:
+    """
+    Get the learn aims of an education ordinance with everything the search results need.
+    :param education_ordinance_id: id of the education ordinance
+    :return: QuerySet of learn aims with the action competence and the tags, ordered by identification
+    """
+    return LearnAim.objects.filter(
+        action_competence__education_ordinance=education_ordinance_id
+    ).select_related('action_competence').prefetch_related('tags').order_by(*SEARCH_ORDERING)
+
+
+def search_learn_aims(learn_aims: QuerySet, text: str) -> QuerySet:
+    """
+    Filter learn aims by a search text.
+    Every word of the text has to be part (case-insensitive) of the description, the example text, the title of the
+    action competence or the name of a tag. On Postgres these LIKE filters are backed by trigram indexes, learn aims
+    whose description or example text match the text in the full-text index (i.e. other word forms) are found as
+    well, and the results are ordered by their rank.
+    :param learn_aims: QuerySet of learn aims (see get_searchable_learn_aims)
+    :param text: search text
+    :return: QuerySet of the matching learn aims
+    """
+    words = text.split()
+    if not words:
+        return learn_aims
+
+    matches = Q()
+    for word in words:
+        matches &= _get_word_filter(word)
+    if connections[learn_aims.db].vendor != 'postgresql':
+        return learn_aims.filter(matches)
+
+    query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+    return learn_aims.annotate(
+        search_vector=SearchVector(*SEARCH_VECTOR_FIELDS, config=SEARCH_CONFIG)
+    ).filter(matches | Q(search_vector=query)).annotate(
+        rank=SearchRank(F('search_vector'), query)
+    ).order_by('-rank', *SEARCH_ORDERING)
+
+
+def filter_learn_aims_by_tags(learn_aims: QuerySet, tag_ids: list) -> QuerySet:
+    """
+    :param learn_aims: QuerySet of learn aims
+    :param tag_ids: ids of tags
+    :return: QuerySet of the learn aims with at least one of the tags (without duplicates)
+    """
+    return learn_aims.filter(id__in=LearnAim.tags.through.objects.filter(tag_id__in=tag_ids).values('learnaim_id'))
+
+
+def _get_word_filter(word: str) -> Q:
+    """
+    :param word: word of the search text
+    :return: Q object matching the learn aims which contain the word in one of the searched fields
+    """
+    return (Q(description__icontains=word)
+            | Q(example_text__icontains=word)
+            | Q(action_competence__in=ActionCompetence.objects.filter(title__icontains=word).values('id'))
+            | Q(id__in=LearnAim.tags.through.objects.filter(
+                tag__in=Tag.objects.filter(tag_name__icontains=word).values('id')).values('learnaim_id')))
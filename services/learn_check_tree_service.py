@@ -0,0 +1,45 @@
+from django.db.models import Exists, OuterRef, Prefetch, QuerySet
+
+from learn_aim_check.models import ActionCompetence, CheckLearnAim, LearnAim
+from users.models import EducationOrdinance, User
+
+
+def get_learn_check_tree(education_ordinance: EducationOrdinance or int, trainee: User = None) -> QuerySet:
+    """
+    Get all action competences of an education ordinance with the complete learn aim tree.
+    The learn aims, their tags, the to-do state and the checks of the given trainee are loaded in a fixed
+    number of queries, independent of the size of the curriculum.
+    - learn aims are available as prefetched_learn_aims (ordered by identification)
+    - checks of the trainee are available as trainee_checks on every learn aim (ordered by close_stage)
+    - the to-do state of the trainee is available as is_marked_as_todo on every learn aim
+    Without a trainee only the static curriculum (action competences, learn aims and tags) is loaded.
+    :param education_ordinance: education ordinance (or its id) to load the action competences for
+    :param trainee: trainee to load the checks and to-dos for
+    :return: QuerySet of action competences ordered by identification
+    """
+    learn_aims = LearnAim.objects.prefetch_related('tags').order_by('identification')
+    if trainee is not None:
+        trainee_checks = CheckLearnAim.objects.filter(assigned_trainee=trainee).select_related(
+            'approved_by').order_by('close_stage')
+        learn_aims = learn_aims.annotate(
+            is_marked_as_todo=Exists(LearnAim.marked_as_todo.through.objects.filter(
+                learnaim_id=OuterRef('pk'), user_id=trainee.id))
+        ).prefetch_related(
+            Prefetch('marked_as_todo', queryset=User.objects.only('id')),
+            Prefetch('checklearnaim_set', queryset=trainee_checks, to_attr='trainee_checks'),
+        )
+
+    return ActionCompetence.objects.filter(education_ordinance=education_ordinance).prefetch_related(
+        Prefetch('learnaim_set', queryset=learn_aims, to_attr='prefetched_learn_aims')
+    ).order_by('identification')
+
+
+def with_check_relations(checks: QuerySet) -> QuerySet:
+    """
+    Load everything the CheckLearnAimSerializer needs for the given checks in a fixed number of queries.
+    :param checks: QuerySet of CheckLearnAim objects
+    :return: QuerySet with the approving user, the learn aim, its action competence, tags and to-dos
+    """
+    return checks.select_related('approved_by', 'closed_learn_check__action_competence').prefetch_related(
+        'closed_learn_check__tags', Prefetch('closed_learn_check__marked_as_todo', queryset=User.objects.only('id')))
+
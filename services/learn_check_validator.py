@@ -1,9 +1,13 @@
+from django.db import IntegrityError, transaction
+
 from custom_exceptions.learn_check_exceptions import LearnAimAlreadyChecked, \
+    LearnAimNotInEducationOrdinance, \
     LearnAimStageCantStartHigherThenOne, \
     LearnCheckNotApproved, \
     SemesterCantBeLowerThenPrevious
 from learn_aim_check.models import CheckLearnAim
 from learn_aim_check.serializers import CheckLearnAimSerializer
+from services.ordinance_index_service import is_learn_aim_in_ordinance
 from users.models import User
 
 
@@ -14,29 +18,70 @@ def learn_check_validator(user: User, serializer: CheckLearnAimSerializer, is_cr
     :param serializer: CheckLearnAimSerializer Post or Patch data
     :param is_create: bool if the request is a create or update
     :return: None
+    :raises LearnAimNotInEducationOrdinance: if the learn aim is not part of the user's education ordinance
     :raises LearnAimAlreadyChecked: if the learn aim is already checked
     :raises LearnAimStageCantStartHigherThenOne: if the learn aim stage is higher than 1
     :raises LearnCheckNotApproved: if the previous learn check is not approved
     :raises SemesterCantBeLowerThenPrevious: if the semester is lower than the current semester on Learn Check request
     :raises LearnAimAlreadyChecked: if the learn aim is already checked (only on create)
     """
+    if not is_learn_aim_in_ordinance(user.education_ordinance_id, serializer.validated_data['closed_learn_check'].id):
+        raise LearnAimNotInEducationOrdinance
+
     previous_checks = CheckLearnAim.objects.filter(
         assigned_trainee=user,
         closed_learn_check=serializer.validated_data['closed_learn_check']
     )
 
-    if len(previous_checks) == 0 and serializer.validated_data['close_stage'] > 1:
+    validate_against_previous_checks(list(previous_checks), serializer.validated_data['close_stage'],
+                                     serializer.validated_data['semester'], is_create,
+                                     None if is_create else serializer.instance.id)
+
+
+def validate_against_previous_checks(previous_checks: list, close_stage: int, semester: int, is_create=True,
+                                     instance_id: int = None) -> None:
+    """
+    Function to validate a learn check against the already existing checks of the same trainee and learn aim.
+    Works on checks loaded beforehand, so many learn checks can be validated against one snapshot.
+    :param previous_checks: List of the existing CheckLearnAim objects of the trainee for the learn aim
+    :param close_stage: stage of the learn check to validate
+    :param semester: semester of the learn check to validate
+    :param is_create: bool if the learn check is created or updated
+    :param instance_id: id of the updated learn check (only on update)
+    :return: None
+    :raises LearnAimStageCantStartHigherThenOne: if the learn aim stage is higher than 1
+    :raises LearnCheckNotApproved: if the previous learn check is not approved
+    :raises LearnAimAlreadyChecked: if the learn aim is already checked (only on create)
+    :raises SemesterCantBeLowerThenPrevious: if the semester is lower than the current semester on Learn Check request
+    """
+    if len(previous_checks) == 0 and close_stage > 1:
         raise LearnAimStageCantStartHigherThenOne
 
     for check in previous_checks:
         if is_create:
-            if (check.close_stage < serializer.validated_data['close_stage']
-                    and not check.is_approved):
+            if check.close_stage < close_stage and not check.is_approved:
                 raise LearnCheckNotApproved
-            if check.close_stage == serializer.validated_data['close_stage']:
+            if check.close_stage == close_stage:
                 raise LearnAimAlreadyChecked
-            if serializer.validated_data['semester'] < check.semester:
+            if semester < check.semester:
                 raise SemesterCantBeLowerThenPrevious
-        elif not is_create and check.id != serializer.instance.id:
-            if serializer.validated_data['semester'] < check.semester:
+        elif not is_create and check.id != instance_id:
+            if semester < check.semester:
                 raise SemesterCantBeLowerThenPrevious
+
+
+def save_learn_check(serializer: CheckLearnAimSerializer, **kwargs) -> CheckLearnAim:
+    """
+    Function to save a validated learn check.
+    Two concurrent requests can both pass the validation for the same stage of a learn aim, the unique constraint
+    on (trainee, learn aim, stage) rejects the second one.
+    :param serializer: validated CheckLearnAimSerializer
+    :param kwargs: additional fields to save (i.e. assigned_trainee)
+    :return: the saved CheckLearnAim object
+    :raises LearnAimAlreadyChecked: if the stage of the learn aim is already checked
+    """
+    try:
+        with transaction.atomic():
+            return serializer.save(**kwargs)
+    except IntegrityError as e:
+        raise LearnAimAlreadyChecked from e
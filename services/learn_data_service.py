@@ -0,0 +1,184 @@
+from asgiref.sync import sync_to_async
+
+from learn_aim_check.lean_serializers import get_simple_learn_aims, project_checks, serialize_check, \
+    serialize_learn_aim, use_lean_serializers
+from learn_aim_check.models import CheckLearnAim
+from learn_aim_check.serializers import CheckLearnAimSerializer, UserLearnDataSerializer
+from services.learn_check_tree_service import with_check_relations
+from services.sparse_fieldset_service import ALL_FIELDS, FieldSelection
+from users.models import User
+
+# Paths of the learn data which need the data to be loaded (see get_learn_data_needs)
+LEARN_DATA_PATHS = {
+    'checks': ('checked_learn_aims', 'user_data.learn_aims'),
+    'user_checks': ('user_data.learn_aims.checked',),
+    'learn_aims': ('checked_learn_aims.learn_aim', 'user_data.learn_aims'),
+    'approved_by': ('checked_learn_aims.approved_by', 'user_data.learn_aims.checked.approved_by'),
+    'tags': ('checked_learn_aims.learn_aim.tags', 'user_data.learn_aims.tags',
+             'user_data.learn_aims.checked.learn_aim.tags'),
+    'marked_as_todo': ('checked_learn_aims.learn_aim.marked_as_todo', 'user_data.learn_aims.marked_as_todo',
+                       'user_data.learn_aims.checked.learn_aim.marked_as_todo'),
+}
+
+
+def get_trainee_learn_data(trainee: User, request, selection: FieldSelection = ALL_FIELDS) -> dict:
+    """
+    Get the learn data of a trainee (TraineeLearnDataView) with a bounded number of queries.
+    The checks of the trainee are fetched once with their learn aims, tags, to-dos and action competences and
+    grouped in Python into both sections of the response.
+    :param trainee: trainee to get the learn data for
+    :param request: Request of the requesting user
+    :param selection: selected fields of the learn data
+    :return: dict with user_data and checked_learn_aims
+    """
+    if use_lean_serializers('learn-data'):
+        needs = get_learn_data_needs(selection)
+        rows = []
+        if needs['checks']:
+            rows = list(project_checks(get_check_rows_of_trainee(trainee), needs['approved_by']))
+        learn_aim_ids = {row['closed_learn_check_id'] for row in rows}
+        user_rows = rows
+        if request.user.id != trainee.id:
+            user_rows = []
+            if needs['user_checks']:
+                user_rows = list(project_checks(get_check_rows_of_user(request.user, learn_aim_ids),
+                                                needs['approved_by']))
+        learn_aims = {}
+        if needs['learn_aims']:
+            learn_aims = get_simple_learn_aims(learn_aim_ids, needs['tags'], needs['marked_as_todo'])
+        return selection.prune(assemble_lean_learn_data(trainee, rows, user_rows, learn_aims, request))
+
+    checks = list(get_checks_of_trainee(trainee))
+    if request.user.id == trainee.id:
+        user_checks = checks
+    else:
+        user_checks = list(get_checks_of_user(request.user, {check.closed_learn_check_id for check in checks}))
+    return selection.prune(assemble_learn_data(trainee, checks, user_checks, request))
+
+
+async def aget_lean_trainee_learn_data(trainee: User, request, selection: FieldSelection = ALL_FIELDS) -> dict:
+    """
+    Async version of get_trainee_learn_data with the lean serializers, the checks are loaded with the async ORM.
+    :param trainee: trainee to get the learn data for
+    :param request: Request of the requesting user
+    :param selection: selected fields of the learn data
+    :return: dict with user_data and checked_learn_aims
+    """
+    needs = get_learn_data_needs(selection)
+    rows = []
+    if needs['checks']:
+        rows = [row async for row in project_checks(get_check_rows_of_trainee(trainee), needs['approved_by'])]
+    learn_aim_ids = {row['closed_learn_check_id'] for row in rows}
+    user_rows = rows
+    if request.user.id != trainee.id:
+        user_rows = []
+        if needs['user_checks']:
+            user_rows = [row async for row in project_checks(get_check_rows_of_user(request.user, learn_aim_ids),
+                                                             needs['approved_by'])]
+    learn_aims = {}
+    if needs['learn_aims']:
+        learn_aims = await sync_to_async(get_simple_learn_aims)(learn_aim_ids, needs['tags'], needs['marked_as_todo'])
+    return selection.prune(assemble_lean_learn_data(trainee, rows, user_rows, learn_aims, request))
+
+
+def get_learn_data_needs(selection: FieldSelection) -> dict:
+    """
+    :param selection: selected fields of the learn data
+    :return: dict with True for every key of LEARN_DATA_PATHS whose data has to be loaded
+    """
+    return {need: selection.wants_any(*paths) for need, paths in LEARN_DATA_PATHS.items()}
+
+
+def get_checks_of_trainee(trainee: User):
+    """
+    :param trainee: trainee to get the checks for
+    :return: QuerySet of the checks of the trainee with everything the serializers need, ordered by id
+    """
+    return with_check_relations(get_check_rows_of_trainee(trainee))
+
+
+def get_check_rows_of_trainee(trainee: User):
+    """
+    :param trainee: trainee to get the checks for
+    :return: QuerySet of the checks of the trainee without relations, ordered by id
+    """
+    return CheckLearnAim.objects.filter(assigned_trainee=trainee).order_by('id')
+
+
+def get_checks_of_user(user: User, learn_aim_ids: set):
+    """
+    :param user: requesting user
+    :param learn_aim_ids: ids of the learn aims to get the checks for
+    :return: QuerySet of the checks of the user for the learn aims with everything the serializers need
+    """
+    return with_check_relations(get_check_rows_of_user(user, learn_aim_ids))
+
+
+def get_check_rows_of_user(user: User, learn_aim_ids: set):
+    """
+    :param user: requesting user
+    :param learn_aim_ids: ids of the learn aims to get the checks for
+    :return: QuerySet of the checks of the user for the learn aims without relations, ordered by id
+    """
+    return CheckLearnAim.objects.filter(assigned_trainee=user, closed_learn_check_id__in=learn_aim_ids).order_by('id')
+
+
+def assemble_learn_data(trainee: User, checks: list, user_checks: list, request) -> dict:
+    """
+    Build the learn data of a trainee from the loaded checks, without any database access.
+    Like the serializers without prefetched data, the checks and the to-do state of the learn aims in user_data
+    are the ones of the requesting user (not of the trainee). The learn aims are ordered by id.
+    :param trainee: trainee to build the learn data for
+    :param checks: checks of the trainee (see get_checks_of_trainee)
+    :param user_checks: checks of the requesting user for the learn aims of the trainee's checks
+    :param request: Request of the requesting user
+    :return: dict with user_data and checked_learn_aims
+    """
+    user_checks_by_learn_aim = {}
+    for check in sorted(user_checks, key=lambda check: check.close_stage):
+        user_checks_by_learn_aim.setdefault(check.closed_learn_check_id, []).append(check)
+
+    learn_aims = {}
+    for check in checks:
+        learn_aim = learn_aims.setdefault(check.closed_learn_check_id, check.closed_learn_check)
+        if not hasattr(learn_aim, 'trainee_checks'):
+            learn_aim.trainee_checks = user_checks_by_learn_aim.get(learn_aim.id, [])
+            learn_aim.is_marked_as_todo = any(user.id == request.user.id for user in learn_aim.marked_as_todo.all())
+    trainee.checked_learn_aims = [learn_aims[learn_aim_id] for learn_aim_id in sorted(learn_aims)]
+
+    return {
+        'user_data': UserLearnDataSerializer(trainee, context={'request': request}).data,
+        'checked_learn_aims': CheckLearnAimSerializer(checks, many=True, context={'request': request}).data
+    }
+
+
+def assemble_lean_learn_data(trainee: User, rows: list, user_rows: list, learn_aims: dict, request) -> dict:
+    """
+    Build the learn data of a trainee with the lean serializers, without any database access.
+    Same output as assemble_learn_data.
+    :param trainee: trainee to build the learn data for
+    :param rows: check rows of the trainee (see get_check_rows_of_trainee and lean_serializers.project_checks)
+    :param user_rows: check rows of the requesting user for the learn aims of the trainee's checks
+    :param learn_aims: serialized learn aims of the trainee's checks (see lean_serializers.get_simple_learn_aims),
+                       empty if they are not selected
+    :param request: Request of the requesting user
+    :return: dict with user_data and checked_learn_aims
+    """
+    user_checks_by_learn_aim = {}
+    for row in sorted(user_rows, key=lambda row: row['close_stage']):
+        learn_aim_id = row['closed_learn_check_id']
+        user_checks_by_learn_aim.setdefault(learn_aim_id, []).append(serialize_check(row, learn_aims.get(learn_aim_id)))
+
+    return {
+        'user_data': {
+            'email': trainee.email,
+            'firstname': trainee.firstname,
+            'lastname': trainee.lastname,
+            'learn_aims': [
+                serialize_learn_aim(learn_aims[learn_aim_id], user_checks_by_learn_aim.get(learn_aim_id, []),
+                                    request.user.id in learn_aims[learn_aim_id]['marked_as_todo'])
+                for learn_aim_id in sorted(learn_aims)
+            ],
+        },
+        'checked_learn_aims': [serialize_check(row, learn_aims.get(row['closed_learn_check_id'])) for row in rows],
+    }
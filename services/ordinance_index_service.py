@@ -0,0 +1,154 @@
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from learn_aim_check.models import ActionCompetence, LearnAim
+from services.conditional_request_service import aget_curriculum_state, get_curriculum_state
+
+# Membership indexes by education ordinance id (see get_ordinance_index)
+_indexes = {}
+
+
+class OrdinanceIndex:
+    """
+    Ids of the action competences and learn aims of an education ordinance, for membership checks without loading
+    the curriculum.
+    The index belongs to the curriculum state (see get_curriculum_state) read from the database before it was built,
+    so every process detects a changed curriculum without a shared cache.
+    """
+
+    def __init__(self, state: tuple, competence_ids: frozenset, learn_aim_ids: frozenset):
+        self.state = state
+        self.expires_at = time.monotonic() + settings.ORDINANCE_INDEX_TIMEOUT
+        self.competence_ids = competence_ids
+        self.learn_aim_ids = learn_aim_ids
+
+    def is_valid(self, state: tuple) -> bool:
+        """
+        Check if the index belongs to the given curriculum state and is not expired.
+        :param state: current curriculum state of the education ordinance
+        :return: True if the index can be used.
+        """
+        return self.state == state and time.monotonic() < self.expires_at
+
+
+def is_competence_in_ordinance(education_ordinance_id: int or None, competence_id: int) -> bool:
+    """
+    Check if an action competence is part of an education ordinance.
+    Hits of the index only cost the query of the curriculum state, misses are confirmed with a query on the links
+    before a request is rejected.
+    :param education_ordinance_id: id of the education ordinance (None if the user has none)
+    :param competence_id: id of the action competence
+    :return: True if the action competence is part of the education ordinance
+    """
+    if education_ordinance_id is None:
+        return False
+    index = get_ordinance_index(education_ordinance_id)
+    if index is not None and competence_id in index.competence_ids:
+        return True
+    return _get_competence_links(education_ordinance_id, competence_id).exists()
+
+
+async def ais_competence_in_ordinance(education_ordinance_id: int or None, competence_id: int) -> bool:
+    """
+    Async version of is_competence_in_ordinance.
+    :param education_ordinance_id: id of the education ordinance (None if the user has none)
+    :param competence_id: id of the action competence
+    :return: True if the action competence is part of the education ordinance
+    """
+    if education_ordinance_id is None:
+        return False
+    index = await aget_ordinance_index(education_ordinance_id)
+    if index is not None and competence_id in index.competence_ids:
+        return True
+    return await _get_competence_links(education_ordinance_id, competence_id).aexists()
+
+
+def get_learn_aim_ids_in_ordinance(education_ordinance_id: int or None, learn_aim_ids) -> set:
+    """
+    Get the learn aims which are part of an education ordinance.
+    Hits of the index only cost the query of the curriculum state, the misses are confirmed with a single query.
+    :param education_ordinance_id: id of the education ordinance (None if the user has none)
+    :param learn_aim_ids: ids of the learn aims to check
+    :return: Set of the ids of the given learn aims which are part of the education ordinance
+    """
+    learn_aim_ids = set(learn_aim_ids)
+    if education_ordinance_id is None or not learn_aim_ids:
+        return set()
+    index = get_ordinance_index(education_ordinance_id)
+    found = learn_aim_ids & index.learn_aim_ids if index is not None else set()
+    if found != learn_aim_ids:
+        found |= set(LearnAim.objects.filter(
+            id__in=learn_aim_ids - found, action_competence__education_ordinance=education_ordinance_id
+        ).values_list('id', flat=True))
+    return found
+
+
+def is_learn_aim_in_ordinance(education_ordinance_id: int or None, learn_aim_id: int) -> bool:
+    """
+    :param education_ordinance_id: id of the education ordinance (None if the user has none)
+    :param learn_aim_id: id of the learn aim
+    :return: True if the learn aim is part of the education ordinance (see get_learn_aim_ids_in_ordinance)
+    """
+    return learn_aim_id in get_learn_aim_ids_in_ordinance(education_ordinance_id, [learn_aim_id])
+
+
+def get_ordinance_index(education_ordinance_id: int, state: tuple = None) -> OrdinanceIndex or None:
+    """
+    Get the membership index of an education ordinance.
+    The index is built with two queries once per curriculum state and process and kept for ORDINANCE_INDEX_TIMEOUT
+    seconds at most.
+    :param education_ordinance_id: id of the education ordinance
+    :param state: curriculum state of the education ordinance (see get_curriculum_state), read if not given
+    :return: OrdinanceIndex or None if the index is disabled (ORDINANCE_INDEX_TIMEOUT=0)
+    """
+    if settings.ORDINANCE_INDEX_TIMEOUT <= 0:
+        return None
+    if state is None:
+        state = get_curriculum_state(education_ordinance_id)
+    index = _indexes.get(education_ordinance_id)
+    if index is None or not index.is_valid(state):
+        index = _build_index(education_ordinance_id, state)
+        _indexes[education_ordinance_id] = index
+    return index
+
+
+async def aget_ordinance_index(education_ordinance_id: int) -> OrdinanceIndex or None:
+    """
+    Async version of get_ordinance_index.
+    Only the curriculum state is read with the async ORM, a stale index is rebuilt in a worker thread.
+    :param education_ordinance_id: id of the education ordinance
+    :return: OrdinanceIndex or None if the index is disabled (ORDINANCE_INDEX_TIMEOUT=0)
+    """
+    if settings.ORDINANCE_INDEX_TIMEOUT <= 0:
+        return None
+    state = await aget_curriculum_state(education_ordinance_id)
+    index = _indexes.get(education_ordinance_id)
+    if index is None or not index.is_valid(state):
+        index = await sync_to_async(get_ordinance_index)(education_ordinance_id, state)
+    return index
+
+
+def _get_competence_links(education_ordinance_id: int, competence_id: int):
+    """
+    :param education_ordinance_id: id of the education ordinance
+    :param competence_id: id of the action competence
+    :return: QuerySet of the link of the action competence to the education ordinance
+    """
+    return ActionCompetence.education_ordinance.through.objects.filter(
+        educationordinance_id=education_ordinance_id, actioncompetence_id=competence_id)
+
+
+def _build_index(education_ordinance_id: int, state: tuple) -> OrdinanceIndex:
+    """
+    :param education_ordinance_id: id of the education ordinance
+    :param state: curriculum state the index is built for
+    :return: OrdinanceIndex with the current action competences and learn aims of the education ordinance
+    """
+    return OrdinanceIndex(
+        state,
+        frozenset(ActionCompetence.education_ordinance.through.objects.filter(
+            educationordinance_id=education_ordinance_id).values_list('actioncompetence_id', flat=True)),
+        frozenset(LearnAim.objects.filter(
+            action_competence__education_ordinance=education_ordinance_id).values_list('id', flat=True)))
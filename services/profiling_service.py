@@ -0,0 +1,193 @@
+import re
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from rest_framework import serializers
+
+# Amount of executions of the same (normalized) query per request from which it is reported as N+1
+N_PLUS_ONE_THRESHOLD = 5
+
+# Frames to walk up from a query to find the serializer method which caused it
+MAX_STACK_DEPTH = 60
+
+# Profile of the current request, None if the request is not profiled
+_current_profile = ContextVar('request_profile', default=None)
+
+_NUMBER_PATTERN = re.compile(r'\b\d+(\.\d+)?\b')
+_STRING_PATTERN = re.compile(r"'(?:[^']|'')*'")
+_IN_PATTERN = re.compile(r'\bIN \((?:%s|\?)(?:, (?:%s|\?))*\)')
+
+
+class RequestProfile:
+    """
+    Collects the SQL queries, the database time, the serialization time and the time of external calls of a request.
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.query_count = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.is_serializing = False
+        self.external_times = Counter()
+        self.query_counts = Counter()
+        self.query_origins = {}
+
+    def record_query(self, sql: str, duration: float) -> None:
+        """
+        Record an executed query.
+        Repeated queries are attributed to the serializer method which executed them.
+        :param sql: executed SQL
+        :param duration: duration of the query in seconds
+        :return: None
+        """
+        self.query_count += 1
+        self.db_time += duration
+        normalized_sql = normalize_sql(sql)
+        self.query_counts[normalized_sql] += 1
+        if self.query_counts[normalized_sql] == N_PLUS_ONE_THRESHOLD:
+            self.query_origins[normalized_sql] = find_serializer_method()
+
+    def get_n_plus_one_queries(self) -> list:
+        """
+        Get the queries which were executed at least N_PLUS_ONE_THRESHOLD times.
+        :return: List of dicts with the normalized SQL, the count and the originating serializer method
+        """
+        return [
+            {'sql': sql, 'count': count, 'origin': self.query_origins.get(sql)}
+            for sql, count in self.query_counts.most_common()
+            if count >= N_PLUS_ONE_THRESHOLD
+        ]
+
+    def get_total_time(self) -> float:
+        """
+        :return: seconds since the profile was started
+        """
+        return time.perf_counter() - self.started_at
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper which records every query in the profile of the current request.
+    The profile is taken from the context, so queries of async views which run in a worker thread (with the
+    connection of that thread) are recorded as well.
+    """
+    profile = _current_profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.record_query(sql, time.perf_counter() - start)
+
+
+def install_query_recorder(connection, **kwargs) -> None:
+    """
+    Install record_query on a database connection (receiver of the connection_created signal).
+    :param connection: DatabaseWrapper of the connection
+    :return: None
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def start_profile() -> tuple:
+    """
+    Start profiling the current request.
+    :return: tuple of the new profile and the token to reset the context with
+    """
+    profile = RequestProfile()
+    return profile, _current_profile.set(profile)
+
+
+def stop_profile(token) -> None:
+    """
+    Stop profiling the current request.
+    :param token: token returned by start_profile
+    :return: None
+    """
+    _current_profile.reset(token)
+
+
+def get_current_profile() -> RequestProfile or None:
+    """
+    :return: profile of the current request or None if the request is not profiled
+    """
+    return _current_profile.get()
+
+
+@contextmanager
+def measure_external(name: str):
+    """
+    Context manager to measure the time of a call to an external service (i.e. firebase) in the current profile.
+    :param name: name of the external service
+    """
+    profile = _current_profile.get()
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.external_times[name] += time.perf_counter() - start
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Replace the literals and the IN-lists of a query, so executions with different parameters are equal.
+    :param sql: SQL of the query
+    :return: normalized SQL
+    """
+    sql = _STRING_PATTERN.sub('?', sql)
+    sql = _NUMBER_PATTERN.sub('?', sql)
+    return _IN_PATTERN.sub('IN (...)', sql)
+
+
+def find_serializer_method() -> str or None:
+    """
+    Find the serializer field or method (i.e. LearnAimSerializer.get_checked) in the current call stack.
+    If the query was executed by a field of a nested serializer, the method field which created the nested
+    serializer is added (i.e. LearnAimSerializer.tags in UserLearnDataSerializer.get_learn_aims).
+    :return: name of the serializer field or method, None if the query was not executed during serialization
+    """
+    frame = sys._getframe(1)
+    origin = None
+    for _ in range(MAX_STACK_DEPTH):
+        if frame is None:
+            break
+        instance = frame.f_locals.get('self')
+        if isinstance(instance, serializers.Serializer):
+            if frame.f_code.co_name.startswith('get_') and frame.f_code.co_name[4:] in instance.fields:
+                method = f'{type(instance).__name__}.{frame.f_code.co_name}'
+                return f'{origin} in {method}' if origin else method
+            field = frame.f_locals.get('field')
+            if origin is None and isinstance(field, serializers.Field):
+                origin = f'{type(instance).__name__}.{field.field_name}'
+        frame = frame.f_back
+    return origin
+
+
+class ProfiledSerializerMixin:
+    """
+    Mixin for serializers to measure their serialization time (without the database time) in the current profile.
+    Only the outermost serializer of a response is measured, serializers which are created while another one is
+    measured (nested or in a method field) are part of its time.
+    """
+
+    def to_representation(self, instance):
+        profile = _current_profile.get()
+        if profile is None or profile.is_serializing:
+            return super().to_representation(instance)
+
+        start, db_time = time.perf_counter(), profile.db_time
+        profile.is_serializing = True
+        try:
+            return super().to_representation(instance)
+        finally:
+            profile.is_serializing = False
+            profile.serialize_time += time.perf_counter() - start - (profile.db_time - db_time)
@@ -0,0 +1,155 @@
+from django.db.models import Count, IntegerField, Max, OuterRef, Q, QuerySet, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from learn_aim_check.models import ActionCompetence, CheckLearnAim, LearnAim, TraineeCompetenceProgress, \
+    TraineeProgress
+from services.sparse_fieldset_service import ALL_FIELDS, FieldSelection
+from users.models import EducationOrdinance, User
+
+
+def get_action_competence_progress(education_ordinance: EducationOrdinance or int, trainee: User,
+                                   selection: FieldSelection = ALL_FIELDS) -> QuerySet:
+    """
+    Get all action competences of an education ordinance with the progress of the given trainee.
+    The progress is computed with a single grouped query:
+    - learn_aim_count: total amount of learn aims of the action competence (only if total is selected)
+    - closed_count: amount of closed learn aims of the trainee, read from the TraineeCompetenceProgress projection
+      (only if closed is selected)
+    :param education_ordinance: education ordinance (or its id) to get the action competences for
+    :param trainee: trainee to compute the progress for
+    :param selection: selected fields of the chart (see DiagramSerializer)
+    :return: QuerySet of annotated action competences ordered by identification
+    """
+    progress = {}
+    if selection.wants('total'):
+        progress['learn_aim_count'] = Count('learnaim')
+    if selection.wants('closed'):
+        closed_count = TraineeCompetenceProgress.objects.filter(
+            trainee=trainee, action_competence=OuterRef('pk')).values('closed_count')
+        progress['closed_count'] = Coalesce(Subquery(closed_count, output_field=IntegerField()), Value(0))
+    return ActionCompetence.objects.filter(education_ordinance=education_ordinance).annotate(
+        **progress).order_by('identification')
+
+
+def get_closed_count(trainee: User, action_competence: ActionCompetence) -> int:
+    """
+    Get the amount of closed learn aims of a trainee for an action competence.
+    :param trainee: trainee to get the amount for
+    :param action_competence: action competence to get the amount for
+    :return: amount of learn aims with an approved stage 3 check
+    """
+    return _get_closed_count_queryset(trainee, action_competence).first() or 0
+
+
+async def aget_closed_count(trainee: User, action_competence: ActionCompetence) -> int:
+    """
+    Async version of get_closed_count.
+    :param trainee: trainee to get the amount for
+    :param action_competence: action competence to get the amount for
+    :return: amount of learn aims with an approved stage 3 check
+    """
+    return await _get_closed_count_queryset(trainee, action_competence).afirst() or 0
+
+
+def _get_closed_count_queryset(trainee: User, action_competence: ActionCompetence) -> QuerySet:
+    """
+    :param trainee: trainee to get the amount for
+    :param action_competence: action competence to get the amount for
+    :return: QuerySet of the closed_count of the TraineeCompetenceProgress row
+    """
+    return TraineeCompetenceProgress.objects.filter(
+        trainee=trainee, action_competence=action_competence
+    ).values_list('closed_count', flat=True)
+
+
+def get_approved_stage(trainee: User, learn_aim: LearnAim) -> int:
+    """
+    Get the highest approved stage of a trainee for a learn aim.
+    :param trainee: trainee to get the stage for
+    :param learn_aim: learn aim to get the stage for
+    :return: highest approved stage or 0 if no check is approved
+    """
+    return TraineeProgress.objects.filter(
+        trainee=trainee, learn_aim=learn_aim
+    ).values_list('approved_stage', flat=True).first() or 0
+
+
+def update_trainee_progress(trainee_id: int, learn_aim_ids) -> None:
+    """
+    Update the progress projection of a trainee after checks of the given learn aims have changed.
+    Has to be called in the same transaction as the change of the checks.
+    :param trainee_id: id of the trainee whose checks have changed
+    :param learn_aim_ids: ids of the learn aims whose checks have changed
+    :return: None
+    """
+    learn_aim_ids = set(learn_aim_ids)
+    competence_ids = set(LearnAim.objects.filter(id__in=learn_aim_ids).values_list('action_competence_id', flat=True))
+
+    _write_trainee_progress(
+        CheckLearnAim.objects.filter(assigned_trainee_id=trainee_id, closed_learn_check_id__in=learn_aim_ids),
+        TraineeProgress.objects.filter(trainee_id=trainee_id, learn_aim_id__in=learn_aim_ids),
+    )
+    _write_competence_progress(
+        TraineeProgress.objects.filter(trainee_id=trainee_id, learn_aim__action_competence_id__in=competence_ids),
+        TraineeCompetenceProgress.objects.filter(trainee_id=trainee_id, action_competence_id__in=competence_ids),
+    )
+
+
+def rebuild_trainee_progress(trainee_ids=None) -> None:
+    """
+    Rebuild the progress projection from scratch.
+    Has to be called in a transaction.
+    :param trainee_ids: ids of the trainees to rebuild the projection for, None for all trainees
+    :return: None
+    """
+    checks = CheckLearnAim.objects.all()
+    progress = TraineeProgress.objects.all()
+    competence_progress = TraineeCompetenceProgress.objects.all()
+    if trainee_ids is not None:
+        checks = checks.filter(assigned_trainee_id__in=trainee_ids)
+        progress = progress.filter(trainee_id__in=trainee_ids)
+        competence_progress = competence_progress.filter(trainee_id__in=trainee_ids)
+
+    _write_trainee_progress(checks, progress)
+    _write_competence_progress(progress, competence_progress)
+
+
+def _write_trainee_progress(checks: QuerySet, progress: QuerySet) -> None:
+    """
+    Replace the given TraineeProgress rows with the aggregated state of the given checks.
+    :param checks: QuerySet of the checks to aggregate
+    :param progress: QuerySet of the TraineeProgress rows covering the checks
+    :return: None
+    """
+    rows = checks.values('assigned_trainee_id', 'closed_learn_check_id').annotate(
+        highest_stage=Max('close_stage'),
+        approved_stage=Coalesce(Max('close_stage', filter=Q(is_approved=True)), Value(0)),
+        pending_count=Count('id', filter=Q(is_approved=False)),
+    ).order_by()
+    progress.delete()
+    TraineeProgress.objects.bulk_create([
+        TraineeProgress(trainee_id=row['assigned_trainee_id'], learn_aim_id=row['closed_learn_check_id'],
+                        highest_stage=row['highest_stage'], approved_stage=row['approved_stage'],
+                        pending_count=row['pending_count'])
+        for row in rows
+    ], batch_size=1000)
+
+
+def _write_competence_progress(progress: QuerySet, competence_progress: QuerySet) -> None:
+    """
+    Replace the given TraineeCompetenceProgress rows with the aggregated state of the given TraineeProgress rows.
+    :param progress: QuerySet of the TraineeProgress rows to aggregate
+    :param competence_progress: QuerySet of the TraineeCompetenceProgress rows covering the TraineeProgress rows
+    :return: None
+    """
+    rows = progress.values('trainee_id', 'learn_aim__action_competence_id').annotate(
+        closed_count=Count('id', filter=Q(approved_stage__gte=3)),
+        pending_count=Sum('pending_count'),
+    ).order_by()
+    competence_progress.delete()
+    TraineeCompetenceProgress.objects.bulk_create([
+        TraineeCompetenceProgress(trainee_id=row['trainee_id'],
+                                  action_competence_id=row['learn_aim__action_competence_id'],
+                                  closed_count=row['closed_count'], pending_count=row['pending_count'])
+        for row in rows
+    ], batch_size=1000)
@@ -0,0 +1,302 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from rest_framework.renderers import JSONRenderer
+
+from learn_aim_check.models import CheckLearnAim
+from services.conditional_request_service import Validators, get_not_modified_response, set_validators
+from services.curriculum_cache_service import CURRICULUM_VERSION_KEY
+from services.group_service import is_user_coach
+
+# Prefix of all keys of the response cache
+RESPONSE_CACHE_PREFIX = 'response-cache'
+
+# Endpoints whose rendered responses are cached (names of the hit and miss counters)
+RESPONSE_CACHE_ENDPOINTS = ('learn-check', 'learn-check-chart', 'learn-check-chart-list', 'learn-data')
+
+# Cache-Key of the generation of all responses (see invalidate_all_responses)
+RESPONSE_CACHE_GENERATION_KEY = f'{RESPONSE_CACHE_PREFIX}:generation'
+
+# Response header which tells if a response was served from the response cache
+RESPONSE_CACHE_HEADER = 'X-Response-Cache'
+
+
+def is_response_cache_enabled() -> bool:
+    """
+    :return: True if rendered responses are cached (RESPONSE_CACHE_TIMEOUT setting)
+    """
+    return settings.RESPONSE_CACHE_TIMEOUT > 0
+
+
+def get_response_cache_key(endpoint: str, request, user_ids) -> str or None:
+    """
+    Build the cache key of a per-user response.
+    The key contains the requesting user, its role, the path and query params, the curriculum version, the
+    generation of all responses and the response generations of all users whose data is part of the response, so a
+    changed generation (see invalidate_user_responses) makes the cached responses of the user unreachable. The
+    versions are read with a single cache call, missing versions are initialized with the current time.
+    :param endpoint: name of the endpoint (see RESPONSE_CACHE_ENDPOINTS)
+    :param request: Request of the user (DRF or Django)
+    :param user_ids: ids of the users whose data is part of the response (i.e. the trainee)
+    :return: cache key or None if the response is not cached (cache disabled or not rendered as JSON)
+    """
+    if not is_response_cache_enabled() or not _is_json(request):
+        return None
+    keys = [CURRICULUM_VERSION_KEY, RESPONSE_CACHE_GENERATION_KEY, *_get_generation_keys(user_ids)]
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            cache.add(key, time.time_ns(), timeout=None)
+            generations[key] = cache.get(key)
+    return _build_key(endpoint, request, [generations[key] for key in keys])
+
+
+async def aget_response_cache_key(endpoint: str, request, user_ids) -> str or None:
+    """
+    Async version of get_response_cache_key.
+    :param endpoint: name of the endpoint (see RESPONSE_CACHE_ENDPOINTS)
+    :param request: HttpRequest of the user
+    :param user_ids: ids of the users whose data is part of the response (i.e. the trainee)
+    :return: cache key or None if the response cache is disabled
+    """
+    if not is_response_cache_enabled():
+        return None
+    keys = [CURRICULUM_VERSION_KEY, RESPONSE_CACHE_GENERATION_KEY, *_get_generation_keys(user_ids)]
+    generations = await cache.aget_many(keys)
+    for key in keys:
+        if key not in generations:
+            await cache.aadd(key, time.time_ns(), timeout=None)
+            generations[key] = await cache.aget(key)
+    return _build_key(endpoint, request, [generations[key] for key in keys])
+
+
+def get_cached_response(request, key: str or None) -> HttpResponse or None:
+    """
+    Get a cached response (or 304 Not Modified if the client has it already) and count the hit or miss.
+    :param request: Request of the user
+    :param key: cache key (see get_response_cache_key), None if the response is not cached
+    :return: HttpResponse or None if the response is not in the cache
+    """
+    if key is None:
+        return None
+    entry = cache.get(key)
+    _count(key, entry is not None)
+    return _build_response(request, entry)
+
+
+async def aget_cached_response(request, key: str or None) -> HttpResponse or None:
+    """
+    Async version of get_cached_response.
+    :param request: HttpRequest of the user
+    :param key: cache key (see aget_response_cache_key), None if the response is not cached
+    :return: HttpResponse or None if the response is not in the cache
+    """
+    if key is None:
+        return None
+    entry = await cache.aget(key)
+    counter = _get_counter_key(key, entry is not None)
+    try:
+        await cache.aincr(counter)
+    except ValueError:
+        await cache.aadd(counter, 1, timeout=None)
+    return _build_response(request, entry)
+
+
+def cache_response(key: str or None, response):
+    """
+    Store a rendered response in the response cache.
+    API responses are stored once they are rendered (post render callback), responses of the async views at once.
+    :param key: cache key (see get_response_cache_key), None if the response is not cached
+    :param response: Response or HttpResponse, with the ETag header if it has validators
+    :return: the response
+    """
+    if key is None or response.status_code != 200:
+        return response
+    response[RESPONSE_CACHE_HEADER] = 'MISS'
+    if getattr(response, 'is_rendered', True):
+        _store(key, response)
+    else:
+        response.add_post_render_callback(lambda rendered: _store(key, rendered))
+    return response
+
+
+async def acache_response(key: str or None, response: HttpResponse) -> HttpResponse:
+    """
+    Async version of cache_response for the rendered responses of the async views.
+    :param key: cache key (see aget_response_cache_key), None if the response is not cached
+    :param response: HttpResponse, with the ETag header if it has validators
+    :return: the response
+    """
+    if key is None or response.status_code != 200:
+        return response
+    response[RESPONSE_CACHE_HEADER] = 'MISS'
+    await cache.aset(key, _get_entry(response), timeout=settings.RESPONSE_CACHE_TIMEOUT)
+    return response
+
+
+def invalidate_user_responses(user_ids) -> None:
+    """
+    Invalidate the cached responses which contain data of the given users, once the transaction is committed.
+    All generations are replaced with a single cache call.
+    :param user_ids: ids of the users
+    :return: None
+    """
+    user_ids = set(user_ids)
+    if not is_response_cache_enabled() or not user_ids:
+        return
+    transaction.on_commit(lambda: cache.set_many(
+        dict.fromkeys(_get_generation_keys(user_ids), time.time_ns()), timeout=None))
+
+
+def invalidate_all_responses() -> None:
+    """
+    Invalidate all cached responses, once the transaction is committed.
+    :return: None
+    """
+    if is_response_cache_enabled():
+        transaction.on_commit(lambda: cache.set(RESPONSE_CACHE_GENERATION_KEY, time.time_ns(), timeout=None))
+
+
+def invalidate_todo_responses(user_ids, learn_aim_ids) -> None:
+    """
+    Invalidate the cached responses affected by changed to-dos: the responses of the users who changed them and of
+    all trainees with checks of the learn aims (the learn aims of checks list all users who marked them as to-do).
+    :param user_ids: ids of the users whose to-dos changed
+    :param learn_aim_ids: ids of the learn aims whose to-dos changed
+    :return: None
+    """
+    if not is_response_cache_enabled():
+        return
+    trainee_ids = CheckLearnAim.objects.filter(closed_learn_check_id__in=list(learn_aim_ids)).values_list(
+        'assigned_trainee_id', flat=True).distinct()
+    invalidate_user_responses({*user_ids, *trainee_ids})
+
+
+def invalidate_user_data_responses(user_id: int) -> None:
+    """
+    Invalidate the cached responses affected by changed user data: the responses of the user and of all trainees
+    with checks approved by the user (the approver is part of the checks).
+    :param user_id: id of the changed user
+    :return: None
+    """
+    if not is_response_cache_enabled():
+        return
+    trainee_ids = CheckLearnAim.objects.filter(approved_by_id=user_id).values_list(
+        'assigned_trainee_id', flat=True).distinct()
+    invalidate_user_responses({user_id, *trainee_ids})
+
+
+def get_response_cache_stats() -> dict:
+    """
+    :return: dict with the hits and misses of the response cache by endpoint (counted since the last reset)
+    """
+    keys = {(endpoint, counter): f'{RESPONSE_CACHE_PREFIX}:{counter}:{endpoint}'
+            for endpoint in RESPONSE_CACHE_ENDPOINTS for counter in ('hits', 'misses')}
+    values = cache.get_many(keys.values())
+    stats = {endpoint: {'hits': 0, 'misses': 0} for endpoint in RESPONSE_CACHE_ENDPOINTS}
+    for (endpoint, counter), key in keys.items():
+        stats[endpoint][counter] = values.get(key, 0)
+    return stats
+
+
+def reset_response_cache_stats() -> None:
+    """
+    Reset the hit and miss counters of the response cache.
+    :return: None
+    """
+    cache.delete_many([f'{RESPONSE_CACHE_PREFIX}:{counter}:{endpoint}'
+                       for endpoint in RESPONSE_CACHE_ENDPOINTS for counter in ('hits', 'misses')])
+
+
+def _is_json(request) -> bool:
+    """
+    :param request: Request of the user
+    :return: True if the response is rendered as JSON (the browsable API is not cached)
+    """
+    renderer = getattr(request, 'accepted_renderer', None)
+    return renderer is None or renderer.format == JSONRenderer.format
+
+
+def _get_generation_keys(user_ids) -> list:
+    """
+    :param user_ids: ids of users
+    :return: List of the keys of the response generations of the users, ordered by user id
+    """
+    return [f'{RESPONSE_CACHE_GENERATION_KEY}:{user_id}' for user_id in sorted(set(user_ids))]
+
+
+def _build_key(endpoint: str, request, generations: list) -> str:
+    """
+    :param endpoint: name of the endpoint
+    :param request: Request of the user
+    :param generations: curriculum version, generation of all responses and response generations of the users
+    :return: cache key
+    """
+    query = sorted((name, values) for name, values in request.GET.lists())
+    path_params = sorted(request.resolver_match.kwargs.items()) if request.resolver_match else []
+    variant = hashlib.md5(repr((is_user_coach(request.user), generations, path_params, query)).encode(),
+                          usedforsecurity=False).hexdigest()
+    return f'{RESPONSE_CACHE_PREFIX}:{endpoint}:{request.user.id}:{variant}'
+
+
+def _get_counter_key(key: str, hit: bool) -> str:
+    """
+    :param key: cache key of a response
+    :param hit: True if the response was in the cache
+    :return: key of the hit or miss counter of the endpoint of the response
+    """
+    endpoint = key.split(':')[1]
+    return f'{RESPONSE_CACHE_PREFIX}:{"hits" if hit else "misses"}:{endpoint}'
+
+
+def _count(key: str, hit: bool) -> None:
+    """
+    Count a hit or miss of the response cache.
+    :param key: cache key of the response
+    :param hit: True if the response was in the cache
+    :return: None
+    """
+    counter = _get_counter_key(key, hit)
+    try:
+        cache.incr(counter)
+    except ValueError:
+        cache.add(counter, 1, timeout=None)
+
+
+def _build_response(request, entry: tuple or None) -> HttpResponse or None:
+    """
+    :param request: Request of the user
+    :param entry: cached content and ETag (see _get_entry)
+    :return: HttpResponse (304 Not Modified if the client has the current version) or None without an entry
+    """
+    if entry is None:
+        return None
+    # entries stored by older releases also hold a Last-Modified timestamp
+    content, etag = entry[:2]
+    response = HttpResponse(content, content_type=JSONRenderer.media_type)
+    if etag is not None:
+        validators = Validators(etag)
+        response = get_not_modified_response(request, validators) or set_validators(response, validators)
+    response[RESPONSE_CACHE_HEADER] = 'HIT'
+    return response
+
+
+def _get_entry(response) -> tuple:
+    """
+    :param response: rendered response with the optional ETag header
+    :return: tuple of the content and the ETag
+    """
+    return response.content, response.get('ETag')
+
+
+def _store(key: str, response) -> None:
+    """
+    :param key: cache key of the response
+    :param response: rendered response
+    :return: None
+    """
+    cache.set(key, _get_entry(response), timeout=settings.RESPONSE_CACHE_TIMEOUT)
@@ -0,0 +1,129 @@
+from rest_framework.exceptions import ValidationError
+
+# Nested (expensive) fields which are only returned if they are listed in ?include= (when the param is given)
+RELATIONS = frozenset({'approved_by', 'checked', 'checked_learn_aims', 'learn_aim', 'learn_aims', 'marked_as_todo',
+                       'tags'})
+
+# Characters allowed in the field paths of ?fields= and ?include=
+FIELD_PATH_CHARACTERS = frozenset('abcdefghijklmnopqrstuvwxyz_.')
+
+
+class FieldSelection:
+    """
+    Sparse fieldset of a request.
+    - ?fields=id,name,learn_aim.checked.close_stage: only the listed fields are returned, a nested field without
+      listed sub-fields is returned completely
+    - ?include=checked,tags: only the listed nested fields (see RELATIONS) are returned, ?include= returns none
+    Without both params every field is returned. The loaders ask with wants() which data they have to load.
+    """
+
+    def __init__(self, fields: list = None, include: list = None):
+        self.fields = None
+        if fields:
+            self.fields = {}
+            for path in fields:
+                node = self.fields
+                for name in path.split('.'):
+                    node = node.setdefault(name, {})
+        self.include = None if include is None else frozenset(include)
+
+    def __repr__(self) -> str:
+        include = None if self.include is None else sorted(self.include)
+        return f'FieldSelection(fields={self.fields!r}, include={include!r})'
+
+    @property
+    def is_complete(self) -> bool:
+        """
+        :return: True if every field is selected
+        """
+        return self.fields is None and self.include is None
+
+    def wants(self, path: str) -> bool:
+        """
+        Check if a field is part of the response.
+        :param path: dotted path of the field, i.e. learn_aim.checked.approved_by
+        :return: True if the field is selected
+        """
+        node = self.fields
+        for name in path.split('.'):
+            if self.include is not None and name in RELATIONS and name not in self.include:
+                return False
+            if node:
+                if name not in node:
+                    return False
+                node = node[name]
+        return True
+
+    def wants_any(self, *paths) -> bool:
+        """
+        :param paths: dotted paths of fields
+        :return: True if any of the fields is selected
+        """
+        return any(self.wants(path) for path in paths)
+
+    def prune(self, data):
+        """
+        Remove the fields which are not selected.
+        :param data: serialized data (dicts and lists)
+        :return: data with the selected fields only
+        """
+        if self.is_complete:
+            return data
+        return self._prune(data, self.fields)
+
+    def _prune(self, data, node: dict or None):
+        """
+        :param data: serialized data (dicts and lists)
+        :param node: selected sub-fields of the data, empty or None if all are selected
+        :return: data with the selected fields only
+        """
+        if isinstance(data, list):
+            return [self._prune(item, node) for item in data]
+        if not isinstance(data, dict):
+            return data
+        pruned = {}
+        for name, value in data.items():
+            if node and name not in node:
+                continue
+            if self.include is not None and name in RELATIONS and name not in self.include:
+                continue
+            pruned[name] = self._prune(value, node[name] if node else None)
+        return pruned
+
+
+# Selection of all fields (used when no request is given)
+ALL_FIELDS = FieldSelection()
+
+
+class SparseFieldsetSerializerMixin:
+    """
+    Mixin for flat serializers which only computes the fields of the FieldSelection in the context
+    ('field_selection'), so SerializerMethodFields which are not selected cause no queries.
+    """
+
+    def get_fields(self):
+        """
+        :return: dict with the selected fields of the serializer
+        """
+        fields = super().get_fields()
+        selection = self.context.get('field_selection', ALL_FIELDS)
+        return {name: field for name, field in fields.items() if selection.wants(name)}
+
+
+def get_field_selection(request) -> FieldSelection:
+    """
+    Get the sparse fieldset of a request from the ?fields= and ?include= params (comma separated dotted paths).
+    :param request: Request (DRF or Django)
+    :raises ValidationError: if a field path contains invalid characters
+    :return: FieldSelection
+    """
+    params = {}
+    for param in ('fields', 'include'):
+        value = request.GET.get(param)
+        if value is None:
+            continue
+        paths = [path.strip() for path in value.split(',') if path.strip()]
+        if any(not set(path) <= FIELD_PATH_CHARACTERS or '' in path.split('.') for path in paths):
+            raise ValidationError({param: 'Please supply comma separated field names, i.e. id,name,learn_aim.name.'})
+        params[param] = paths
+    return FieldSelection(params.get('fields'), params.get('include'))
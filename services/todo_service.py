@@ -0,0 +1,77 @@
+from django.db import transaction
+from django.db.models import QuerySet
+
+from custom_exceptions.learn_check_exceptions import LearnAimNotInEducationOrdinance
+from learn_aim_check.models import LearnAim, TraineeProgress
+from services.ordinance_index_service import get_learn_aim_ids_in_ordinance
+from users.models import User
+
+# Approved stage from which a learn aim is completed and can't be marked as to-do anymore
+COMPLETED_STAGE = 3
+
+
+def is_marked_as_todo(user: User, learn_aim_id: int) -> bool:
+    """
+    Check with a single query on the to-do table if a user marked a learn aim as to-do.
+    :param user: user to check the to-do for
+    :param learn_aim_id: id of the learn aim
+    :return: True if the learn aim is marked as to-do
+    """
+    return _get_todos(user).filter(learnaim_id=learn_aim_id).exists()
+
+
+def get_todo_learn_aim_ids(user: User) -> list:
+    """
+    :param user: user to get the to-dos for
+    :return: List of the ids of the learn aims the user marked as to-do, ordered by id
+    """
+    return list(_get_todos(user).order_by('learnaim_id').values_list('learnaim_id', flat=True))
+
+
+def get_completed_learn_aim_ids(user: User, learn_aim_ids) -> set:
+    """
+    Get the completed learn aims (approved up to the last stage) with a single query on the progress projection.
+    :param user: trainee to get the completed learn aims for
+    :param learn_aim_ids: ids of the learn aims to check
+    :return: Set of the ids of the completed learn aims
+    """
+    return set(TraineeProgress.objects.filter(
+        trainee_id=user.pk, learn_aim_id__in=list(learn_aim_ids), approved_stage__gte=COMPLETED_STAGE
+    ).values_list('learn_aim_id', flat=True))
+
+
+def set_todos(user: User, learn_aim_ids, marked_as_todo: bool) -> tuple:
+    """
+    Mark or unmark many learn aims of a trainee as to-do at once.
+    - only learn aims of the trainee's education ordinance
+    - completed learn aims are never marked, they are unmarked instead (like a single toggle)
+    Only the changed to-dos are added or removed, through the related manager so the m2m_changed signals are sent.
+    :param user: trainee to change the to-dos for
+    :param learn_aim_ids: ids of the learn aims to change
+    :param marked_as_todo: True to mark the learn aims as to-do, False to unmark them
+    :raises LearnAimNotInEducationOrdinance: if a learn aim is not part of the trainee's education ordinance
+    :return: Tuple of the ids of all to-dos of the trainee (ordered) and the ids of the completed learn aims which
+             were not marked
+    """
+    learn_aim_ids = set(learn_aim_ids)
+    if get_learn_aim_ids_in_ordinance(user.education_ordinance_id, learn_aim_ids) != learn_aim_ids:
+        raise LearnAimNotInEducationOrdinance
+
+    completed_ids = get_completed_learn_aim_ids(user, learn_aim_ids) if marked_as_todo else set()
+    with transaction.atomic():
+        todo_ids = set(_get_todos(user).values_list('learnaim_id', flat=True))
+        to_add = learn_aim_ids - completed_ids - todo_ids
+        to_remove = todo_ids & (completed_ids if marked_as_todo else learn_aim_ids)
+        if to_add:
+            user.marked_as_todo.add(*to_add)
+        if to_remove:
+            user.marked_as_todo.remove(*to_remove)
+    return sorted((todo_ids | to_add) - to_remove), sorted(completed_ids)
+
+
+def _get_todos(user: User) -> QuerySet:
+    """
+    :param user: user to get the to-dos for
+    :return: QuerySet of the rows of the to-do table of the user
+    """
+    return LearnAim.marked_as_todo.through.objects.filter(user_id=user.pk)
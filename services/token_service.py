@@ -1,17 +1,117 @@
-from rest_framework_simplejwt.tokens import RefreshToken
+import time
 
+from django.core.cache import cache
+from django.db import router, transaction
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken, Token
+
+from services.group_service import get_user_roles
 from users.models import User
 
+# Custom claims embedded into the jwt-tokens
+EDUCATION_ORDINANCE_CLAIM = 'education_ordinance'
+ROLES_CLAIM = 'roles'
+# Issue time with sub-second precision (the standard iat claim only has whole seconds)
+ISSUED_AT_CLAIM = 'issued_at'
+
+# Cache key of the time (unix seconds as float) before which the access-tokens of a user are revoked
+TOKENS_VALID_AFTER_KEY = 'tokens-valid-after:{user_id}'
+
 
 def get_tokens_for_user(user: User) -> dict:
     """
     Get jwt-access and -refresh-token for given user.
+    The tokens contain the education ordinance, the roles of the user and the exact issue time as claims.
     :param user: user-object
     :return: dict with access- and refresh-token.
     """
     refresh = RefreshToken.for_user(user)
+    refresh[EDUCATION_ORDINANCE_CLAIM] = user.education_ordinance_id
+    refresh[ROLES_CLAIM] = sorted(get_user_roles(user))
+    refresh[ISSUED_AT_CLAIM] = refresh.current_time.timestamp()
 
     return {
         'refresh': str(refresh),
         'access': str(refresh.access_token),
     }
+
+
+def refresh_tokens(refresh_token: str) -> dict:
+    """
+    Get new jwt-access and -refresh-token for a valid refresh-token.
+    The user is reloaded, so the new tokens contain the current education ordinance and roles.
+    :param refresh_token: refresh-token
+    :return: dict with access- and refresh-token.
+    :raises TokenError: if the refresh-token is invalid or expired
+    :raises User.DoesNotExist: if the user of the refresh-token does not exist or is inactive
+    """
+    refresh = RefreshToken(refresh_token)
+    user = User.objects.get(**{api_settings.USER_ID_FIELD: refresh[api_settings.USER_ID_CLAIM]}, is_active=True)
+    return get_tokens_for_user(user)
+
+
+def get_user_from_token(token: Token) -> User:
+    """
+    Get a user-object built from the claims of the given token without a database query.
+    Only the id and the education ordinance are set, all other fields are deferred and loaded together
+    on the first access to one of them. The roles are memoized for services.group_service.
+    :param token: validated token with the custom claims
+    :return: user-object
+    """
+    loaded_values = {
+        User._meta.pk.attname: token[api_settings.USER_ID_CLAIM],
+        'education_ordinance_id': token[EDUCATION_ORDINANCE_CLAIM],
+    }
+    field_names = [field.attname for field in User._meta.concrete_fields if field.attname in loaded_values]
+    user = User.from_db(router.db_for_read(User), field_names, [loaded_values[field_name] for field_name in field_names])
+    user._role_names = frozenset(token[ROLES_CLAIM])
+    return user
+
+
+def revoke_user_tokens(user_id: int) -> None:
+    """
+    Revoke all access-tokens issued to a user so far (i.e. after a deactivation or a change of the roles or the
+    education ordinance), once the current transaction is committed.
+    The stamp is kept in the cache for the lifetime of the access-tokens. It is only seen by all workers with a
+    shared cache backend, which is why TOKEN_CLAIMS_AUTHENTICATION is off by default for locmem.
+    Refresh-tokens are not revoked, refresh_tokens() reloads the user and issues tokens with the current claims.
+    :param user_id: id of the user
+    :return: None
+    """
+    transaction.on_commit(lambda: cache.set(
+        TOKENS_VALID_AFTER_KEY.format(user_id=user_id), time.time(),
+        int(api_settings.ACCESS_TOKEN_LIFETIME.total_seconds())))
+
+
+def is_token_revoked(token: Token) -> bool:
+    """
+    Check with a single cache lookup if a token was issued before the tokens of its user were revoked.
+    :param token: validated token
+    :return: True if the token is revoked
+    """
+    valid_after = cache.get(TOKENS_VALID_AFTER_KEY.format(user_id=token[api_settings.USER_ID_CLAIM]))
+    return _is_issued_before(token, valid_after)
+
+
+async def ais_token_revoked(token: Token) -> bool:
+    """
+    Async version of is_token_revoked.
+    :param token: validated token
+    :return: True if the token is revoked
+    """
+    valid_after = await cache.aget(TOKENS_VALID_AFTER_KEY.format(user_id=token[api_settings.USER_ID_CLAIM]))
+    return _is_issued_before(token, valid_after)
+
+
+def _is_issued_before(token: Token, valid_after: float or None) -> bool:
+    """
+    :param token: validated token
+    :param valid_after: revocation stamp of the user (None if the tokens were not revoked)
+    :return: True if the token was issued before the stamp, tokens without ISSUED_AT_CLAIM only have the whole
+        seconds of iat and are revoked if they were issued in the second of the stamp as well
+    """
+    if valid_after is None:
+        return False
+    if ISSUED_AT_CLAIM in token:
+        return token[ISSUED_AT_CLAIM] < valid_after
+    return token.get('iat', 0) <= valid_after
@@ -1,6 +1,7 @@
 from firebase_admin import auth
 
 from custom_exceptions.user_exceptions import EmailAlreadyExistsException
+from services import token_service
 from users.models import User
 
 
@@ -8,7 +9,7 @@ def get_or_create_user(firebase_user_record: auth.UserRecord) -> User:
     """
     Get a user based on given user-infos.
     If no use can be found then create a new user with given user-infos.
-    :param firebase_user_record: user-record from firebase-auth
+    :param firebase_user_record: user-record from firebase-auth (or any object with uid, email and display_name)
     :return: user-object
     :exception EmailAlreadyExistsException: if email already exists
     """
@@ -16,11 +17,50 @@ def get_or_create_user(firebase_user_record: auth.UserRecord) -> User:
     if not user and User.objects.filter(email=firebase_user_record.email).exists():
         raise EmailAlreadyExistsException
     elif not user:
-        user = User.objects.create(
-            firebase_uid=firebase_user_record.uid,
-            email=firebase_user_record.email,
-            firstname=firebase_user_record.display_name.split(' ')[0] if firebase_user_record.display_name else '',
-            lastname=firebase_user_record.display_name.split(' ')[1] if firebase_user_record.display_name else '',
-            is_active=True
-        )
+        user = User.objects.create(**_get_new_user_fields(firebase_user_record))
     return user
+
+
+async def aget_or_create_user(firebase_user_record: auth.UserRecord) -> User:
+    """
+    Async version of get_or_create_user.
+    :param firebase_user_record: user-record from firebase-auth (or any object with uid, email and display_name)
+    :return: user-object
+    :exception EmailAlreadyExistsException: if email already exists
+    """
+    user = await User.objects.filter(firebase_uid=firebase_user_record.uid).afirst()
+    if not user and await User.objects.filter(email=firebase_user_record.email).aexists():
+        raise EmailAlreadyExistsException
+    elif not user:
+        user = await User.objects.acreate(**_get_new_user_fields(firebase_user_record))
+    return user
+
+
+def _get_new_user_fields(firebase_user_record: auth.UserRecord) -> dict:
+    """
+    :param firebase_user_record: user-record from firebase-auth (or any object with uid, email and display_name)
+    :return: dict with the fields of a new user
+    """
+    return {
+        'firebase_uid': firebase_user_record.uid,
+        'email': firebase_user_record.email,
+        'firstname': firebase_user_record.display_name.split(' ')[0] if firebase_user_record.display_name else '',
+        'lastname': firebase_user_record.display_name.split(' ')[1] if firebase_user_record.display_name else '',
+        'is_active': True
+    }
+
+
+def get_login_data(user: User) -> dict:
+    """
+    Get the data of the login response of a user, including new jwt-tokens.
+    :param user: user-object
+    :return: dict with id, email, firstname, lastname, groups and tokens of the user
+    """
+    return {
+        'id': user.id,
+        'email': user.email,
+        'firstname': user.firstname,
+        'lastname': user.lastname,
+        'groups': user.get_groups().values(),
+        'tokens': token_service.get_tokens_for_user(user)
+    }
@@ -0,0 +1,106 @@
+import json
+import logging
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from services.profiling_service import install_query_recorder, start_profile, stop_profile
+
+logger = logging.getLogger('tie_athena.profiling')
+
+
+class ProfilingMiddleware:
+    """
+    Middleware to profile requests.
+    Records the SQL queries, the database time, the serialization time and the time of external calls (firebase).
+    The results are added as Server-Timing header and written as structured log line, repeated queries (N+1) are
+    reported with the serializer method which executed them.
+    Active for every request if REQUEST_PROFILING is set, otherwise only for staff users sending the
+    REQUEST_PROFILING_HEADER header.
+    Supports the sync (WSGI) and the async (ASGI) request path.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+        # the queries are recorded on every connection (async views query with the connection of a worker thread)
+        connection_created.connect(install_query_recorder)
+        for connection in connections.all(initialized_only=True):
+            install_query_recorder(connection)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not self.is_profiled(request):
+            return self.get_response(request)
+
+        profile, token = start_profile()
+        try:
+            response = self.get_response(request)
+        finally:
+            stop_profile(token)
+
+        # the user is only known after the authentication of the view
+        if settings.REQUEST_PROFILING or getattr(request.user, 'is_staff', False):
+            self.add_profile(request, response, profile)
+        return response
+
+    async def __acall__(self, request):
+        if not self.is_profiled(request):
+            return await self.get_response(request)
+
+        profile, token = start_profile()
+        try:
+            response = await self.get_response(request)
+        finally:
+            stop_profile(token)
+
+        # is_staff is not part of the token claims, it is loaded from the database
+        if settings.REQUEST_PROFILING or await sync_to_async(getattr)(request.user, 'is_staff', False):
+            self.add_profile(request, response, profile)
+        return response
+
+    @staticmethod
+    def is_profiled(request) -> bool:
+        """
+        :param request: HttpRequest
+        :return: True if the request is profiled (the user is checked after the view)
+        """
+        return settings.REQUEST_PROFILING or settings.REQUEST_PROFILING_HEADER in request.META
+
+    @staticmethod
+    def add_profile(request, response, profile) -> None:
+        """
+        Add the Server-Timing header to the response and log the profile.
+        :param request: HttpRequest
+        :param response: HttpResponse
+        :param profile: RequestProfile of the request
+        :return: None
+        """
+        timings = {
+            'db': profile.db_time,
+            'ser': profile.serialize_time,
+            **{f'ext-{name}': duration for name, duration in profile.external_times.items()},
+            'total': profile.get_total_time(),
+        }
+        response['Server-Timing'] = ', '.join(
+            [f'{name};dur={duration * 1000:.1f}' for name, duration in timings.items()] +
+            [f'queries;desc="{profile.query_count}"'])
+
+        n_plus_one_queries = profile.get_n_plus_one_queries()
+        log = logger.warning if n_plus_one_queries else logger.info
+        log(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': profile.query_count,
+            **{f'{name}_ms': round(duration * 1000, 1) for name, duration in timings.items()},
+            'n_plus_one': n_plus_one_queries,
+        }))
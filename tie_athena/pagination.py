@@ -0,0 +1,43 @@
+from rest_framework.pagination import CursorPagination
+
+
+class OptionalCursorPagination(CursorPagination):
+    """
+    Keyset (cursor) pagination on a stable ordering.
+    The pagination is only applied if the client supplies the cursor or page_size param,
+    without them the complete list is returned as before.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_query_param not in request.query_params and \
+                self.page_size_query_param not in request.query_params:
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+
+class IdCursorPagination(OptionalCursorPagination):
+    """
+    Cursor pagination ordered by the primary key.
+    """
+    ordering = 'id'
+
+
+class CreatedAtCursorPagination(OptionalCursorPagination):
+    """
+    Cursor pagination ordered by the creation date (newest first).
+    """
+    ordering = ('-created_at', '-id')
+
+
+class QueueCursorPagination(CursorPagination):
+    """
+    Cursor pagination for work queues, ordered by the creation date (oldest first).
+    Always applied, queues are never returned as a complete list.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    ordering = ('created_at', 'id')
@@ -35,6 +35,7 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'corsheaders',
     'rest_framework',
+    'django_filters',
     'users',
     'drf_auth',
     'learn_aim_check'
@@ -42,6 +43,7 @@ INSTALLED_APPS = [
 
 # Middleware definition
 MIDDLEWARE = [
+    'tie_athena.middleware.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',
@@ -94,6 +96,24 @@ else:
         }
     }
 
+# Cache --> local memory (default, per process), file (shared by the processes of a host) or redis (shared)
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'locmem')
+CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'tie-athena'),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', '/tmp/tie-athena-cache'),
+    'redis': ('django.core.cache.backends.redis.RedisCache', os.environ.get('REDIS_URL', 'redis://127.0.0.1:6379/0')),
+}
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND][0],
+        'LOCATION': os.environ.get('CACHE_LOCATION', CACHE_BACKENDS[CACHE_BACKEND][1]),
+    }
+}
+
+# Seconds a rendered per-user response (learn check tree, charts, learn data) is cached, 0 disables the cache.
+# The invalidation only reaches all workers with a shared backend, so it is disabled by default for local memory.
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get('RESPONSE_CACHE_TIMEOUT', 0 if CACHE_BACKEND == 'locmem' else 3600))
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -136,7 +156,7 @@ AUTH_USER_MODEL = 'users.User'
 # Django Rest-Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'drf_auth.authentication.ClaimsJWTAuthentication',
     ),
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
 }
@@ -147,6 +167,53 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': datetime.timedelta(days=25) if DEBUG else datetime.timedelta(days=5),
 }
 
+# Authenticate requests from the token claims without loading the user (1) or load the user per request (0).
+# Deactivations and role changes revoke the access-tokens through a stamp in the cache, which only reaches all workers
+# with a shared backend, so the user is loaded (and the active flag checked) by default for local memory.
+TOKEN_CLAIMS_AUTHENTICATION = os.environ.get('TOKEN_CLAIMS_AUTHENTICATION',
+                                             '0' if CACHE_BACKEND == 'locmem' else '1') in ('1', 'True')
+
+# Seconds a process keeps a serialized curriculum before it is rebuilt (even without a detected curriculum change)
+CURRICULUM_CACHE_TIMEOUT = 300
+
+# Seconds a process keeps the ordinance membership index before it is rebuilt (0 = off, every membership check
+# queries the database), changes of the curriculum are detected like for CURRICULUM_CACHE_TIMEOUT
+ORDINANCE_INDEX_TIMEOUT = int(os.environ.get('ORDINANCE_INDEX_TIMEOUT', 300))
+
+# Endpoints which serialize with the lean serializers (plain dicts from values() projections, byte-identical output),
+# opt-in per endpoint: learn-check, checked-learn-aims and/or learn-data
+LEAN_SERIALIZERS = set(filter(None, os.environ.get('LEAN_SERIALIZERS', '').split(',')))
+
+# Firebase id-token verification
+FIREBASE_PROJECT_ID = os.environ.get('FIREBASE_PROJECT_ID')
+FIREBASE_PUBLIC_KEYS_URL = os.environ.get(
+    'FIREBASE_PUBLIC_KEYS_URL',
+    'https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com')
+FIREBASE_PUBLIC_KEYS_DEFAULT_TTL = 3600
+FIREBASE_CLOCK_SKEW_SECONDS = int(os.environ.get('FIREBASE_CLOCK_SKEW_SECONDS', 10))
+
+# Request profiling (Server-Timing header and log line), for all requests or for staff users sending X-Profile
+REQUEST_PROFILING = os.environ.get('REQUEST_PROFILING') in ('1', 'True')
+REQUEST_PROFILING_HEADER = 'HTTP_X_PROFILE'
+
+# Logging
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'tie_athena.profiling': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
 # CORS Configuration
 CORS_ORIGIN_ALLOW_ALL = False
 CORS_ORIGIN_WHITELIST = tuple(os.environ.get('CORS_ORIGIN_WHITELIST').split(','))
@@ -2,9 +2,12 @@ from django.contrib import admin
 from django.urls import include, path
 from rest_framework import routers
 
-from learn_aim_check import views
+from drf_auth import async_views as auth_async_views
+from learn_aim_check import async_views, views
 from learn_aim_check.views import LearnCheckChartAPIView, ToggleTodoAPIView, CheckLearnAimViewSet, \
-    CheckedLearnAimsForTraineeView
+    CheckedLearnAimsForTraineeView, LearnCheckChartListAPIView, BulkTodoAPIView, \
+    LearnAimSearchAPIView
+from users import async_views as users_async_views
 
 router = routers.DefaultRouter(trailing_slash=False)
 router.register(r'learn-check', views.LearnAimViewSet, basename='learn-check')
@@ -16,11 +19,22 @@ urlpatterns = [
     path('api/v1/auth/', include('drf_auth.urls')),
     path('api/v1/users/', include('users.urls')),
     path('api/v1/', include(router.urls)),
+    path('api/v1/learn-check/chart/', LearnCheckChartListAPIView.as_view(), name='learn_check_charts'),
     path('api/v1/learn-check/chart/<int:pk>/', LearnCheckChartAPIView.as_view(), name='learn_check_chart'),
     path('api/v1/learn-aim/<int:pk>/toggle-todo/', ToggleTodoAPIView.as_view(),
          name='learn_aim_toggle_todo'),
+    path('api/v1/learn-aim/todos/', BulkTodoAPIView.as_view(), name='learn_aim_todos'),
+    path('api/v1/learn-aim/search/', LearnAimSearchAPIView.as_view(), name='learn_aim_search'),
     path('api/v1/checked-learn-aims/<int:trainee_id>/', CheckedLearnAimsForTraineeView.as_view(),
          name='checked-learn-aims-for-trainee'),
     path('api/v1/checked-learn-aims/trainee/<int:trainee_id>/', CheckedLearnAimsForTraineeView.as_view(),
          name='checked-learn-aims-for-trainee'),
+
+    # Native async read path (served by the ASGI application, same responses as the views above)
+    path('api/v1/async/auth/login', auth_async_views.login, name='async_login'),
+    path('api/v1/async/learn-check', async_views.learn_check_tree, name='async_learn_check'),
+    path('api/v1/async/learn-check/chart/', async_views.learn_check_chart_list, name='async_learn_check_charts'),
+    path('api/v1/async/learn-check/chart/<int:pk>/', async_views.learn_check_chart, name='async_learn_check_chart'),
+    path('api/v1/async/users/trainee/learn-data/<int:trainee_id>/', users_async_views.trainee_learn_data,
+         name='async_specific_trainee_learn_data'),
 ]
@@ -0,0 +1,42 @@
+from django.shortcuts import aget_object_or_404
+from django.views.decorators.http import require_GET
+
+from drf_auth.async_authentication import async_api_view, render_json
+from learn_aim_check.lean_serializers import use_lean_serializers
+from services.learn_data_service import aget_lean_trainee_learn_data, assemble_learn_data, get_checks_of_trainee, \
+    get_checks_of_user
+from services.response_cache_service import acache_response, aget_cached_response, aget_response_cache_key
+from services.sparse_fieldset_service import get_field_selection
+from users.models import User
+
+
+@require_GET
+@async_api_view()
+async def trainee_learn_data(request, trainee_id):
+    """
+    Async version of TraineeLearnDataView.
+    The checks are loaded with the async ORM and assembled like in the sync view, without database access.
+
+    :param request: The HTTP request object.
+    :param trainee_id: The ID of the trainee whose learn data is being retrieved.
+    :returns: Response containing serialized user data and checked learn aims.
+    """
+    cache_key = await aget_response_cache_key('learn-data', request, [trainee_id, request.user.id])
+    cached_response = await aget_cached_response(request, cache_key)
+    if cached_response is not None:
+        return cached_response
+
+    user = await aget_object_or_404(User, pk=trainee_id)
+    selection = get_field_selection(request)
+    if use_lean_serializers('learn-data'):
+        data = await aget_lean_trainee_learn_data(user, request, selection)
+        return await acache_response(cache_key, render_json(data))
+
+    checks = [check async for check in get_checks_of_trainee(user)]
+    if request.user.id == user.id:
+        user_checks = checks
+    else:
+        learn_aim_ids = {check.closed_learn_check_id for check in checks}
+        user_checks = [check async for check in get_checks_of_user(request.user, learn_aim_ids)]
+    data = selection.prune(assemble_learn_data(user, checks, user_checks, request))
+    return await acache_response(cache_key, render_json(data))
@@ -0,0 +1,24 @@
+from django_filters import rest_framework as filters
+
+from users.models import User
+
+
+class NumberInFilter(filters.BaseInFilter, filters.NumberFilter):
+    """
+    Filter for a comma separated list of numbers, i.e. ?ids=4,5,6
+    """
+
+
+class UserFilter(filters.FilterSet):
+    """
+    Filters for users.
+    i.e. ?education_ordinance=1&assigned_trainer=3 or ?ids=4,5,6
+    """
+    ids = NumberInFilter(field_name='id')
+    education_ordinance = filters.NumberFilter(field_name='education_ordinance')
+    assigned_trainer = filters.NumberFilter(field_name='assigned_trainer')
+    joined_since = filters.IsoDateTimeFilter(field_name='date_joined', lookup_expr='gte')
+
+    class Meta:
+        model = User
+        fields = ['ids', 'education_ordinance', 'assigned_trainer', 'joined_since']
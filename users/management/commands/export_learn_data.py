@@ -0,0 +1,53 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from services.export_service import EXPORT_FORMATS, stream_export
+from services.group_service import get_group_name_student
+from users.filters import UserFilter
+from users.models import User
+
+
+class Command(BaseCommand):
+    """
+    Class for management-command "export_learn_data".
+    """
+    help = ('Export the learning record (all learn checks) of trainees as NDJSON or CSV. The rows are streamed from '
+            'the database, so the memory stays constant for any number of trainees.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=list(EXPORT_FORMATS), default='ndjson',
+                            help='Format of the export (default: ndjson)')
+        parser.add_argument('--output', default='-', help='Path of the export file (default: stdout)')
+        parser.add_argument('--ids', help='Comma separated ids of the trainees (default: all trainees)')
+        parser.add_argument('--education-ordinance', help='Only export trainees of this education ordinance')
+        parser.add_argument('--assigned-trainer', help='Only export trainees of this trainer')
+
+    def handle(self, *args, **options):
+        """
+        Handle command.
+        """
+        filters = {name: options[name] for name in ('ids', 'education_ordinance', 'assigned_trainer')
+                   if options[name] is not None}
+        trainees = UserFilter(filters, queryset=User.objects.filter(groups__name=get_group_name_student()))
+        if not trainees.is_valid():
+            raise CommandError(trainees.errors.as_text())
+
+        if options['output'] == '-':
+            self.write_export(trainees.qs, options['format'], sys.stdout)
+            return
+        with open(options['output'], 'w', newline='', encoding='utf-8') as file:
+            self.write_export(trainees.qs, options['format'], file)
+        print(f'Export written to {options["output"]}.')
+
+    @staticmethod
+    def write_export(trainees, export_format: str, file) -> None:
+        """
+        Write the export chunk by chunk to the given file.
+        :param trainees: QuerySet of the trainees to export
+        :param export_format: key of EXPORT_FORMATS
+        :param file: file to write to
+        :return: None
+        """
+        for chunk in stream_export(trainees, export_format):
+            file.write(chunk)
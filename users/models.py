@@ -47,6 +47,19 @@ class User(AbstractBaseUser, PermissionsMixin):
         """
         return f'{self.firstname} {self.lastname} ({self.email})'
 
+    def refresh_from_db(self, using=None, fields=None):
+        """
+        Reload field values from the database.
+        If only deferred fields are requested (i.e. for a user built from token claims),
+        all deferred fields are loaded at once.
+        :param using: database alias
+        :param fields: fields to reload
+        """
+        deferred_fields = self.get_deferred_fields()
+        if fields is not None and deferred_fields and set(fields) <= deferred_fields:
+            fields = deferred_fields
+        super().refresh_from_db(using=using, fields=fields)
+
     def get_groups(self):
         """
         Returns all groups of the user.
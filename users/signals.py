@@ -0,0 +1,46 @@
+from django.contrib.auth.models import Group
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from services.group_service import clear_group_cache, clear_user_roles
+from services.response_cache_service import invalidate_user_data_responses, invalidate_user_responses
+from services.token_service import revoke_user_tokens
+from users.models import User
+
+
+@receiver([post_save, post_delete], sender=Group)
+def group_changed(sender, **kwargs):
+    """
+    Clear the process-wide group cache when a group is saved or deleted.
+    """
+    clear_group_cache()
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def user_groups_changed(sender, instance, **kwargs):
+    """
+    Clear the memoized roles and revoke the tokens of a user when the groups of the user are changed.
+    """
+    if isinstance(instance, User):
+        clear_user_roles(instance)
+        invalidate_user_responses([instance.pk])
+        revoke_user_tokens(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def user_changed(sender, instance, created, **kwargs):
+    """
+    Invalidate the cached responses which contain the data of a saved user and revoke the tokens of the user
+    (the active flag or the education ordinance may have changed).
+    """
+    invalidate_user_data_responses(instance.pk)
+    if not created:
+        revoke_user_tokens(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    """
+    Revoke the tokens of a deleted user.
+    """
+    revoke_user_tokens(instance.pk)
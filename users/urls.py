@@ -1,11 +1,13 @@
 from django.urls import path
 
 from . import views
-from .views import AllTraineesView, SingleTraineeView, TraineeLearnDataView
+from .views import AllTraineesView, CoachDashboardView, SingleTraineeView, TraineeExportView, TraineeLearnDataView
 
 urlpatterns = [
     path('check-user-group', views.CheckUserGroupView.as_view(), name='check-user-group'),
     path('trainees/', AllTraineesView.as_view({'get': 'list'}), name='trainees'),
+    path('trainees/export/', TraineeExportView.as_view(), name='trainees-export'),
+    path('trainees/dashboard/', CoachDashboardView.as_view(), name='trainees-dashboard'),
     path('check-user-group', views.CheckUserGroupView.as_view(), name='check-user-group'),
     path('trainee/<int:pk>/', SingleTraineeView.as_view(), name='trainee-detail'),
     path('trainee/learn-data/<int:trainee_id>/', TraineeLearnDataView.as_view(), name='specific-trainee-learn-data'),
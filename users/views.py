@@ -1,15 +1,23 @@
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from rest_framework import status, viewsets
+from rest_framework.exceptions import ValidationError
 from rest_framework.generics import RetrieveAPIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet
 
-from learn_aim_check.models import CheckLearnAim
-from learn_aim_check.serializers import UserLearnDataSerializer, CheckLearnAimSerializer
-from services.group_service import get_group_name_student
+from services.dashboard_service import get_coach_dashboard
+from services.export_service import EXPORT_FORMATS, stream_export
+from services.group_service import get_group_name_student, get_user_roles
+from services.learn_data_service import get_trainee_learn_data
+from services.response_cache_service import cache_response, get_cached_response, get_response_cache_key
+from services.sparse_fieldset_service import get_field_selection
+from tie_athena.pagination import IdCursorPagination
+from users.filters import UserFilter
 from users.models import User
+from users.permissions import IsCoach
 from users.serializers import UserSerializer
 
 
@@ -17,9 +25,11 @@ class UserView(viewsets.ModelViewSet):
     """
     ModelViewSet to provide all User Data needed.
     """
-    queryset = User.objects.all()
+    queryset = User.objects.all().order_by('id')
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
+    filterset_class = UserFilter
+    pagination_class = IdCursorPagination
 
 
 class CheckUserGroupView(APIView):
@@ -34,7 +44,7 @@ class CheckUserGroupView(APIView):
         group_name = self.request.query_params.get('groupName', None)
         if group_name is None:
             return Response({'groupName': 'Please supply a groupName in params.'}, status=status.HTTP_400_BAD_REQUEST)
-        return Response({'has_group': request.user.groups.filter(name=group_name.upper()).exists()},
+        return Response({'has_group': group_name.upper() in get_user_roles(request.user)},
                         status=status.HTTP_200_OK)
 
 
@@ -46,6 +56,8 @@ class AllTraineesView(ModelViewSet):
     """
     queryset = User.objects.all()
     serializer_class = UserSerializer
+    filterset_class = UserFilter
+    pagination_class = IdCursorPagination
 
     def get_queryset(self):
         """
@@ -54,7 +66,7 @@ class AllTraineesView(ModelViewSet):
         :returns: Queryset of users in the student group
         """
         student_group_name = get_group_name_student()
-        return User.objects.filter(groups__name=student_group_name)
+        return User.objects.filter(groups__name=student_group_name).order_by('id')
 
 
 class SingleTraineeView(RetrieveAPIView):
@@ -87,20 +99,64 @@ class TraineeLearnDataView(APIView):
     def get(self, request, trainee_id, *args, **kwargs):
         """
         Handle GET request to fetch learn data for a specific trainee.
+        The checks are fetched once and grouped into both sections (see services.learn_data_service), only the
+        data of the fields selected with the fields and include params is loaded. The rendered response is kept in
+        the response cache.
 
         :param request: The HTTP request object.
         :param trainee_id: The ID of the trainee whose learn data is being retrieved.
         :returns: Response containing serialized user data and checked learn aims.
         """
+        cache_key = get_response_cache_key('learn-data', request, [trainee_id, request.user.id])
+        cached_response = get_cached_response(request, cache_key)
+        if cached_response is not None:
+            return cached_response
+
         user = get_object_or_404(User, pk=trainee_id)
-        serializer = UserLearnDataSerializer(user, context={'request': request})
+        data = get_trainee_learn_data(user, request, get_field_selection(request))
+        return cache_response(cache_key, Response(data))
 
-        checked_learn_aims = CheckLearnAim.objects.filter(assigned_trainee=user)
-        checked_learn_aims_serializer = CheckLearnAimSerializer(checked_learn_aims, many=True,
-                                                                context={'request': request})
 
-        data = {
-            'user_data': serializer.data,
-            'checked_learn_aims': checked_learn_aims_serializer.data
-        }
-        return Response(data)
+class TraineeExportView(APIView):
+    """
+    API-View to export the learning record (all learn checks) of a cohort of trainees.
+    The trainees are selected with the filters of the trainee list (i.e. ?assigned_trainer=3 or ?ids=4,5), the
+    rows are streamed as NDJSON (default) or CSV (?export-format=csv) while they are read from the database.
+    """
+    permission_classes = [IsAuthenticated, IsCoach]
+
+    def get(self, request, *args, **kwargs):
+        """
+        Stream the learn checks of the selected trainees.
+
+        :param request: The HTTP request object with the filters and the optional export-format param.
+        :returns: StreamingHttpResponse with one row per learn check or the errors of the params.
+        """
+        export_format = request.query_params.get('export-format', 'ndjson')
+        if export_format not in EXPORT_FORMATS:
+            return Response({'export-format': f'Please supply one of {", ".join(EXPORT_FORMATS)}.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        trainees = UserFilter(request.query_params, queryset=User.objects.filter(groups__name=get_group_name_student()))
+        if not trainees.is_valid():
+            raise ValidationError(trainees.errors)
+
+        _, content_type = EXPORT_FORMATS[export_format]
+        response = StreamingHttpResponse(stream_export(trainees.qs, export_format), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="learn-data.{export_format}"'
+        return response
+
+
+class CoachDashboardView(APIView):
+    """
+    API-View to provide the progress of all trainees assigned to the coach.
+    """
+    permission_classes = [IsAuthenticated, IsCoach]
+
+    def get(self, request, *args, **kwargs):
+        """
+        Get the last activity, the pending checks and the progress per action competence of every assigned trainee.
+
+        :param request: The HTTP request object.
+        :returns: Response with one entry per assigned trainee.
+        """
+        return Response(get_coach_dashboard(request.user), status=status.HTTP_200_OK)